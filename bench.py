@@ -0,0 +1,358 @@
+# ============================================================
+#  Project: Coffee Machine Simulation
+#  File: bench.py
+#
+#  Author(s): Sofia Vanessa and Ximena Isaac
+#
+#  Credits:
+#    - Functional design and logic implemented by both authors.
+#
+#  Notes:
+#    This project was created for learning purposes.
+#    Benchmark suite for the order hot path and the GUI rendering.
+#      python bench.py                    run and compare with bench_baseline.json
+#      python bench.py --save-baseline    run and store the results as the new baseline
+#      xvfb-run python bench.py --tk      render with real Tk widgets (needs a display)
+#    Without --tk the GUI cases run on a stub widget layer, so the suite
+#    works on machines without a display.
+# ============================================================
+
+import argparse
+import gc
+import json
+import os
+import sys
+import threading
+import time
+
+from coffeeprep import Coffee, StockIngredients, COFFEE_TYPES, SIZES
+from engine import CoffeeMachine
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+DEFAULT_THRESHOLD = 0.50        # report a case as a regression when it gets 50% slower (timer noise is ~20%)
+HISTORY_SIZES = (1000, 10000, 100000)
+UNLIMITED = 10**12
+
+
+# ----------------------------- Timing ----------------------------- #
+def _time(func, number, repeat=7):
+    """Best seconds per call over `repeat` runs of `number` calls (GC paused, like timeit)."""
+    best = float("inf")
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            for _ in range(number):
+                func()
+            best = min(best, (time.perf_counter() - t0) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return best
+
+
+def _unlimited_machine(sales=0):
+    machine = CoffeeMachine()
+    machine.stock.stock = {key: UNLIMITED for key in machine.stock.stock}
+    menu = [(t, s) for t in COFFEE_TYPES for s in SIZES]
+    for i in range(sales):
+        machine.order(*menu[i % len(menu)])
+    return machine
+
+
+# ----------------------------- Stub widget layer ----------------------------- #
+class _Widget:
+    def __init__(self):
+        self.options = {}
+
+    def config(self, **options):
+        self.options.update(options)
+
+    configure = config
+
+    def __setitem__(self, key, value):
+        self.options[key] = value
+
+    def set(self, *args):
+        self.options["set"] = args
+
+
+class _Tree(_Widget):
+    def __init__(self):
+        super().__init__()
+        self.rows = {}
+        self.order = []
+        self.next_id = 0
+
+    def get_children(self):
+        return tuple(self.order)
+
+    def insert(self, parent, index, values=()):
+        self.next_id += 1
+        iid = f"I{self.next_id:06X}"
+        self.order.append(iid)
+        self.rows[iid] = values
+        return iid
+
+    def item(self, iid, values=()):
+        self.rows[iid] = values
+
+    def see(self, iid):
+        pass
+
+    def delete(self, *iids):
+        for iid in iids:
+            self.order.remove(iid)
+            del self.rows[iid]
+
+
+class _Text(_Widget):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def insert(self, index, *chunks):
+        self.lines.extend(chunks[::2])
+
+    def delete(self, first, last=None):
+        del self.lines[:int(last.split(".")[0]) - 1]
+
+    def see(self, index):
+        pass
+
+
+class _Var:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+def _stub_app(machine):
+    """A CoffeeMachineApp whose widgets are stubs: measures our Python code, not Tk."""
+    from gui import CoffeeMachineApp, REFILL_LABELS
+
+    class StubApp(CoffeeMachineApp):
+        def __init__(self):                                         # No Tk: set the state __init__ would
+            self.machine = machine
+            self._secondary_built = True
+            self.callbacks = []
+            self._log_pending = []
+            self._log_lines = 0
+            self._log_flush_scheduled = False
+            self._log_file = None
+            self.var_type = _Var("latte")
+            self.var_size = _Var("large")
+            self._dirty = set()
+            self._dirty_stock = set()
+            self._render_scheduled = False
+            self._alerted = set()
+            self._eta_shown = {}
+            self.var_window = _Var("5min")
+            self._analytics_shown = None
+            self.tree = _Tree()
+            self.sales_scroll = _Widget()
+            self._sales_offset = 0
+            self._sales_shown = (0, 0)
+            self._sales_top = None
+            self._sales_follow = True
+            self.txt_log = _Text()
+            self.status = _Widget()
+            for name in ("lbl_money", "lbl_total_sales", "lbl_total_revenue", "lbl_window_sales",
+                         "lbl_window_revenue", "lbl_window_pace", "lbl_peak_hour", "lbl_window_top",
+                         "lbl_window_usage"):
+                setattr(self, name, _Widget())
+            for key in REFILL_LABELS:
+                setattr(self, f"lbl_{key}", _Widget())
+                setattr(self, f"bar_{key}", _Widget())
+                setattr(self, f"eta_{key}", _Widget())
+
+        def after(self, ms, func=None, *args):
+            self.callbacks.append(func)
+
+        def after_idle(self, func, *args):
+            self.callbacks.append(func)
+
+        def run_idle(self):
+            while self.callbacks:
+                self.callbacks.pop(0)()
+
+    return StubApp()
+
+
+def _tk_app(machine):
+    from gui import CoffeeMachineApp
+
+    app = CoffeeMachineApp(machine)
+    app.var_type.set("latte")
+    app.var_size.set("large")
+    app.run_idle = app.update
+    app.wait_visibility()                                           # The deferred panels wait for the first Expose
+    app.update()
+    return app
+
+
+# ----------------------------- Cases ----------------------------- #
+def bench_coffee():
+    results = {}
+    for t in COFFEE_TYPES:
+        for s in SIZES:
+            results[f"coffee[{t}/{s}]"] = _time(lambda: Coffee(t, s), 20000)
+    return results
+
+
+def bench_stock():
+    stock = StockIngredients()
+    stock.stock = {key: UNLIMITED for key in stock.stock}
+    ingredients = Coffee("latte", "large").ingredients
+    return {
+        "stock.check_ingredients": _time(lambda: stock.check_ingredients(ingredients), 20000),
+        "stock.take_ingredients": _time(lambda: stock.take_ingredients(ingredients), 20000),
+        "stock.reserve": _time(lambda: stock.reserve(ingredients), 20000),
+    }
+
+
+def bench_gui(make_app):
+    results = {}
+    app = make_app(_unlimited_machine())
+
+    def brew_cycle():
+        app._brew()
+        app.run_idle()
+
+    results["brew_cycle"] = _time(brew_cycle, 500)
+    for n in HISTORY_SIZES:
+        app = make_app(_unlimited_machine(n))
+        app._render_all()
+
+        def new_sale_render_sales():
+            app.machine.order("latte", "large")
+            app._render_sales()
+
+        results[f"render_sales[{n // 1000}k]"] = _time(new_sale_render_sales, 1000)
+        results[f"render_all[{n // 1000}k]"] = _time(app._render_all, 1000)
+    return results
+
+
+def bench_stock_threads(threads=8, orders_per_thread=20000):
+    """Many threads reserving against one shared stock (plenty of stock, pure throughput)."""
+    stock = StockIngredients()
+    stock.stock = {key: UNLIMITED for key in stock.stock}
+    menu = [Coffee(t, s) for t in COFFEE_TYPES for s in SIZES]
+    start_gate = threading.Barrier(threads + 1)
+
+    def worker(offset):
+        start_gate.wait()
+        for i in range(orders_per_thread):
+            stock.reserve(menu[(i + offset) % len(menu)].ingredients)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in pool:
+        t.start()
+    start_gate.wait()
+    t0 = time.perf_counter()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    total = threads * orders_per_thread
+    return {"threads": threads, "orders": total, "seconds": elapsed, "orders_per_sec": total / elapsed}
+
+
+def check_stock_race(threads=16, cups=100):
+    """Threads race for a limited number of cups: exactly `cups` orders may succeed."""
+    stock = StockIngredients()
+    stock.stock = {"water": 10**9, "milk": 10**9, "coffee_beans": 10**9, "cups": cups}
+    ingredients = Coffee("espresso", "small").ingredients
+    served = []
+    start_gate = threading.Barrier(threads)
+
+    def worker():
+        start_gate.wait()
+        ok = 0
+        for _ in range(cups):
+            ok += stock.reserve(ingredients).ok
+        served.append(ok)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return {"served": sum(served), "cups_left": stock.stock["cups"],
+            "consistent": sum(served) == cups and stock.stock["cups"] == 0}
+
+
+def run_suite(use_tk=False, threads=8):
+    results = {}
+    results.update(bench_coffee())
+    results.update(bench_stock())
+    results.update(bench_gui(_tk_app if use_tk else _stub_app))
+    threaded = bench_stock_threads(threads)
+    results[f"stock.reserve[{threads} threads]"] = threaded["seconds"] / threaded["orders"]
+    return results
+
+
+# ----------------------------- Reporting ----------------------------- #
+def compare(results, baseline, threshold):
+    """Returns the names of the cases that got slower than baseline * (1 + threshold)."""
+    regressions = []
+    print(f"{'case':<32}{'now':>12}{'baseline':>12}{'change':>10}")
+    for name, seconds in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<32}{_fmt(seconds):>12}{'-':>12}{'new':>10}")
+            continue
+        change = seconds / base - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  <-- REGRESSION"
+        print(f"{name:<32}{_fmt(seconds):>12}{_fmt(base):>12}{change:>+10.1%}{flag}")
+    return regressions
+
+
+def _fmt(seconds):
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.2f} us"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coffee machine benchmarks")
+    parser.add_argument("--threads", type=int, default=8, help="threads for the shared-stock cases")
+    parser.add_argument("--tk", action="store_true", help="use real Tk widgets (needs a display / Xvfb)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before a case is a regression (0.5 = 50%%)")
+    args = parser.parse_args()
+
+    results = run_suite(args.tk, args.threads)
+    race = check_stock_race(args.threads)
+    print(f"race check: served={race['served']} cups_left={race['cups_left']} "
+          f"{'OK' if race['consistent'] else 'INCONSISTENT'}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        compare(results, {}, args.threshold)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions or not race["consistent"]:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+# ============================================================
+#  Project: Coffee Machine Simulation
+#  File: bulk.py
+#
+#  Author(s): Sofia Vanessa and Ximena Isaac
+#
+#  Credits:
+#    - Functional design and logic implemented by both authors.
+#
+#  Notes:
+#    This project was created for learning purposes.
+#    Bulk pre-orders (office catering): stream an order file, turn the
+#    orders into menu codes, find with one cumulative sum how many of them
+#    the stock can serve in file order, and commit that prefix at once
+#    through CoffeeMachine.order_batch.
+#      python bulk.py orders.jsonl                  (lines like {"type": "latte", "size": "large"})
+#      python bulk.py orders.csv --no-journal       (columns type,size[,quantity])
+# ============================================================
+
+import csv
+import functools
+import json
+import time
+from array import array
+from collections import namedtuple
+
+from coffeeprep import COFFEE_TYPES, SIZES, RECIPES, optional_numpy
+
+
+INGREDIENTS = ("water", "milk", "coffee_beans", "cups")            # Columns of the demand matrix
+MENU = [(t, s) for t in COFFEE_TYPES for s in SIZES]                # Position = menu code
+MENU_INDEX = {drink: code for code, drink in enumerate(MENU)}
+# Demand matrix, one row per menu code: base units of each ingredient (and one cup)
+DEMAND = [tuple(RECIPES[drink][0].get(key, 0) if key != "cups" else 1 for key in INGREDIENTS) for drink in MENU]
+PRICE_CENTS = [RECIPES[drink][2] for drink in MENU]
+CHUNK_SIZE = 1 << 20            # orders per batch when streaming a file
+INVALID = (None, None)          # what read_orders yields for a malformed row; encode counts it as invalid
+
+# fulfilled orders from the front of the batch; missing is the ingredient that stopped it (None if all fit)
+BatchResult = namedtuple("BatchResult", ["fulfilled", "rejected", "missing", "revenue_cents"])
+
+
+# ----------------------------- Reading ----------------------------- #
+def read_orders(path):
+    """
+    Yield (type, size) for every cup in a JSONL or CSV file; a quantity field
+    repeats the order. A malformed row (bad JSON, not an object, no type,
+    quantity not a positive integer) yields INVALID once instead of stopping
+    the file halfway.
+    """
+    with open(path, newline="") as f:
+        if path.endswith((".jsonl", ".json")):
+            rows = (_json_row(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        for row in rows:
+            order, quantity = _parse_row(row)
+            if order is None:
+                yield INVALID
+                continue
+            for _ in range(quantity):
+                yield order
+
+
+def _json_row(line):
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def _parse_row(row):
+    """((type, size), quantity) of a row, or (None, 0) if it is malformed."""
+    if not isinstance(row, dict):
+        return None, 0
+    coffee_type, size, quantity = row.get("type"), row.get("size") or "small", row.get("quantity")
+    if not isinstance(coffee_type, str) or not isinstance(size, str):
+        return None, 0
+    if quantity is None or quantity == "":
+        quantity = 1
+    elif isinstance(quantity, str):
+        try:
+            quantity = int(quantity)
+        except ValueError:
+            return None, 0
+    if type(quantity) is not int or quantity < 1:                   # Not bool or float either
+        return None, 0
+    return (coffee_type, size), quantity
+
+
+def encode(orders, chunk_size=CHUNK_SIZE, invalid=None):
+    """Group (type, size) pairs into arrays of menu codes. Unknown drinks and INVALID count in invalid["count"]."""
+    codes = array("B")
+    lookup = MENU_INDEX.get
+    for order in orders:
+        code = lookup(order)
+        if code is None:
+            if invalid is not None:
+                invalid["count"] = invalid.get("count", 0) + 1
+            continue
+        codes.append(code)
+        if len(codes) >= chunk_size:
+            yield codes
+            codes = array("B")
+    if codes:
+        yield codes
+
+
+# ----------------------------- Feasibility ----------------------------- #
+'''
+The stock serves orders in file order until one of them does not fit. With
+NumPy the check is demand[codes].cumsum(axis=0) <= stock, so the answer is
+the first row where any tank goes over. Without NumPy the same scan runs in
+a plain loop over precomputed tuples.
+'''
+def fulfilled_prefix(codes, levels):
+    """(how many of the codes fit in levels, per-ingredient total used, ingredient that ran out or None)."""
+    if not len(codes):
+        return 0, (0,) * len(INGREDIENTS), None
+    np = optional_numpy()
+    if np is not None:
+        return _prefix_numpy(np, codes, levels)
+    return _prefix_python(codes, levels)
+
+
+def _prefix_numpy(np, codes, levels):
+    used = _demand_np()[np.frombuffer(codes, dtype=np.uint8)].cumsum(axis=0)
+    over = used > np.asarray(levels, dtype=np.int64)
+    bad = over.any(axis=1)
+    n = int(bad.argmax()) if bad[-1] else len(codes)                # cumsum only grows: bad is monotonic
+    if n < len(codes):
+        missing = INGREDIENTS[int(over[n].argmax())]
+    else:
+        missing = None
+    total = tuple(int(v) for v in used[n - 1]) if n else (0,) * len(INGREDIENTS)
+    return n, total, missing
+
+
+def _prefix_python(codes, levels):
+    left = list(levels)
+    water, milk, beans, cups = left
+    demand = DEMAND
+    for n, code in enumerate(codes):
+        w, m, b, c = demand[code]
+        if w > water or m > milk or b > beans or c > cups:
+            missing = next(key for key, need, have in zip(INGREDIENTS, demand[code], (water, milk, beans, cups))
+                           if need > have)
+            return n, _used(left, (water, milk, beans, cups)), missing
+        water -= w
+        milk -= m
+        beans -= b
+        cups -= c
+    return len(codes), _used(left, (water, milk, beans, cups)), None
+
+
+def _used(before, after):
+    return tuple(b - a for b, a in zip(before, after))
+
+
+def menu_counts(codes):
+    """How many times each menu code appears (index = code)."""
+    np = optional_numpy()
+    if np is not None:
+        return [int(c) for c in np.bincount(np.frombuffer(codes, dtype=np.uint8), minlength=len(MENU))]
+    counts = [0] * len(MENU)
+    for code in codes:
+        counts[code] += 1
+    return counts
+
+
+@functools.lru_cache(maxsize=None)
+def _demand_np():
+    np = optional_numpy()
+    return np.array(DEMAND, dtype=np.int64)
+
+
+# ----------------------------- CLI ----------------------------- #
+def ingest(machine, path, chunk_size=CHUNK_SIZE):
+    """Stream a file into machine until the stock runs out. Returns a summary dict."""
+    invalid = {}
+    fulfilled = rejected = revenue = 0
+    missing = None
+    t0 = time.perf_counter()
+    for codes in encode(read_orders(path), chunk_size, invalid):
+        if missing is not None:                                     # Out of stock: only count the rest
+            rejected += len(codes)
+            continue
+        result = machine.order_batch(codes)
+        fulfilled += result.fulfilled
+        rejected += result.rejected
+        revenue += result.revenue_cents
+        missing = result.missing
+    return {"fulfilled": fulfilled, "rejected": rejected, "invalid": invalid.get("count", 0),
+            "missing": missing, "revenue_cents": revenue, "seconds": time.perf_counter() - t0}
+
+
+def main():
+    import argparse
+    from coffeeprep import format_cents
+    from engine import CoffeeMachine
+
+    parser = argparse.ArgumentParser(description="Serve a bulk pre-order file in one go")
+    parser.add_argument("path", help="JSONL or CSV file with type,size[,quantity]")
+    parser.add_argument("--data", default="data", help="journal directory of the machine to serve from")
+    parser.add_argument("--no-journal", action="store_true", help="serve from a fresh in-memory machine")
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="orders per committed batch")
+    args = parser.parse_args()
+
+    if args.no_journal:
+        machine = CoffeeMachine()
+    else:
+        from journal import open_machine
+        machine = open_machine(args.data)
+    try:
+        summary = ingest(machine, args.path, args.chunk)
+    finally:
+        machine.close()
+    orders = summary["fulfilled"] + summary["rejected"]
+    print(f"Served {summary['fulfilled']} of {orders} orders (${format_cents(summary['revenue_cents'])}) "
+          f"in {summary['seconds']:.2f} s")
+    if summary["missing"]:
+        print(f"Stopped when {summary['missing']} ran out; {summary['rejected']} orders not served")
+    if summary["invalid"]:
+        print(f"Skipped {summary['invalid']} malformed rows or orders for unknown drinks")
+
+
+if __name__ == "__main__":
+    main()
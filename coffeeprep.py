@@ -11,19 +11,121 @@
 #    This project was created for learning purposes. 
 # ============================================================
 
+import functools
+import threading
+from collections import namedtuple
+from collections.abc import MutableMapping
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from types import MappingProxyType
+
 SIZE_INCREMENT = {
     "small": 1.0,                                                   # Base size (no increment)
     "medium": 1.2,                                                  # 20% more ingredients and price
     "large": 1.5,                                                   # 50% more ingredients and price
 }
 
+SIZE_PERMILLE = {size: round(factor * 1000) for size, factor in SIZE_INCREMENT.items()}  # Exact integer factors
+
+COFFEE_TYPES = ("espresso", "latte", "capuccino")                   # Position = drink code in the sales ledger
+SIZES = tuple(SIZE_INCREMENT)                                       # Position = size code in the sales ledger
+
+'''
+Stock is stored in integer base units and money in integer cents, so sums
+are exact and reproducible. UNITS maps each stock key to the unit shown to
+people and how many base units make one of it (beans are kept in 0.1 g).
+Scaling by size rounds half up: amount * permille / 1000, to the nearest unit.
+'''
+UNITS = {
+    "water": ("ml", 1),
+    "milk": ("ml", 1),
+    "coffee_beans": ("g", 10),
+    "cups": ("units", 1),
+}
+
+def scale_half_up(value, permille):
+    """value * permille / 1000 rounded half up, in pure integer arithmetic (value >= 0)."""
+    return (value * permille + 500) // 1000
+
+def _half_up(amount, factor):
+    try:
+        value = Decimal(str(amount))                                # str(): 2.675 stays 2.675, not 2.67499...
+    except InvalidOperation:                                        # "abc": not a ValueError by itself
+        raise ValueError("Please enter a number.") from None
+    if not value.is_finite():
+        raise ValueError("Please enter a number.")
+    return int((value * factor).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+def to_base(ingredient, amount):
+    """Human amount (ml, g, units) -> integer base units, rounded half up."""
+    return _half_up(amount, UNITS.get(ingredient, ("", 1))[1])
+
+def to_cents(amount):
+    """Money amount (dollars as int, float or str) -> integer cents, rounded half up."""
+    return _half_up(amount, 100)
+
+def format_amount(ingredient, value):
+    """Integer base units -> '1580 ml', '49.5 g'."""
+    unit, factor = UNITS.get(ingredient, ("units", 1))
+    if factor == 1:
+        return f"{value} {unit}"
+    whole, part = divmod(value, factor)
+    if not part:
+        return f"{whole} {unit}"
+    return f"{whole}.{part:0{len(str(factor)) - 1}d}".rstrip("0") + f" {unit}"
+
+def format_cents(cents):
+    """Integer cents -> '12.50'."""
+    sign = "-" if cents < 0 else ""
+    whole, part = divmod(abs(cents), 100)
+    return f"{sign}{whole}.{part:02d}"
+
+@functools.lru_cache(maxsize=None)
+def optional_numpy():
+    """NumPy, or None when it is not installed (callers keep a pure-Python path). Imported on first use: ~100 ms."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+'''
+The BASE_RECIPES dictionary defines the default ingredient amounts
+(water, milk, and coffee beans, price) for each coffee type. These values
+represent the recipe for the "small" size, in ml, grams and dollars. If a
+larger size is chosen, the ingredient amounts and price are scaled
+proportionally by 20% or 50% (see build_recipe for the integer units).
+'''
+BASE_RECIPES = {
+    "espresso":     {"water": 250, "milk": 0, "coffee_beans": 16, "price": 4},
+    "latte":        {"water": 350, "milk": 75, "coffee_beans": 20, "price": 7},
+    "capuccino":    {"water": 200, "milk": 100, "coffee_beans": 12, "price": 6}
+}
+
+def build_recipe(type, size):
+    recipe = BASE_RECIPES.get(type)
+    if not recipe:
+        raise ValueError(f"Type of coffee '{type}' not found.")
+    permille = SIZE_PERMILLE.get(size, 1000)                        # Unknown sizes fall back to "small"
+    ingredients = {k: scale_half_up(to_base(k, v), permille)        # Scaled copy without "price"
+                   for k, v in recipe.items() if k != "price"}
+    base_price_cents = to_cents(recipe["price"])
+    return MappingProxyType(ingredients), base_price_cents, scale_half_up(base_price_cents, permille)
+
+# Recipe table computed once at import: (type, size) -> (ingredients, base_price_cents, price_cents)
+RECIPES = {(type, size): build_recipe(type, size) for type in COFFEE_TYPES for size in SIZES}
+
+# Result of StockIngredients.reserve: missing is the first ingredient that ran short (None if ok)
+ReserveResult = namedtuple("ReserveResult", ["ok", "missing", "message"])
+RESERVED = ReserveResult(True, None, "Ingredients available")      # Shared: a successful reserve allocates nothing
+
 #This class stores the amount of ingredients the machine has
 class StockIngredients:                                         
     def __init__(self):
+        self._lock = threading.Lock()                               # Serializes every change to the stock
         self.stock = {                                              # Data structure (dictionary)
             "water": 2000,                                          # Unit: mililiters
             "milk": 1000,                                           # Unit: mililiters
-            "coffee_beans": 500,                                    # Unit: grams
+            "coffee_beans": 5000,                                   # Unit: tenths of a gram (500 g)
             "cups": 100,                                            # Unit: units
         }
 
@@ -34,55 +136,207 @@ class StockIngredients:
         return True, "Ingredients available"
     
     def take_ingredients(self, ingredients_needed):
-        for ingredient, amount in ingredients_needed.items():
-            if ingredient in self.stock:
-                self.stock[ingredient] -= amount                    # Operators used
+        with self._lock:
+            for ingredient, amount in ingredients_needed.items():
+                if ingredient in self.stock:
+                    self.stock[ingredient] -= amount                # Operators used
+
+    '''
+    reserve checks and deducts every ingredient plus the cups in one atomic,
+    all-or-nothing step, so several order sources can share one stock
+    without it ever going negative. It deducts as it checks, in one pass,
+    and puts back what it took if a later ingredient runs short.
+    '''
+    def reserve(self, ingredients_needed, cups=1):
+        stock = self.stock
+        with self._lock:
+            if stock.get("cups", 0) < cups:
+                return ReserveResult(False, "cups", "No cups available. Please refill the machine.")
+            for ingredient, amount in ingredients_needed.items():
+                level = stock.get(ingredient, 0)
+                if level < amount:
+                    for taken, back in ingredients_needed.items():
+                        if taken == ingredient:
+                            break
+                        if back:
+                            stock[taken] += back
+                    return ReserveResult(False, ingredient,
+                                         f"There's not enough {ingredient} in the machine, try another coffee")
+                if amount:
+                    stock[ingredient] = level - amount
+            stock["cups"] -= cups
+        return RESERVED
+
+    def refill_to(self, ingredient, level):
+        """Top one ingredient up to level. Returns the amount added (0 if already there)."""
+        with self._lock:
+            current = self.stock.get(ingredient, 0)
+            if current >= level:
+                return 0
+            self.stock[ingredient] = level
+        return level - current
 
     def add_ingredients(self, ingredient, amount):
-        if ingredient in self.stock:
-            self.stock[ingredient] += amount
-        else:
-            self.stock[ingredient] = amount
+        with self._lock:
+            if ingredient in self.stock:
+                self.stock[ingredient] += amount
+            else:
+                self.stock[ingredient] = amount
         print(f"{ingredient} re-filled with {amount} units")
 
+    def fork(self):
+        """Branch of this stock as it is now, for what-if questions (see StockBranch)."""
+        return StockBranch(self)
+
+
+#This class is the stock of a branch: the parent's levels at fork time plus the branch's own changes
+class _BranchLevels(MutableMapping):
+    __slots__ = ("_base", "_values")
+
+    def __init__(self, levels):
+        self.reset(levels)
+
+    def reset(self, levels):
+        self._base = dict(levels)                                   # Parent levels at fork (or commit) time
+        self._values = dict(self._base)                             # Branch levels (base + own changes)
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def get(self, key, default=None):
+        return self._values.get(key, default)
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def __setitem__(self, key, value):
+        self._base.setdefault(key, 0)
+        self._values[key] = value
+
+    def __delitem__(self, key):
+        raise TypeError("stock ingredients cannot be removed")
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def deltas(self):
+        return {key: value - self._base[key] for key, value in self._values.items() if value != self._base[key]}
+
+
+#This class is a speculative copy of a stock that only stores what it changed
+class StockBranch(StockIngredients):
+    '''
+    fork() copies the parent's levels under the parent's lock, so the branch
+    is a consistent snapshot of one moment. A stock has a handful of keys, so
+    the copy costs about as much as one order. After that the branch never
+    touches the parent until commit(), and the parent keeps serving. Every
+    StockIngredients method works on the branch. Branches can be forked
+    again, and many can run at once.
+
+    commit() applies the branch's net changes to the parent in one
+    all-or-nothing step, checked against the parent's levels at that moment.
+    Committing into a machine's live stock bypasses its journal and ledger,
+    so real orders still go through CoffeeMachine.order. Locks are always
+    taken child first, then parent.
+    '''
+    def __init__(self, parent):
+        self._lock = threading.Lock()
+        self.parent = parent
+        with parent._lock:
+            self.stock = _BranchLevels(parent.stock)
+
+    def changes(self):
+        """{ingredient: net change} made in this branch so far."""
+        with self._lock:
+            return self.stock.deltas()
+
+    def commit(self):
+        """Apply the changes to the parent. Returns a ReserveResult; on success the branch starts over from the parent."""
+        with self._lock:
+            deltas = self.stock.deltas()
+            parent = self.parent
+            with parent._lock:
+                for ingredient, delta in deltas.items():
+                    if delta < 0 and parent.stock.get(ingredient, 0) + delta < 0:
+                        return ReserveResult(False, ingredient,
+                                             f"There's not enough {ingredient} in the machine anymore")
+                for ingredient, delta in deltas.items():
+                    parent.stock[ingredient] = parent.stock.get(ingredient, 0) + delta
+                self.stock.reset(parent.stock)
+        return ReserveResult(True, None, "Changes committed")
+
+    def discard(self):
+        """Drop the changes; the branch starts over from the parent's current levels."""
+        with self._lock, self.parent._lock:
+            self.stock.reset(self.parent.stock)
+
 #This class stores the properties of the coffee
 class Coffee:
-    def __init__(self, type, size, ingredients=None):
-        self.type = type
-        self.size = size
-        self.ingredients = ingredients if ingredients else self.default_ingredients()  
-        self.price = self.calculate_price()
-
     '''
-    The base_ingredients dictionary defines the default ingredient amounts 
-    (water, milk, and coffee beans, price) for each coffee type. These values 
-    represent the recipe for the "small" size. If a larger size is chosen, 
-    the ingredient amounts and price are scaled proportionally by 20% or 50%.
+    Coffees are immutable flyweights: Coffee("latte", "large") always returns
+    the same shared object built from the RECIPES table, so ordering does not
+    allocate anything. Passing ingredients= (in base units) creates a separate
+    custom coffee that keeps the recipe price. Prices are integer cents;
+    price and base_price give dollars for display.
     '''
+    __slots__ = ("type", "size", "ingredients", "base_price_cents", "price_cents")
+    _interned = {}                                                  # (type, size) -> shared Coffee
+
+    def __new__(cls, type, size, ingredients=None):
+        if ingredients is None:
+            coffee = cls._interned.get((type, size))
+            if coffee is not None:
+                return coffee
+
+        recipe = RECIPES.get((type, size)) or build_recipe(type, size)
+        coffee = object.__new__(cls)
+        object.__setattr__(coffee, "type", type)
+        object.__setattr__(coffee, "size", size)
+        object.__setattr__(coffee, "ingredients",
+                           recipe[0] if ingredients is None else MappingProxyType(dict(ingredients)))
+        object.__setattr__(coffee, "base_price_cents", recipe[1])
+        object.__setattr__(coffee, "price_cents", recipe[2])
+        if ingredients is None and (type, size) in RECIPES:         # Only intern the table entries
+            cls._interned[(type, size)] = coffee
+        return coffee
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Coffee objects are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Coffee objects are immutable")
+
+    def __reduce__(self):
+        custom = self.ingredients is not RECIPES.get((self.type, self.size), (None,))[0]
+        return (Coffee, (self.type, self.size, dict(self.ingredients) if custom else None))
+
+    def __repr__(self):
+        return f"Coffee({self.type!r}, {self.size!r})"
+
+    @property
+    def price(self):
+        return self.price_cents / 100
+
+    @property
+    def base_price(self):
+        return self.base_price_cents / 100
+
     def default_ingredients(self):
-        base_ingredients = {
-            "espresso":     {"water": 250, "milk": 0, "coffee_beans": 16, "price": 4},
-            "latte":        {"water": 350, "milk": 75, "coffee_beans": 20, "price": 7},
-            "capuccino":    {"water": 200, "milk": 100, "coffee_beans": 12, "price": 6}
-            }
-        
-        recipe = base_ingredients.get(self.type)
-        if not recipe:
-            raise ValueError(f"Type of coffee '{self.type}' not found.")
-        
-        self.base_price = recipe["price"]
-        recipe = {k: v for k, v in recipe.items()                  # Reconstruction of the dictionary by  key-value iteration 
-                  if k != "price"}                                 # Removed "price"
-        return self.adjust_ingredients_size(recipe)
+        return (RECIPES.get((self.type, self.size)) or build_recipe(self.type, self.size))[0]
 
     def adjust_ingredients_size(self, base_ingredients):
-        multiplier = SIZE_INCREMENT.get(self.size, 1.0)             # Used SIZE_INCREMENT declared at the top
-        adjusted_ingredients = {ingredient: amount * multiplier for ingredient, amount in base_ingredients.items()}
+        permille = SIZE_PERMILLE.get(self.size, 1000)               # Integer version of SIZE_INCREMENT
+        adjusted_ingredients = {ingredient: scale_half_up(amount, permille)
+                                for ingredient, amount in base_ingredients.items()}
         return adjusted_ingredients
-    
+
     def calculate_price(self):
-        factor = SIZE_INCREMENT.get(self.size, 1.0)
-        return round(self.base_price * factor, 2)
+        """Price in cents for this size."""
+        return scale_half_up(self.base_price_cents, SIZE_PERMILLE.get(self.size, 1000))
 
     def display_coffee_info(self):
-        return f"Café: {self.type} | Tamaño: {self.size} | Precio: {self.price} u | Ingredientes: {self.ingredients}"
\ No newline at end of file
+        ingredients = ", ".join(f"{k} {format_amount(k, v)}" for k, v in self.ingredients.items())
+        return f"Café: {self.type} | Tamaño: {self.size} | Precio: {format_cents(self.price_cents)} u | Ingredientes: {ingredients}"
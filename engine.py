@@ -0,0 +1,306 @@
+# ============================================================
+#  Project: Coffee Machine Simulation
+#  File: engine.py
+#
+#  Author(s): Sofia Vanessa and Ximena Isaac
+#
+#  Credits:
+#    - Functional design and logic implemented by both authors.
+#
+#  Notes:
+#    This project was created for learning purposes.
+#    Headless machine logic: no tkinter import here, so it can run
+#    in scripts, servers and tests.
+# ============================================================
+
+import threading
+import time
+from array import array
+from collections import namedtuple
+
+from bulk import DEMAND, INGREDIENTS, MENU, PRICE_CENTS, BatchResult, fulfilled_prefix, menu_counts
+from coffeeprep import COFFEE_TYPES, RECIPES, SIZES, Coffee, StockIngredients, to_base, to_cents
+from forecast import DepletionForecaster
+from metrics import NULL_METRICS
+from sales import SalesLedger, SalesRollup, SalesTotals
+
+# ------------------------------ Capacities (match CLI) ------------------------------ #
+MAX_WATER = 2000    # ml
+MAX_MILK = 1000     # ml
+MAX_BEANS = 500     # g
+MAX_CUPS = 100      # units
+
+# Tank sizes in the integer base units the stock is kept in (see coffeeprep.UNITS)
+CAPACITY = {
+    "water": to_base("water", MAX_WATER),
+    "milk": to_base("milk", MAX_MILK),
+    "coffee_beans": to_base("coffee_beans", MAX_BEANS),
+    "cups": to_base("cups", MAX_CUPS),
+}
+
+ANALYTICS_CHUNK_ROWS = 1 << 16  # ledger rows the rollup and forecaster take in per step when catching up
+
+# Per menu code: {ingredient: base units} one order takes, cup included (what the forecaster is fed)
+MENU_USAGE = [dict(zip(INGREDIENTS, demand)) for demand in DEMAND]
+
+# ok is False when the order was rejected; reason is then "invalid" or the missing ingredient
+OrderResult = namedtuple("OrderResult", ["ok", "coffee", "reason", "message"])
+# results: one OrderResult per order; runs_out: {ingredient: index of the first order it could not cover}
+WhatIf = namedtuple("WhatIf", ["results", "runs_out", "left", "branch"])
+
+
+def _menu_coffee(coffee_type, size):
+    """
+    The Coffee for a menu entry. Coffee() alone prices an unknown size like a
+    small one, but the ledger and journal only know the menu sizes, so
+    anything off the menu is rejected before it can touch the stock.
+    """
+    try:
+        on_menu = (coffee_type, size) in RECIPES
+    except TypeError:                                               # Unhashable input, e.g. a list from JSON
+        on_menu = False
+    if not on_menu:
+        if coffee_type not in COFFEE_TYPES:
+            raise ValueError(f"Type of coffee '{coffee_type}' not found.")
+        raise ValueError(f"Size '{size}' not found.")
+    return Coffee(coffee_type, size)
+
+
+#This class is the whole coffee machine: stock, money, sales and refills
+class CoffeeMachine:
+    def __init__(self, stock=None, capacity=None, metrics=None):
+        self.stock = stock if stock is not None else StockIngredients()
+        self.capacity = dict(capacity or CAPACITY)
+        self.money_cents = 0                                        # Balance, exact integer cents
+        self.ledger = SalesLedger()                                 # Columnar sales history
+        self.totals = SalesTotals()                                 # Running count/revenue per (type, size)
+        self.rollup = SalesRollup()                                 # Per-minute/hour/day buckets (see sales_rollup)
+        self.journal = None                                         # Optional write-ahead log (journal.py)
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        self.forecaster = DepletionForecaster(self.capacity)        # Consumption rates -> time to empty
+        self._optimizer = None                                      # MenuOptimizer, built on first use
+        self._lock = threading.Lock()                               # Keeps stock, money, ledger and totals in step
+        self._rolled_up = 0                                         # Ledger rows already in the rollup...
+        self._forecast_rows = 0                                     # ...and already fed to the forecaster
+        self._analytics_lock = threading.Lock()                     # Taken after _lock, never before it
+
+    # ----------------------------- Orders ----------------------------- #
+    def order(self, coffee_type, size, timestamp=None):
+        """Make one coffee: reserve ingredients and cup atomically, then record the sale."""
+        timed = self.metrics.enabled                                # Plain flag checks: ~free when disabled
+        if timed:
+            t_start = time.perf_counter()
+        try:
+            coffee = _menu_coffee(coffee_type, size)
+        except ValueError as e:
+            result = OrderResult(False, None, "invalid", str(e))
+            if timed:
+                self._observe_order(result, t_start)
+            return result
+        if timed:
+            t_coffee = time.perf_counter()
+
+        with self._lock:
+            reserved = self.stock.reserve(coffee.ingredients)
+            if timed:
+                t_reserve = time.perf_counter()
+            if not reserved.ok:
+                result = OrderResult(False, coffee, reserved.missing, reserved.message)
+                if timed:
+                    self._observe_order(result, t_start, t_coffee, t_reserve)
+                return result
+            if timestamp is None:
+                timestamp = time.time()
+            self.ledger.append(coffee_type, size, coffee.price_cents, timestamp)
+            self.totals.add(coffee_type, size, coffee.price_cents)
+            self.money_cents += coffee.price_cents
+            if self.journal is not None:
+                self.journal.order(coffee_type, size, coffee.price_cents, timestamp)
+        if self.journal is not None:
+            self.journal.maybe_snapshot()
+        result = OrderResult(True, coffee, None, reserved.message)
+        if timed:
+            self._observe_order(result, t_start, t_coffee, t_reserve, time.perf_counter())
+        return result
+
+    def order_batch(self, codes, timestamp=None):
+        """
+        Serve bulk menu codes (see bulk.MENU) in order until one does not fit,
+        and commit that whole prefix at once: stock, ledger, totals, money and
+        journal are updated together under the lock. Returns a bulk.BatchResult.
+        """
+        if not isinstance(codes, array):
+            codes = array("B", codes)
+        if timestamp is None:
+            timestamp = time.time()
+        with self.metrics.span("order_batch_seconds"), self._lock:
+            with self.stock._lock:                                  # Same lock order as journal snapshots
+                stock = self.stock.stock
+                n, used, missing = fulfilled_prefix(codes, [stock.get(key, 0) for key in INGREDIENTS])
+                for key, amount in zip(INGREDIENTS, used):
+                    stock[key] = stock.get(key, 0) - amount
+            served = codes[:n]
+            counts = menu_counts(served)
+            by_drink = {MENU[code]: (count, count * PRICE_CENTS[code]) for code, count in enumerate(counts) if count}
+            revenue = sum(cents for _, cents in by_drink.values())
+            if n:
+                self.ledger.extend_menu_codes(served, PRICE_CENTS, timestamp)
+                self.totals.add_counts(by_drink)
+                self.money_cents += revenue
+                if self.journal is not None:
+                    self.journal.orders(served, PRICE_CENTS, timestamp)
+        if self.journal is not None:
+            self.journal.maybe_snapshot()
+        if n:
+            self.metrics.inc("orders_total", n)
+        if missing is not None:
+            self.metrics.inc("order_failures_total", len(codes) - n, reason=missing)
+        return BatchResult(n, len(codes) - n, missing, revenue)
+
+    def _observe_order(self, result, t_start, t_coffee=None, t_reserve=None, t_record=None):
+        metrics = self.metrics
+        t_end = t_record or t_reserve or time.perf_counter()
+        metrics.observe("order_seconds", t_end - t_start)
+        if t_coffee is not None:
+            metrics.observe("order_coffee_seconds", t_coffee - t_start)
+        if t_reserve is not None:
+            metrics.observe("order_reserve_seconds", t_reserve - t_coffee)       # check + deduction
+        if t_record is not None:
+            metrics.observe("order_record_seconds", t_record - t_reserve)        # ledger, totals, journal
+        if result.ok:
+            metrics.inc("orders_total")
+        else:
+            metrics.inc("order_failures_total", reason=result.reason)
+
+    # ----------------------------- Refills ----------------------------- #
+    def refill(self, ingredient):
+        """Fill one tank up to its capacity. Returns the amount added (0 if it was already full)."""
+        with self.metrics.span("refill_seconds"):
+            added = self._refill(ingredient)
+        if added:
+            self.metrics.inc("refills_total", ingredient=ingredient)
+        return added
+
+    def _refill(self, ingredient):
+        with self._lock:
+            added = self.stock.refill_to(ingredient, self.capacity[ingredient])
+            if added and self.journal is not None:
+                self.journal.refill(ingredient, added)
+        if self.journal is not None:
+            self.journal.maybe_snapshot()
+        return added
+
+    def fill_all(self):
+        return {ingredient: self.refill(ingredient) for ingredient in self.capacity}
+
+    # ----------------------------- Analytics ----------------------------- #
+    '''
+    An order only appends to the ledger. The rollup and the forecaster catch
+    up from the rows added since they were last read, in one pass per read,
+    so the order path pays for neither. Rows are complete once their
+    timestamp is in: SalesLedger appends that column last.
+    '''
+    def sync_analytics(self):
+        """Bring the rollup and the forecaster up to date with the ledger."""
+        with self._analytics_lock:
+            ledger = self.ledger
+            rows = len(ledger.timestamp)
+            nsizes = len(SIZES)
+            for start in range(self._rolled_up, rows, ANALYTICS_CHUNK_ROWS):     # Chunks: no long C calls
+                self.rollup.add_rows(ledger, start, min(start + ANALYTICS_CHUNK_ROWS, rows))
+            self._rolled_up = max(self._rolled_up, rows)
+            for start in range(self._forecast_rows, rows, ANALYTICS_CHUNK_ROWS):
+                stop = min(start + ANALYTICS_CHUNK_ROWS, rows)
+                codes = [drink * nsizes + size for drink, size in zip(ledger.drink[start:stop], ledger.size[start:stop])]
+                self.forecaster.consume_many(ledger.timestamp[start:stop], codes, MENU_USAGE)
+            self._forecast_rows = max(self._forecast_rows, rows)
+
+    def sales_rollup(self):
+        """The SalesRollup, caught up with every sale so far."""
+        self.sync_analytics()
+        return self.rollup
+
+    def _rollup_state(self):
+        """(ledger rows the rollup covers, its bytes) for a journal snapshot."""
+        with self._analytics_lock:
+            return self._rolled_up, self.rollup.to_bytes()
+
+    def _analytics_restored(self, rolled_up):
+        """After journal recovery: the rollup covers the first rolled_up sales; forecasting starts now."""
+        with self._analytics_lock:
+            self._rolled_up = rolled_up
+            self._forecast_rows = len(self.ledger)
+
+    def forecast(self, now=None, keys=None):
+        """Per ingredient: level, use per hour, seconds until empty and whether to refill now."""
+        self.sync_analytics()
+        with self._lock, self._analytics_lock:
+            return self.forecaster.forecast(self.stock.stock, time.time() if now is None else now, keys)
+
+    def refill_alerts(self, now=None):
+        """Ingredients that will run out before an operator could refill them."""
+        return [key for key, forecast in self.forecast(now).items() if forecast.alert]
+
+    def best_menu(self):
+        """Revenue-maximizing drink mix for the current stock (optimizer.MenuPlan, cached per stock level)."""
+        if self._optimizer is None:
+            from optimizer import MenuOptimizer                     # deferred: builds its tables on first use
+            self._optimizer = MenuOptimizer()
+        with self._lock:
+            stock = dict(self.stock.stock)
+        return self._optimizer.optimize(stock)
+
+    def what_if(self, orders, stock=None):
+        """
+        Try (type, size) orders on a branch of the stock (or of `stock`,
+        another branch) forked once up front, so every order sees the same
+        starting levels and the live machine is never touched or locked past
+        the fork. The returned branch can be forked further or discarded.
+        """
+        branch = (stock if stock is not None else self.stock).fork()
+        results = []
+        runs_out = {}
+        for i, (coffee_type, size) in enumerate(orders):
+            try:
+                coffee = _menu_coffee(coffee_type, size)
+            except ValueError as e:
+                results.append(OrderResult(False, None, "invalid", str(e)))
+                continue
+            reserved = branch.reserve(coffee.ingredients)
+            results.append(OrderResult(reserved.ok, coffee, reserved.missing, reserved.message))
+            if not reserved.ok:
+                runs_out.setdefault(reserved.missing, i)
+        left = {key: branch.stock.get(key, 0) for key in self.capacity}
+        return WhatIf(results, runs_out, left, branch)
+
+    # ----------------------------- Money ----------------------------- #
+    @property
+    def money(self):
+        """Balance in dollars, for display. The exact value is money_cents."""
+        return self.money_cents / 100
+
+    def withdraw(self, amount):
+        """Take `amount` dollars (rounded half up to the cent). Returns the new balance in dollars."""
+        self._take_money(to_cents(amount), "Insufficient funds.", "withdraw")
+        return self.money
+
+    def donate(self, amount):
+        self._take_money(to_cents(amount), "Insufficient funds for donation.", "donate")
+        return self.money
+
+    def _take_money(self, cents, insufficient_message, record):
+        with self._lock:
+            if cents > self.money_cents:
+                raise ValueError(insufficient_message)
+            if cents < 0:
+                raise ValueError("Please enter a positive number.")
+            self.money_cents -= cents
+            if self.journal is not None:
+                getattr(self.journal, record)(cents)
+        if self.journal is not None:
+            self.journal.maybe_snapshot()
+
+    def close(self):
+        """Flush and close the journal, if any."""
+        if self.journal is not None:
+            self.journal.close()
@@ -0,0 +1,208 @@
+# ============================================================
+#  Project: Coffee Machine Simulation
+#  File: export.py
+#
+#  Author(s): Sofia Vanessa and Ximena Isaac
+#
+#  Credits:
+#    - Functional design and logic implemented by both authors.
+#
+#  Notes:
+#    This project was created for learning purposes.
+#    Streaming sales export: the ledger is copied out one chunk at a time
+#    (holding the machine lock only for that copy), so memory stays
+#    constant and orders keep being served during a long export. The
+#    command line reads the journal the same way, chunk by chunk from the
+#    snapshot and then the log tail (journal.iter_sales).
+#
+#      sales.csv     time,type,size,price   (time in epoch seconds)
+#      sales.cms     8-byte magic, then blocks of
+#                    uint32 rows | drink u8[rows] | size u8[rows] |
+#                    price_cents i64[rows] | timestamp f64[rows]
+#
+#      python export.py sales.csv                   (journal in data/)
+#      python export.py sales.cms --since 2026-10-17T06:00 --until 2026-10-17T12:00
+#      python export.py --read sales.cms            (print what a file holds)
+# ============================================================
+
+import argparse
+import contextlib
+import csv
+import struct
+import sys
+import time
+from array import array
+from datetime import datetime
+
+from coffeeprep import COFFEE_TYPES, SIZES, format_cents, optional_numpy
+from sales import Sale, SalesLedger
+
+CHUNK_ROWS = 1 << 16
+COLUMNS_MAGIC = b"CMSLS\x00\x01\x00"
+BLOCK_HEADER = struct.Struct("<I")
+CSV_HEADER = ("time", "type", "size", "price")
+COLUMNS = (("drink", "B"), ("size", "B"), ("price_cents", "q"), ("timestamp", "d"))
+
+
+# ----------------------------- Reading the ledger ----------------------------- #
+def iter_chunks(ledger, chunk_rows=CHUNK_ROWS, lock=None):
+    """
+    Yield the ledger as small SalesLedger chunks. Only the sales present
+    when the export starts are included; each chunk copy happens under
+    `lock` (the machine lock) so a writer never sees a half-appended row.
+    """
+    guard = lock if lock is not None else contextlib.nullcontext()
+    with guard:
+        total = len(ledger)
+    for first in range(0, total, chunk_rows):
+        with guard:
+            chunk = ledger[first:min(first + chunk_rows, total)]
+        yield chunk
+
+
+def in_range(chunks, start=None, end=None):
+    """Keep the sales with start <= timestamp < end, dropping chunks left empty."""
+    for chunk in chunks:
+        if start is not None or end is not None:
+            chunk = _filter(chunk, start, end)
+            if not len(chunk):
+                continue
+        yield chunk
+
+
+def _filter(chunk, start, end):
+    lo = float("-inf") if start is None else start
+    hi = float("inf") if end is None else end
+    np = optional_numpy()
+    if np is not None:
+        ts = np.frombuffer(chunk.timestamp, dtype=np.float64)
+        keep = np.flatnonzero((ts >= lo) & (ts < hi))
+        if len(keep) == len(ts):
+            return chunk
+        out = SalesLedger()
+        for name, typecode in COLUMNS:
+            column = np.frombuffer(getattr(chunk, name), dtype=typecode)[keep]
+            setattr(out, name, array(typecode, column.tobytes()))
+        return out
+    keep = [i for i, ts in enumerate(chunk.timestamp) if lo <= ts < hi]
+    if len(keep) == len(chunk):
+        return chunk
+    out = SalesLedger()
+    for name, typecode in COLUMNS:
+        column = getattr(chunk, name)
+        setattr(out, name, array(typecode, [column[i] for i in keep]))
+    return out
+
+
+# ----------------------------- Writers ----------------------------- #
+def write_csv(chunks, path):
+    """Write chunks as CSV. Returns the number of rows."""
+    tails = {}                                                      # (drink, size, cents) -> ",latte,small,7.00\n"
+    rows = 0
+    with open(path, "w", newline="") as f:
+        f.write(",".join(CSV_HEADER) + "\n")
+        for chunk in chunks:
+            keys = list(zip(chunk.drink, chunk.size, chunk.price_cents))
+            for key in set(keys) - tails.keys():                    # Only a handful of distinct rows besides time
+                drink, size, cents = key
+                tails[key] = f",{COFFEE_TYPES[drink]},{SIZES[size]},{format_cents(cents)}\n"
+            f.write("".join(map(str.__add__, map(repr, chunk.timestamp), map(tails.__getitem__, keys))))
+            rows += len(chunk)
+    return rows
+
+
+def write_columns(chunks, path):
+    """Write chunks to the binary columnar format. Returns the number of rows."""
+    rows = 0
+    with open(path, "wb") as f:
+        f.write(COLUMNS_MAGIC)
+        for chunk in chunks:
+            f.write(BLOCK_HEADER.pack(len(chunk)))
+            for name, _ in COLUMNS:
+                f.write(getattr(chunk, name).tobytes())
+            rows += len(chunk)
+    return rows
+
+
+# ----------------------------- Readers ----------------------------- #
+def read_columns(path):
+    """Yield the blocks of a columnar file as SalesLedger chunks, one block in memory at a time."""
+    with open(path, "rb") as f:
+        if f.read(len(COLUMNS_MAGIC)) != COLUMNS_MAGIC:
+            raise ValueError(f"{path} is not a sales column file")
+        while True:
+            header = f.read(BLOCK_HEADER.size)
+            if not header:
+                return
+            (rows,) = BLOCK_HEADER.unpack(header)
+            chunk = SalesLedger()
+            for name, typecode in COLUMNS:
+                column = array(typecode)
+                column.fromfile(f, rows)
+                setattr(chunk, name, column)
+            yield chunk
+
+
+def read_csv(path):
+    """Yield the rows of an exported CSV as Sale tuples."""
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for ts, coffee_type, size, price in reader:
+            whole, _, part = price.partition(".")
+            cents = int(whole) * 100 + int(part.ljust(2, "0"))
+            yield Sale(coffee_type, size, cents, float(ts))
+
+
+def read_sales(path):
+    """Yield Sale tuples from either export format."""
+    if path.endswith(".csv"):
+        yield from read_csv(path)
+    else:
+        for chunk in read_columns(path):
+            yield from chunk
+
+
+def write(chunks, path):
+    """Write chunks to path (.csv or the columnar format). Returns the number of rows."""
+    return write_csv(chunks, path) if path.endswith(".csv") else write_columns(chunks, path)
+
+
+def export(machine, path, start=None, end=None, chunk_rows=CHUNK_ROWS):
+    """Export machine's sales to path. Returns the number of rows."""
+    return write(in_range(iter_chunks(machine.ledger, chunk_rows, lock=machine._lock), start, end), path)
+
+
+def _parse_time(text):
+    """Epoch seconds or an ISO date/time (local time)."""
+    try:
+        return float(text)
+    except ValueError:
+        return datetime.fromisoformat(text).timestamp()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the sales history")
+    parser.add_argument("path", help="output file: .csv, or anything else for the columnar format")
+    parser.add_argument("--data", default="data", help="journal directory to export from")
+    parser.add_argument("--since", type=_parse_time, default=None, help="first time to include")
+    parser.add_argument("--until", type=_parse_time, default=None, help="export sales before this time")
+    parser.add_argument("--chunk", type=int, default=CHUNK_ROWS, help="rows copied per chunk")
+    parser.add_argument("--read", action="store_true", help="read the file back and summarize it instead")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    if args.read:
+        rows = cents = 0
+        for sale in read_sales(args.path):
+            rows += 1
+            cents += sale.price_cents
+        print(f"{rows} sales, ${format_cents(cents)} ({time.perf_counter() - t0:.2f} s)")
+        return
+    from journal import iter_sales
+    rows = write(in_range(iter_sales(args.data, args.chunk), args.since, args.until), args.path)
+    print(f"Exported {rows} sales to {args.path} in {time.perf_counter() - t0:.2f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+# ============================================================
+#  Project: Coffee Machine Simulation
+#  File: fleet.py
+#
+#  Author(s): Sofia Vanessa and Ximena Isaac
+#
+#  Credits:
+#    - Functional design and logic implemented by both authors.
+#
+#  Notes:
+#    This project was created for learning purposes.
+#    Fleet of machines sharded over worker processes. The parent routes
+#    each order to the shard with the most capacity left for that drink
+#    (minus what is already queued there); inside the shard the worker
+#    picks the machine that can still make the most of it. Batches are
+#    pipelined, sales totals are merged from per-batch deltas, and
+#    plan_refill_route() orders the refill stops for a van.
+#      python fleet.py --machines 48 --workers 1,2,4 --orders 400000     (benchmark)
+# ============================================================
+
+import argparse
+import heapq
+import math
+import multiprocessing
+import os
+import random
+import time
+from array import array
+from collections import namedtuple
+
+from bulk import DEMAND, INGREDIENTS, MENU, MENU_INDEX
+from engine import CAPACITY, CoffeeMachine
+from sales import SalesTotals
+
+BATCH_SIZE = 8192               # orders routed per shard message
+QUEUE_WEIGHT = 1.0              # drinks of capacity one queued order is worth when choosing a shard
+ROUTE_SLACK = 16                # a machine keeps getting orders until it is this many drinks behind the best
+REFILL_BELOW = 0.25             # plan a stop when a tank is under this fill level
+
+NEEDS = [tuple((key, need) for key, need in zip(INGREDIENTS, demand) if need) for demand in DEMAND]
+
+# machine: id; level: {ingredient: base units}; location: (x, y)
+MachineStatus = namedtuple("MachineStatus", ["machine", "level", "location"])
+RefillRoute = namedtuple("RefillRoute", ["stops", "distance"])
+
+
+def makeable(levels, demand):
+    """How many drinks of one recipe these levels can still make."""
+    return min(level // need for level, need in zip(levels, demand) if need)
+
+
+# ----------------------------- Worker side ----------------------------- #
+#This class is the part of the fleet one worker process owns
+class _Shard:
+    def __init__(self, machine_ids, capacity):
+        self.machines = {machine_id: CoffeeMachine(capacity=capacity) for machine_id in machine_ids}
+        for machine in self.machines.values():
+            machine.fill_all()
+        # One lazy max-heap per recipe of (-drinks it can make, machine id). Stock only goes
+        # down between refills, so stored scores are upper bounds of the real ones.
+        self.heaps = [[(-self._score(m, code), m) for m in self.machines] for code in range(len(MENU))]
+        for heap in self.heaps:
+            heapq.heapify(heap)
+
+    def _levels(self, machine_id):
+        stock = self.machines[machine_id].stock.stock
+        return [stock.get(key, 0) for key in INGREDIENTS]
+
+    def _score(self, machine_id, code):
+        stock = self.machines[machine_id].stock.stock
+        return min(stock.get(key, 0) // need for key, need in NEEDS[code])
+
+    def _best(self, code):
+        """
+        The machine that can make the most of this drink, within ROUTE_SLACK:
+        the top entry is kept while its real score is that close to the next
+        stored one, so the heap is not reshuffled after every single cup.
+        """
+        heap = self.heaps[code]
+        while True:
+            score, machine_id = heap[0]
+            actual = self._score(machine_id, code)
+            if actual <= 0 and score >= 0:                          # Best stored score is 0: nobody can make it
+                return None
+            runner_up = min(heap[1:3], default=(0, None))[0]
+            if actual > 0 and actual + ROUTE_SLACK >= -runner_up:
+                return machine_id
+            heapq.heapreplace(heap, (-actual, machine_id))
+
+    def serve(self, codes):
+        """Serve a batch of menu codes. Returns (machine id per order or -1, totals delta)."""
+        served = array("h")
+        delta = {}
+        for code in codes:
+            machine_id = self._best(code)
+            if machine_id is None:
+                served.append(-1)
+                continue
+            result = self.machines[machine_id].order(*MENU[code])
+            served.append(machine_id if result.ok else -1)
+            if result.ok:
+                entry = delta.get(code)
+                if entry is None:
+                    delta[code] = [1, result.coffee.price_cents]
+                else:
+                    entry[0] += 1
+                    entry[1] += result.coffee.price_cents
+        return served, delta
+
+    def refill(self, machine_ids):
+        for machine_id in machine_ids:
+            if machine_id in self.machines:
+                self.machines[machine_id].fill_all()
+        for code, heap in enumerate(self.heaps):                    # Scores went up: rebuild
+            heap[:] = [(-self._score(m, code), m) for m in self.machines]
+            heapq.heapify(heap)
+
+    def status(self):
+        """(capacity per recipe summed over the shard, levels per machine)."""
+        levels = {machine_id: self._levels(machine_id) for machine_id in self.machines}
+        capacity = [sum(makeable(lv, demand) for lv in levels.values()) for demand in DEMAND]
+        return capacity, levels
+
+
+def _worker_main(conn, machine_ids, capacity):
+    shard = _Shard(machine_ids, capacity)
+    conn.send(shard.status())
+    while True:
+        command, payload = conn.recv()
+        if command == "serve":
+            served, delta = shard.serve(payload)
+            conn.send((served, delta) + shard.status())
+        elif command == "refill":
+            shard.refill(payload)
+            conn.send(shard.status())
+        elif command == "stop":
+            conn.close()
+            return
+
+
+# ----------------------------- Parent side ----------------------------- #
+#This class runs N machines as shards over worker processes and routes orders to them
+class Fleet:
+    def __init__(self, machines=24, workers=None, capacity=None, locations=None, seed=1):
+        self.size = machines
+        self.workers = min(workers or os.cpu_count() or 1, machines)
+        self.capacity = dict(capacity or CAPACITY)
+        rng = random.Random(seed)
+        self.locations = locations or [(rng.uniform(0, 10), rng.uniform(0, 10)) for _ in range(machines)]
+        self.totals = SalesTotals()                                 # Merged over every shard
+        self.levels = {}                                            # machine id -> levels (last report)
+        self.rejected = 0
+        self.invalid = 0                                            # Orders for drinks not on the menu
+        self._shard_capacity = [[0] * len(MENU) for _ in range(self.workers)]
+        self._queued = [0] * self.workers
+        self._conns = []
+        self._processes = []
+
+    def start(self):
+        context = multiprocessing.get_context()
+        for w in range(self.workers):
+            parent, child = context.Pipe()
+            ids = list(range(w, self.size, self.workers))           # Machine i lives on worker i % workers
+            process = context.Process(target=_worker_main, args=(child, ids, self.capacity), daemon=True)
+            process.start()
+            child.close()
+            self._conns.append(parent)
+            self._processes.append(process)
+        for w, conn in enumerate(self._conns):
+            self._apply_status(w, *conn.recv())
+        return self
+
+    def close(self):
+        for conn in self._conns:
+            conn.send(("stop", None))
+        for process in self._processes:
+            process.join()
+        self._conns, self._processes = [], []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _apply_status(self, w, capacity, levels):
+        self._shard_capacity[w] = capacity
+        for machine_id, lv in levels.items():
+            self.levels[machine_id] = dict(zip(INGREDIENTS, lv))
+
+    def _merge(self, served, delta):
+        self.rejected += served.count(-1)
+        self.totals.add_counts({MENU[code]: tuple(entry) for code, entry in delta.items()})
+
+    # ----------------------------- Routing ----------------------------- #
+    def route(self, codes):
+        """Split menu codes into one array per worker, by capacity left minus what is queued."""
+        parts = [array("B") for _ in range(self.workers)]
+        capacity = self._shard_capacity
+        queued = self._queued
+        shards = range(self.workers)
+        for code in codes:
+            w = max(shards, key=lambda s: capacity[s][code] - QUEUE_WEIGHT * queued[s])
+            parts[w].append(code)
+            capacity[w][code] -= 1
+            queued[w] += 1
+        return parts
+
+    def serve(self, orders, batch_size=BATCH_SIZE):
+        """
+        Serve (type, size) orders. While the workers run one batch the parent
+        routes the next, so routing and serving overlap. Orders for drinks
+        not on the menu are only counted (summary()["invalid"]).
+        """
+        batch = array("B")
+        pending = None
+        lookup = MENU_INDEX.get
+        for order in orders:
+            code = lookup(order)
+            if code is None:
+                self.invalid += 1
+                continue
+            batch.append(code)
+            if len(batch) >= batch_size * self.workers:
+                pending = self._pipeline(batch, pending)
+                batch = array("B")
+        if batch:
+            pending = self._pipeline(batch, pending)
+        self._collect(pending)
+        return self.summary()
+
+    def _pipeline(self, batch, pending):
+        parts = self.route(batch)                                   # Overlaps with the workers' previous batch
+        self._collect(pending)
+        for w, part in enumerate(parts):
+            if part:
+                self._conns[w].send(("serve", part))
+        return [w for w, part in enumerate(parts) if part]
+
+    def _collect(self, pending):
+        for w in pending or ():
+            served, delta, capacity, levels = self._conns[w].recv()
+            self._merge(served, delta)
+            self._apply_status(w, capacity, levels)
+            self._queued[w] = 0
+
+    # ----------------------------- Refills ----------------------------- #
+    def needs_refill(self, below=REFILL_BELOW):
+        return [MachineStatus(machine_id, level, self.locations[machine_id])
+                for machine_id, level in sorted(self.levels.items())
+                if any(level[key] < below * self.capacity[key] for key in self.capacity)]
+
+    def refill(self, machine_ids):
+        """Fill the given machines (after the van has been there)."""
+        for w, conn in enumerate(self._conns):
+            conn.send(("refill", [m for m in machine_ids if m % self.workers == w]))
+        for w, conn in enumerate(self._conns):
+            self._apply_status(w, *conn.recv())
+
+    def summary(self):
+        return {"machines": self.size, "workers": self.workers, "served": self.totals.count,
+                "rejected": self.rejected, "invalid": self.invalid, "revenue": self.totals.revenue_cents / 100}
+
+
+def plan_refill_route(stops, depot=(0.0, 0.0)):
+    """Order refill stops for one van: nearest neighbour from the depot, then 2-opt until no gain."""
+    points = [depot] + [stop.location for stop in stops]
+    if len(points) < 3:
+        return RefillRoute(list(stops), 2 * _dist(depot, points[-1]) if stops else 0.0)
+    order = [0]
+    left = set(range(1, len(points)))
+    while left:
+        here = points[order[-1]]
+        nearest = min(left, key=lambda i: _dist(here, points[i]))
+        order.append(nearest)
+        left.remove(nearest)
+    order.append(0)                                                 # Back to the depot
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(order) - 2):
+            for j in range(i + 1, len(order) - 1):
+                a, b, c, d = (points[order[k]] for k in (i - 1, i, j, j + 1))
+                if _dist(a, c) + _dist(b, d) < _dist(a, b) + _dist(c, d) - 1e-12:
+                    order[i:j + 1] = reversed(order[i:j + 1])
+                    improved = True
+    distance = sum(_dist(points[order[k]], points[order[k + 1]]) for k in range(len(order) - 1))
+    return RefillRoute([stops[k - 1] for k in order[1:-1]], distance)
+
+
+def _dist(p, q):
+    return math.hypot(p[0] - q[0], p[1] - q[1])
+
+
+# ----------------------------- Benchmark ----------------------------- #
+def main():
+    parser = argparse.ArgumentParser(description="Fleet throughput by number of worker processes")
+    parser.add_argument("--machines", type=int, default=48)
+    parser.add_argument("--workers", default=",".join(str(w) for w in (1, 2, 4) if w <= (os.cpu_count() or 1)) or "1",
+                        help="comma-separated worker counts to compare")
+    parser.add_argument("--orders", type=int, default=400000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    orders = [rng.choice(MENU) for _ in range(args.orders)]
+    # Big tanks so the benchmark measures serving, not stockouts
+    capacity = {key: level * 10**6 for key, level in CAPACITY.items()}
+    print(f"{args.machines} machines, {args.orders} orders (cores: {os.cpu_count()})")
+    for workers in (int(w) for w in args.workers.split(",")):
+        with Fleet(args.machines, workers, capacity, seed=args.seed) as fleet:
+            t0 = time.perf_counter()
+            summary = fleet.serve(orders)
+            elapsed = time.perf_counter() - t0
+        print(f"  {workers:>3} workers: {summary['served'] / elapsed:>10,.0f} orders/s  "
+              f"(served {summary['served']}, rejected {summary['rejected']}, ${summary['revenue']:,.2f})")
+
+    with Fleet(args.machines, 1, seed=args.seed) as fleet:          # Normal tanks: a day's refill round
+        fleet.serve(orders[:args.machines * 8])
+        stops = fleet.needs_refill()
+        route = plan_refill_route(stops)
+        print(f"Refill round: {len(route.stops)} machines, {route.distance:.1f} km: "
+              + " -> ".join(str(stop.machine) for stop in route.stops))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# ============================================================
+#  Project: Coffee Machine Simulation
+#  File: forecast.py
+#
+#  Author(s): Sofia Vanessa and Ximena Isaac
+#
+#  Credits:
+#    - Functional design and logic implemented by both authors.
+#
+#  Notes:
+#    This project was created for learning purposes.
+#    Online depletion forecast: an exponentially weighted consumption
+#    rate per ingredient, updated in O(1) per order (or per batch of
+#    orders with consume_many), gives the time
+#    until each tank runs empty and raises refill alerts ahead of it.
+# ============================================================
+
+import math
+from collections import namedtuple
+
+HALF_LIFE = 30 * 60             # seconds: traffic older than this counts half as much
+REFILL_LEAD_TIME = 15 * 60      # seconds an operator needs to get to the machine
+ALERT_MARGIN = 1.5              # alert when the tank empties within 1.5x the lead time
+MIN_WINDOW = 5 * 60             # seconds: shortest history a rate is averaged over
+
+# rate is units per hour; seconds_left is None while there is no traffic to extrapolate
+Forecast = namedtuple("Forecast", ["level", "rate", "seconds_left", "alert"])
+
+
+#This class estimates how fast every ingredient is being used
+class DepletionForecaster:
+    '''
+    The rate is a time-decayed sum: every order adds amount / tau and the
+    whole sum decays by exp(-dt / tau) between orders, so a steady stream of
+    r units per second converges to r. All ingredients share one clock, so
+    an order costs one exp() and a multiply-add per ingredient. Right after
+    start-up the sum has not had time to build up, so reads divide by the
+    weight seen so far instead of waiting for tau to pass.
+    '''
+    __slots__ = ("tau", "lead_time", "margin", "rates", "first", "last")
+
+    def __init__(self, keys, half_life=HALF_LIFE, lead_time=REFILL_LEAD_TIME, margin=ALERT_MARGIN):
+        self.tau = half_life / math.log(2)
+        self.lead_time = lead_time
+        self.margin = margin
+        self.rates = dict.fromkeys(keys, 0.0)                       # Units per second, as of self.last
+        self.first = None                                           # Timestamp of the first order
+        self.last = None                                            # Timestamp of the last update
+
+    def consume(self, amounts, timestamp, cups=1):
+        """Record one order that took `amounts` (plus `cups`) at `timestamp`."""
+        rates = self.rates
+        tau = self.tau
+        last = self.last
+        if last is not None and timestamp > last:
+            decay = math.exp((last - timestamp) / tau)
+            for key in rates:
+                rates[key] *= decay
+        if last is None:
+            self.first = self.last = timestamp
+        elif timestamp > last:
+            self.last = timestamp
+        for key, amount in amounts.items():
+            if key in rates:
+                rates[key] += amount / tau
+        if "cups" in rates:
+            rates["cups"] += cups / tau
+
+    def consume_many(self, timestamps, codes, amounts_by_code):
+        """
+        consume() for many orders at once, oldest first: order i took
+        amounts_by_code[codes[i]] (cups included) at timestamps[i]. Each order
+        costs one exp(); the per-ingredient work is done once per code.
+        """
+        if not len(timestamps):
+            return
+        tau = self.tau
+        last = self.last
+        if last is None:
+            self.first = last = timestamps[0]
+        end = max(last, max(timestamps))
+        weights = [0.0] * len(amounts_by_code)
+        seen = last                                                 # An older order counts as of the newest one so far
+        exp = math.exp
+        for timestamp, code in zip(timestamps, codes):
+            if timestamp > seen:
+                seen = timestamp
+            weights[code] += exp((seen - end) / tau)
+        rates = self.rates
+        decay = exp((last - end) / tau)
+        for key in rates:
+            rates[key] *= decay
+        for code, weight in enumerate(weights):
+            if weight:
+                for key, amount in amounts_by_code[code].items():
+                    if key in rates:
+                        rates[key] += amount * weight / tau
+        self.last = end
+
+    def rate(self, key, now):
+        """Current consumption of one ingredient, in units per second."""
+        if self.last is None:
+            return 0.0
+        seen = -math.expm1(-max(now - self.first, MIN_WINDOW) / self.tau)   # Weight of the history so far
+        return self.rates.get(key, 0.0) * math.exp(min(0.0, self.last - now) / self.tau) / seen
+
+    def forecast(self, stock, now, keys=None):
+        """Forecast for the tracked ingredients in `keys` (all by default) given the stock levels."""
+        horizon = self.lead_time * self.margin
+        result = {}
+        if self.last is None:
+            scale = 0.0
+        else:
+            seen = -math.expm1(-max(now - self.first, MIN_WINDOW) / self.tau)
+            scale = math.exp(min(0.0, self.last - now) / self.tau) / seen
+        for key in self.rates if keys is None else keys:
+            if key not in self.rates:
+                continue
+            level = stock.get(key, 0)
+            rate = self.rates[key] * scale
+            seconds_left = level / rate if rate > 0 else None
+            alert = level <= 0 or (seconds_left is not None and seconds_left <= horizon)
+            result[key] = Forecast(level, rate * 3600, seconds_left, alert)
+        return result
+
+    def reset(self):
+        self.rates = dict.fromkeys(self.rates, 0.0)
+        self.first = self.last = None
+
+
+def format_time_left(seconds):
+    """'empty', '~12 min', '~3.5 h', '-' for no traffic."""
+    if seconds is None:
+        return "-"
+    if seconds <= 0:
+        return "empty"
+    if seconds < 3600:
+        return f"~{max(1, round(seconds / 60))} min"
+    return f"~{seconds / 3600:.1f} h"
@@ -0,0 +1,917 @@
+# ============================================================
+#  Project: Coffee Machine Simulation
+#  File: gui.py
+#
+#  Author(s): Sofia Vanessa and Ximena Isaac
+#
+#  Credits:
+#    - Functional design and logic implemented by both authors.
+#    - GUI layout, dark theme styling, and interactive enhancements
+#      by ChatGPT (OpenAI Assistant).
+#
+#  Notes:
+#    This project was created for learning purposes.
+#    The Tk window. main.py imports this module only once it is about to
+#    open the window, so importing main (or the engine) never loads Tk.
+# ============================================================
+
+import time
+import tkinter as tk
+from collections import deque
+from tkinter import ttk
+from coffeeprep import Coffee, format_amount, format_cents, to_cents
+from engine import CoffeeMachine
+from forecast import format_time_left
+
+
+# ------------------------------ Color Palette ------------------------------ #
+PALETTE = {
+    "bg":       "#0e0f13",  # app background
+    "surface":  "#171923",  # primary card
+    "surface2": "#1f2230",  # secondary card / stripes
+    "text":     "#e7e7ea",
+    "muted":    "#b0b3c5",
+    "accent":   "#7c5cff",  # purple
+    "accent2":  "#00d1b2",  # teal
+    "danger":   "#ff5c5c",
+    "ok":       "#72e06a",
+    "warn":     "#ffcf66",
+}
+
+# ------------------------------ Messages pane ------------------------------ #
+LOG_CAPACITY = 500          # lines kept in the Messages pane (older lines are trimmed)
+LOG_FLUSH_MS = 16           # pending messages reach the widget once per frame
+LOG_FILE_MAX_BYTES = 1_000_000
+LOG_FILE_BACKUPS = 5
+
+# ------------------------------ Performance ------------------------------ #
+PERF_REFRESH_MS = 1000      # performance panel refresh
+METRICS_EXPORT_MS = 5000    # Prometheus snapshot file refresh
+SHARED_STOCK_POLL_MS = 500  # redraw a shared stock that other kiosks change
+FORECAST_REFRESH_MS = 1000  # time-left labels and refill alerts; they move in minutes, not per order
+
+# ------------------------------ Analytics ------------------------------ #
+ANALYTICS_REFRESH_MS = 1000     # windows slide with the clock, so refresh on a timer, not per sale
+# choice -> (label, seconds; None = since local midnight)
+ANALYTICS_WINDOWS = {
+    "5min": ("Last 5 min", 300),
+    "hour": ("Last hour", 3600),
+    "today": ("Today", None),
+}
+
+# ------------------------------ Refill messages ------------------------------ #
+# stock key -> (tank name in messages, unit)
+REFILL_LABELS = {
+    "water": ("Water", "ml"),
+    "milk": ("Milk", "ml"),
+    "coffee_beans": ("Coffee beans", "g"),
+    "cups": ("Cups", "units"),
+}
+
+# ------------------------------ Sales table ------------------------------ #
+SALES_VISIBLE_ROWS = 10  # rows the sales Treeview asks room for
+SALES_WINDOW_ROWS = 14   # Treeview items kept alive (visible rows + small buffer above them)
+
+# ------------------------------ Startup ------------------------------ #
+SECONDARY_FALLBACK_MS = 1000    # build the secondary panels anyway if the window is never exposed
+
+
+def _messagebox():
+    from tkinter import messagebox      # deferred: only needed once a dialog is shown
+    return messagebox
+
+
+def _simpledialog():
+    from tkinter import simpledialog    # deferred: pulls in more Tk code, used by withdraw/donate only
+    return simpledialog
+
+
+# ----------------------------------- GUI ----------------------------------- #
+class CoffeeMachineApp(tk.Tk):
+    """
+    GUI that mirrors the CLI functionality:
+    - Order Coffee
+    - Fill the Machine (water/milk/beans/cups or fill all)
+    - Withdraw Money (with donation flow)
+    - Show Data (stock + sales history)
+    - Exit
+    """
+    def __init__(self, machine=None, log_path=None, metrics_path=None, shared_stock=None):
+        super().__init__()
+        self.title("☕ Coffee Machine — Sofia & Ximena")
+        self.geometry("980x760")
+        self.minsize(940, 720)
+        self.configure(bg=PALETTE["bg"])
+
+        # State from CLI main(): stock, money, ledger and totals live in the headless engine
+        self.machine = machine if machine is not None else CoffeeMachine()
+
+        # Messages pane: ring buffer of pending lines, flushed to the widget once per frame
+        self._log_pending = deque(maxlen=LOG_CAPACITY)
+        self._log_lines = 0                 # lines currently in the Text widget
+        self._log_flush_scheduled = False
+        self._log_file = self._open_log_file(log_path) if log_path else None
+
+        # Performance: optional Prometheus snapshot file and the (lazily built) panel
+        self._metrics_path = metrics_path
+
+        # Shared-memory stock the machine serves from (--shared-stock): redrawn on a timer, detached on close
+        self._shared_stock = shared_stock
+        self._perf_window = None
+
+        # Selection state for ordering
+        self.var_type = tk.StringVar(value="espresso")  # espresso / latte / capuccino
+        self.var_size = tk.StringVar(value="small")     # small / medium / large
+        self.var_type.trace_add("write", lambda *_: self._mark_dirty("status"))
+        self.var_size.trace_add("write", lambda *_: self._mark_dirty("status"))
+        self.var_window = tk.StringVar(value="5min")    # analytics window, see ANALYTICS_WINDOWS
+
+        # Render scheduler: actions mark what changed, one after_idle pass redraws it
+        self._dirty = set()                 # "money", "sales", "status"
+        self._dirty_stock = set()           # stock keys whose label/bar need redrawing
+        self._render_scheduled = False
+        self._alerted = set()               # stock keys with a refill alert already logged
+        self._eta_shown = {}                # stock key -> (text, alert) on its time-left label
+
+        # Build UI: the order/stock panel now, the rest once the first frame is painted
+        self._secondary_built = False
+        self._t_first_frame = self._t_full_ui = None    # perf_counter() times for the startup report
+        self._build_style()
+        self._build_layout()
+        self._render_all()
+        self._refresh_forecast()
+        self.bind("<Expose>", self._on_first_expose)
+        self.after(SECONDARY_FALLBACK_MS, self._build_secondary)
+
+        # Welcome
+        if len(self.machine.ledger):
+            self._log(f"👋 Welcome back! Restored {len(self.machine.ledger)} sales from the journal.", tag="ok")
+        else:
+            self._log("👋 Welcome! Initial stock loaded.", tag="ok")
+        if self._metrics_path:
+            self.after(METRICS_EXPORT_MS, self._export_metrics)
+        if self._shared_stock is not None:
+            self.after(SHARED_STOCK_POLL_MS, self._watch_stock)
+
+    def destroy(self):
+        self.machine.close()  # flush the journal before the window goes away
+        if self._shared_stock is not None:
+            self._shared_stock.close()
+            self._shared_stock = None
+        self._close_log_file()
+        super().destroy()
+
+    # ------------------------------ Styling ------------------------------ #
+    def _build_style(self):
+        style = ttk.Style(self)
+        try:
+            style.theme_use("clam")
+        except tk.TclError:
+            pass
+
+        style.configure(".", background=PALETTE["bg"], foreground=PALETTE["text"])
+        style.configure("TFrame", background=PALETTE["bg"])
+        style.configure("TLabel", background=PALETTE["bg"], foreground=PALETTE["text"])
+
+        style.configure("Title.TLabel",
+                        background=PALETTE["bg"],
+                        foreground=PALETTE["text"],
+                        font=("Segoe UI", 20, "bold"))
+
+        style.configure("Section.TLabelframe",
+                        background=PALETTE["surface"],
+                        borderwidth=0,
+                        relief="flat",
+                        padding=14)
+        style.configure("Section.TLabelframe.Label",
+                        background=PALETTE["surface"],
+                        foreground=PALETTE["muted"],
+                        font=("Segoe UI", 11, "bold"))
+
+        style.configure("TButton",
+                        background=PALETTE["surface2"],
+                        foreground=PALETTE["text"],
+                        padding=10,
+                        borderwidth=0)
+
+        style.map("TButton",
+                  background=[("active", "#242736"), ("pressed", "#26293a")],
+                  foreground=[("disabled", "#7b7f91")])
+
+        style.configure("Accent.TButton",
+                        background=PALETTE["accent"],
+                        foreground="#ffffff",
+                        padding=10,
+                        font=("Segoe UI", 10, "bold"))
+        style.map("Accent.TButton",
+                  background=[("active", "#6e4cf5"), ("pressed", "#633fe9")])
+
+        style.configure("Danger.TButton",
+                        background=PALETTE["danger"],
+                        foreground="#ffffff",
+                        padding=10,
+                        font=("Segoe UI", 10, "bold"))
+        style.map("Danger.TButton",
+                  background=[("active", "#e55353"), ("pressed", "#d84a4a")])
+
+        style.configure("TRadiobutton",
+                        background=PALETTE["surface"],
+                        foreground=PALETTE["text"],
+                        padding=6)
+
+        style.configure("Status.TLabel",
+                        background=PALETTE["bg"],
+                        foreground=PALETTE["muted"],
+                        font=("Segoe UI", 10))
+
+    def _build_table_style(self):
+        """Styles only the secondary (deferred) section uses."""
+        style = ttk.Style(self)
+        style.configure("Treeview",
+                        background=PALETTE["surface"],
+                        fieldbackground=PALETTE["surface"],
+                        foreground=PALETTE["text"],
+                        rowheight=26,
+                        borderwidth=0)
+        style.map("Treeview",
+                  background=[("selected", PALETTE["accent"])],
+                  foreground=[("selected", "#ffffff")])
+        style.configure("Treeview.Heading",
+                        background=PALETTE["surface2"],
+                        foreground=PALETTE["text"],
+                        relief="flat",
+                        font=("Segoe UI", 10, "bold"))
+
+    # ------------------------------ Layout ------------------------------ #
+    def _build_layout(self):
+        # Header
+        header = ttk.Frame(self)
+        header.grid(row=0, column=0, columnspan=2, sticky="ew", padx=18, pady=(16, 10))
+        header.columnconfigure(0, weight=1)
+        ttk.Label(header, text="☕ Coffee Machine", style="Title.TLabel").grid(row=0, column=0, sticky="w")
+        tk.Frame(header, bg=PALETTE["accent"], height=3).grid(row=1, column=0, sticky="ew", pady=(8, 0))
+
+        # Left side: Order + Fill Machine
+        left = ttk.Frame(self)
+        left.grid(row=1, column=0, sticky="nsew", padx=(18, 9), pady=(0, 16))
+        left.rowconfigure(1, weight=1)
+        left.columnconfigure(0, weight=1)
+
+        # Right side: Sales/Data + Log
+        right = ttk.Frame(self)
+        right.grid(row=1, column=1, sticky="nsew", padx=(9, 18), pady=(0, 16))
+        right.rowconfigure(2, weight=1)
+        right.columnconfigure(0, weight=1)
+        self._right = right                 # filled by _build_secondary after the first frame
+
+        self.columnconfigure(0, weight=1)
+        self.columnconfigure(1, weight=1)
+
+        # --- Order Section ---
+        order = ttk.Labelframe(left, text=" Order Coffee ", style="Section.TLabelframe")
+        order.grid(row=0, column=0, sticky="ew", pady=(0, 12))
+        order.columnconfigure(0, weight=1)
+        order.columnconfigure(1, weight=1)
+
+        # Type
+        type_box = ttk.Labelframe(order, text=" Type ", style="Section.TLabelframe")
+        type_box.grid(row=0, column=0, sticky="nsew", padx=(0, 8))
+        for i, (val, label) in enumerate([
+            ("espresso", "☄️ Espresso"),
+            ("latte", "🥛 Latte"),
+            ("capuccino", "🌫️ Capuccino"),
+        ]):
+            ttk.Radiobutton(type_box, text=label, value=val, variable=self.var_type).grid(
+                row=i, column=0, sticky="w", padx=6, pady=4
+            )
+
+        # Size
+        size_box = ttk.Labelframe(order, text=" Size ", style="Section.TLabelframe")
+        size_box.grid(row=0, column=1, sticky="nsew", padx=(8, 0))
+        for i, (val, label) in enumerate([
+            ("small", "🫖 Small"),
+            ("medium", "🍶 Medium"),
+            ("large", "🧃 Large"),
+        ]):
+            ttk.Radiobutton(size_box, text=label, value=val, variable=self.var_size).grid(
+                row=i, column=0, sticky="w", padx=6, pady=4
+            )
+
+        # Action buttons for order
+        order_actions = ttk.Frame(order, style="Section.TLabelframe")
+        order_actions.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(10, 0))
+        order_actions.columnconfigure(0, weight=1)
+        order_actions.columnconfigure(1, weight=1)
+        order_actions.columnconfigure(2, weight=1)
+
+        ttk.Button(order_actions, text="Brew ☕", style="Accent.TButton", command=self._brew).grid(
+            row=0, column=0, sticky="ew", padx=(0, 6)
+        )
+        ttk.Button(order_actions, text="Show Price 💵", command=self._show_price).grid(
+            row=0, column=1, sticky="ew", padx=6
+        )
+        ttk.Button(order_actions, text="Need Cups?", command=self._need_cups_hint).grid(
+            row=0, column=2, sticky="ew", padx=(6, 0)
+        )
+
+        # --- Fill Machine Section ---
+        fill = ttk.Labelframe(left, text=" Fill the Machine ", style="Section.TLabelframe")
+        fill.grid(row=1, column=0, sticky="nsew")
+        fill.columnconfigure(1, weight=1)
+
+        # Stock overview (numbers + progress bars)
+        capacity = self.machine.capacity
+        self._mk_stock_row(fill, 0, "Water (ml)", "water", capacity["water"])
+        self._mk_stock_row(fill, 1, "Milk (ml)", "milk", capacity["milk"])
+        self._mk_stock_row(fill, 2, "Coffee Beans (g)", "coffee_beans", capacity["coffee_beans"])
+        self._mk_stock_row(fill, 3, "Cups (units)", "cups", capacity["cups"])
+
+        # Refill buttons
+        btns = ttk.Frame(fill, style="Section.TLabelframe")
+        btns.grid(row=5, column=0, columnspan=4, sticky="ew", pady=(12, 0))
+        for i in range(5):
+            btns.columnconfigure(i, weight=1)
+
+        ttk.Button(btns, text="Refill Water", command=self._refill_water).grid(row=0, column=0, sticky="ew", padx=4)
+        ttk.Button(btns, text="Refill Milk", command=self._refill_milk).grid(row=0, column=1, sticky="ew", padx=4)
+        ttk.Button(btns, text="Refill Beans", command=self._refill_beans).grid(row=0, column=2, sticky="ew", padx=4)
+        ttk.Button(btns, text="Refill Cups", command=self._refill_cups).grid(row=0, column=3, sticky="ew", padx=4)
+        ttk.Button(btns, text="Fill All ♻️", style="Accent.TButton", command=self._fill_all).grid(row=0, column=4, sticky="ew", padx=4)
+
+        # Footer status
+        self.status = ttk.Label(self, style="Status.TLabel", anchor="w")
+        self.status.grid(row=2, column=0, columnspan=2, sticky="ew", padx=18, pady=(0, 12))
+
+    def _on_first_expose(self, event):
+        """The window is on screen: finish painting it, note the time, then build the rest."""
+        if event.widget is not self:
+            return                          # Child widgets share the root's bindings
+        self.unbind("<Expose>")
+        self.update_idletasks()             # The first frame's pending redraws
+        self._t_first_frame = time.perf_counter()
+        self.after_idle(self._build_secondary)
+
+    def _build_secondary(self):
+        """Data & Sales and Messages: built right after the first frame is on screen."""
+        if self._secondary_built:
+            return
+        self._build_table_style()
+
+        # --- Sales / Data Section ---
+        data = ttk.Labelframe(self._right, text=" Data & Sales ", style="Section.TLabelframe")
+        data.grid(row=0, column=0, sticky="nsew", pady=(0, 12))
+        data.rowconfigure(1, weight=1)
+        data.columnconfigure(0, weight=1)
+
+        # Money quick actions (withdraw/donate)
+        money_bar = ttk.Frame(data, style="Section.TLabelframe")
+        money_bar.grid(row=0, column=0, columnspan=2, sticky="ew")
+        money_bar.columnconfigure(1, weight=1)
+        ttk.Label(money_bar, text="Balance:").grid(row=0, column=0, sticky="w")
+        self.lbl_money = ttk.Label(money_bar, text="$0.00")
+        self.lbl_money.grid(row=0, column=1, sticky="w", padx=(6, 0))
+        ttk.Button(money_bar, text="Withdraw", style="Danger.TButton", command=self._withdraw_money).grid(row=0, column=2, padx=6)
+        ttk.Button(money_bar, text="Donate", style="Accent.TButton", command=self._donate_money).grid(row=0, column=3)
+
+        # Sales history table (virtual: only a window of rows exists as Treeview items)
+        self.tree = ttk.Treeview(data, columns=("coffee", "size", "price"), show="headings",
+                                 height=SALES_VISIBLE_ROWS)
+        self.tree.heading("coffee", text="Coffee")
+        self.tree.heading("size", text="Size")
+        self.tree.heading("price", text="Unit Price")
+        self.tree.column("coffee", width=160, anchor="w")
+        self.tree.column("size", width=100, anchor="center")
+        self.tree.column("price", width=120, anchor="e")
+        self.tree.grid(row=1, column=0, sticky="nsew", pady=(8, 0))
+        self.sales_scroll = ttk.Scrollbar(data, orient="vertical", command=self._scroll_sales)
+        self.sales_scroll.grid(row=1, column=1, sticky="ns", pady=(8, 0))
+        self.tree.bind("<MouseWheel>", self._on_sales_wheel)
+        self.tree.bind("<Button-4>", self._on_sales_wheel)
+        self.tree.bind("<Button-5>", self._on_sales_wheel)
+        self._sales_offset = 0          # index of the first visible sale
+        self._sales_shown = (0, 0)      # (start, stop) currently materialized in the tree
+        self._sales_top = None          # index of the first visible sale the tree is scrolled to
+        self._sales_follow = True       # keep the newest sale in view while brewing
+
+        # Totals
+        totals = ttk.Frame(data, style="Section.TLabelframe")
+        totals.grid(row=2, column=0, columnspan=2, sticky="ew", pady=(8, 0))
+        totals.columnconfigure(1, weight=1)
+        ttk.Label(totals, text="Total sales:").grid(row=0, column=0, sticky="w")
+        self.lbl_total_sales = ttk.Label(totals, text="0")
+        self.lbl_total_sales.grid(row=0, column=1, sticky="w", padx=(6, 0))
+        ttk.Label(totals, text="Total revenue:").grid(row=0, column=2, sticky="w", padx=(12, 0))
+        self.lbl_total_revenue = ttk.Label(totals, text="$0.00")
+        self.lbl_total_revenue.grid(row=0, column=3, sticky="w", padx=(6, 0))
+
+        # --- Analytics Section (rollup buckets: no scan of the history) ---
+        stats = ttk.Labelframe(self._right, text=" Analytics ", style="Section.TLabelframe")
+        stats.grid(row=1, column=0, sticky="ew", pady=(0, 12))
+        for i in range(4):
+            stats.columnconfigure(i, weight=1)
+        for i, (val, (label, _)) in enumerate(ANALYTICS_WINDOWS.items()):
+            ttk.Radiobutton(stats, text=label, value=val, variable=self.var_window,
+                            command=self._render_analytics).grid(row=0, column=i, sticky="w", padx=6)
+        self.lbl_window_sales = ttk.Label(stats, text="0 orders")
+        self.lbl_window_sales.grid(row=1, column=0, sticky="w", pady=(6, 0))
+        self.lbl_window_revenue = ttk.Label(stats, text="$0.00")
+        self.lbl_window_revenue.grid(row=1, column=1, sticky="w", pady=(6, 0))
+        self.lbl_window_pace = ttk.Label(stats, text="0.0 / min")
+        self.lbl_window_pace.grid(row=1, column=2, sticky="w", pady=(6, 0))
+        self.lbl_peak_hour = ttk.Label(stats, text="Peak: -")
+        self.lbl_peak_hour.grid(row=1, column=3, sticky="w", pady=(6, 0))
+        self.lbl_window_top = ttk.Label(stats, text="Top: -", foreground=PALETTE["muted"])
+        self.lbl_window_top.grid(row=2, column=0, columnspan=2, sticky="w", pady=(4, 0))
+        self.lbl_window_usage = ttk.Label(stats, text="Used: -", foreground=PALETTE["muted"])
+        self.lbl_window_usage.grid(row=2, column=2, columnspan=2, sticky="w", pady=(4, 0))
+        self._analytics_shown = None
+
+        # --- Log Section ---
+        log = ttk.Labelframe(self._right, text=" Messages ", style="Section.TLabelframe")
+        log.grid(row=2, column=0, sticky="nsew")
+        log.rowconfigure(0, weight=1)
+        log.columnconfigure(0, weight=1)
+
+        self.txt_log = tk.Text(
+            log, height=8, wrap="word", font=("Consolas", 10),
+            bg="#0f1115", fg=PALETTE["text"], insertbackground=PALETTE["text"],
+            highlightthickness=0, bd=0
+        )
+        self.txt_log.grid(row=0, column=0, sticky="nsew")
+        sbr = ttk.Scrollbar(log, command=self.txt_log.yview)
+        sbr.grid(row=0, column=1, sticky="ns")
+        self.txt_log.config(yscrollcommand=sbr.set)
+        # Log tags
+        self.txt_log.tag_configure("ok", foreground=PALETTE["ok"])
+        self.txt_log.tag_configure("warn", foreground=PALETTE["warn"])
+        self.txt_log.tag_configure("err", foreground=PALETTE["danger"])
+        self.txt_log.tag_configure("muted", foreground=PALETTE["muted"])
+
+        self._secondary_built = True
+        self._render_money()
+        self._render_sales()
+        self._refresh_analytics()
+        self._flush_log()
+        self._t_full_ui = time.perf_counter()
+
+    # ----------------------------- Helpers (stock rows) ----------------------------- #
+    def _mk_stock_row(self, parent, row, title, key, max_value):
+        """Create a labeled row with current value and a progress bar for a stock key."""
+        ttk.Label(parent, text=title).grid(row=row, column=0, sticky="w", pady=4)
+        lbl = ttk.Label(parent, text="0")
+        lbl.grid(row=row, column=1, sticky="w", pady=4)
+        bar = ttk.Progressbar(parent, orient="horizontal", mode="determinate", maximum=max_value, length=220)
+        bar.grid(row=row, column=2, sticky="w", pady=4, padx=(12, 0))
+        eta = ttk.Label(parent, text="-", width=8)     # forecast time until empty
+        eta.grid(row=row, column=3, sticky="w", pady=4, padx=(8, 0))
+        setattr(self, f"lbl_{key}", lbl)
+        setattr(self, f"bar_{key}", bar)
+        setattr(self, f"eta_{key}", eta)
+
+    # ----------------------------- Actions: Order ----------------------------- #
+    def _show_price(self):
+        """Show price using Coffee.price (or .precio) for the current selection."""
+        try:
+            coffee = Coffee(self.var_type.get(), self.var_size.get())
+            price = getattr(coffee, "price", None)
+            if price is None:
+                price = getattr(coffee, "precio", None)
+            if price is None:
+                self._log("ℹ️ Price not available on Coffee object.", tag="warn")
+                _messagebox().showinfo("Price", "Price not available.")
+            else:
+                self._log(f"💵 Price: {price} u", tag="ok")
+                _messagebox().showinfo("Price", f"{self.var_size.get().title()} {self.var_type.get().title()}: {price} u")
+        except Exception as e:
+            self._log(f"Could not get price: {e}", tag="err")
+            _messagebox().showerror("Price", f"Could not get price:\n{e}")
+
+    def _need_cups_hint(self):
+        self._log("Remember: each coffee uses one cup. Refill cups if needed.", tag="muted")
+        _messagebox().showinfo("Cups", "Each coffee uses one cup.\nRefill cups if needed.")
+
+    def _brew(self):
+        """Mimic the CLI logic for ordering coffee."""
+        dialog = self._brew_timed()
+        if dialog is not None:                  # Outside brew_seconds: a modal dialog waits for the user
+            show, title, text = dialog
+            getattr(_messagebox(), show)(title, text)
+
+    def _brew_timed(self):
+        """The order itself, timed. Returns the (messagebox function, title, text) to show, or None."""
+        with self.machine.metrics.span("brew_seconds"):
+            coffee_type = self.var_type.get()
+            size = self.var_size.get()
+
+            # Cup availability (CLI behavior)
+            if self.machine.stock.stock.get("cups", 0) <= 0:
+                self._log("No cups available. Please refill the machine.", tag="err")
+                return "showwarning", "Cups", "No cups available. Please refill the machine."
+
+            # Ingredient check & deduction (cup included) and sale recording, in the engine
+            result = self.machine.order(coffee_type, size)
+            if result.reason == "invalid":
+                self._log(f"Could not create coffee: {result.message}", tag="err")
+                return "showerror", "Order", f"Could not create coffee:\n{result.message}"
+
+            self._log(f"You selected a {size} {coffee_type}.", tag="muted")
+            self._log(result.message, tag=("ok" if result.ok else "warn"))
+            if not result.ok:
+                self._log("Not enough ingredients. Please refill or choose another drink.", tag="err")
+                return "showwarning", "Order", "Not enough ingredients. Please refill or choose another drink."
+            self._log(f"Preparing your {size} {coffee_type}...", tag="muted")
+            self._log(f"Your {size} {coffee_type} is ready! ✅", tag="ok")
+
+            # Refresh only what the order changed
+            self._mark_dirty("money", "sales", "status", stock=(*result.coffee.ingredients, "cups"))
+        return None
+
+    # ----------------------------- Actions: Fill Machine ----------------------------- #
+    def _refill(self, key):
+        name, _ = REFILL_LABELS[key]
+        add = self.machine.refill(key)
+        if not add:
+            self._log(f"{name} tank is already full.", tag="warn")
+            return
+        self._log(f"Refilled {name.lower()} by {format_amount(key, add)}.", tag="ok")
+        self._mark_dirty("status", stock=(key,))
+
+    def _refill_water(self):
+        self._refill("water")
+
+    def _refill_milk(self):
+        self._refill("milk")
+
+    def _refill_beans(self):
+        self._refill("coffee_beans")
+
+    def _refill_cups(self):
+        self._refill("cups")
+
+    def _fill_all(self):
+        self._refill_water()
+        self._refill_milk()
+        self._refill_beans()
+        self._refill_cups()
+        self._log("All ingredients refill complete.", tag="ok")
+
+    # ----------------------------- Actions: Money ----------------------------- #
+    def _withdraw_money(self):
+        """Implements the same flow as CLI (no donation branch)."""
+        if self.machine.money <= 0:
+            self._log("No money to withdraw.", tag="warn")
+            _messagebox().showinfo("Withdraw", "No money to withdraw.")
+            return
+
+        # Ask if they want to withdraw
+        amount_str = _simpledialog().askstring("Withdraw", f"Current balance: ${self.machine.money:.2f}\nEnter amount to withdraw:")
+        if amount_str is None:
+            return
+        try:
+            amount = float(amount_str)
+        except ValueError:
+            self._log("Invalid input, please enter a number.", tag="err")
+            _messagebox().showerror("Withdraw", "Invalid input, please enter a number.")
+            return
+
+        try:
+            self.machine.withdraw(amount)
+        except ValueError as e:
+            self._log(str(e), tag="err")
+            _messagebox().showwarning("Withdraw", str(e))
+            return
+
+        self._log(f"Withdrew ${format_cents(to_cents(amount))}. Current amount: ${self.machine.money:.2f}", tag="ok")
+        self._mark_dirty("money", "status")
+
+    def _donate_money(self):
+        """Donation branch (matches CLI donate path)."""
+        if self.machine.money <= 0:
+            self._log("No money available to donate.", tag="warn")
+            _messagebox().showinfo("Donate", "No money available to donate.")
+            return
+
+        amount_str = _simpledialog().askstring("Donate", f"Current balance: ${self.machine.money:.2f}\nEnter donation amount:")
+        if amount_str is None:
+            return
+        try:
+            amount = float(amount_str)
+        except ValueError:
+            self._log("Invalid input, please enter a number.", tag="err")
+            _messagebox().showerror("Donate", "Invalid input, please enter a number.")
+            return
+
+        try:
+            self.machine.donate(amount)
+        except ValueError as e:
+            self._log(str(e), tag="err")
+            _messagebox().showwarning("Donate", str(e))
+            return
+
+        self._log(f"Thank you for your donation of ${format_cents(to_cents(amount))}.", tag="ok")
+        self._mark_dirty("money", "status")
+
+    # ----------------------------- Actions: Show Data ----------------------------- #
+    def _render_sales(self):
+        if not self._secondary_built:
+            return
+        # Keep the newest sales in view unless the user scrolled back in history
+        if self._sales_follow:
+            self._sales_offset = max(0, len(self.machine.ledger) - SALES_VISIBLE_ROWS)
+        self._fill_sales_window()
+        self._update_sales_scrollbar()
+
+        # Totals (running aggregates, no rescan of the history)
+        self.lbl_total_sales.config(text=str(self.machine.totals.count))
+        self.lbl_total_revenue.config(text=f"${self.machine.totals.revenue:.2f}")
+
+    def _sales_row(self, index):
+        sale = self.machine.ledger[index]
+        return (sale.coffee_type.title(), sale.size.title(), f"{sale.price_cents / 100:.2f} u")
+
+    def _fill_sales_window(self):
+        """Bring the Treeview in line with the current window, touching only changed rows."""
+        # The buffer rows sit above the visible ones, so the newest sale is never below the viewport
+        start = max(0, self._sales_offset - (SALES_WINDOW_ROWS - SALES_VISIBLE_ROWS))
+        stop = min(start + SALES_WINDOW_ROWS, len(self.machine.ledger))
+        old_start, old_stop = self._sales_shown
+        if (start, stop) == (old_start, old_stop):
+            self._scroll_tree(start)
+            return
+
+        items = self.tree.get_children()   # at most SALES_WINDOW_ROWS items
+        if old_start <= start <= old_stop and stop >= old_stop:
+            # Window moved forward (new sale or scrolling down): drop the rows that
+            # fell off the top and append only the new ones.
+            if start > old_start:
+                self.tree.delete(*items[:start - old_start])
+            for i in range(old_stop, stop):
+                self.tree.insert("", "end", values=self._sales_row(i))
+        else:
+            # Jump: rewrite the existing items in place, then fix the row count
+            for iid, i in zip(items, range(start, stop)):
+                self.tree.item(iid, values=self._sales_row(i))
+            if len(items) > stop - start:
+                self.tree.delete(*items[stop - start:])
+            for i in range(start + len(items), stop):
+                self.tree.insert("", "end", values=self._sales_row(i))
+        self._sales_shown = (start, stop)
+        self._sales_top = None
+        self._scroll_tree(start)
+
+    def _scroll_tree(self, start):
+        """Scroll the Treeview itself so the first visible sale is its top row."""
+        if self._sales_top == self._sales_offset:
+            return
+        items = self.tree.get_children()
+        if not items:
+            return
+        first = min(self._sales_offset - start, len(items) - 1)
+        # see() scrolls as little as possible: showing the bottom row, then the top one, pins the top
+        self.tree.see(items[min(first + SALES_VISIBLE_ROWS, len(items)) - 1])
+        self.tree.see(items[first])
+        self._sales_top = self._sales_offset
+
+    def _update_sales_scrollbar(self):
+        total = len(self.machine.ledger)
+        if total <= SALES_VISIBLE_ROWS:
+            self.sales_scroll.set(0.0, 1.0)
+        else:
+            first = self._sales_offset
+            self.sales_scroll.set(first / total, min(first + SALES_VISIBLE_ROWS, total) / total)
+
+    def _scroll_sales(self, action, value, unit=None):
+        """Scrollbar command: moves the window over the full history."""
+        total = len(self.machine.ledger)
+        max_offset = max(0, total - SALES_VISIBLE_ROWS)
+        if action == "moveto":
+            offset = int(float(value) * total)
+        else:
+            step = int(value) * (SALES_VISIBLE_ROWS if unit == "pages" else 1)
+            offset = self._sales_offset + step
+        self._sales_offset = max(0, min(offset, max_offset))
+        self._sales_follow = self._sales_offset >= max_offset
+        self._fill_sales_window()
+        self._update_sales_scrollbar()
+
+    def _on_sales_wheel(self, event):
+        step = -3 if event.num == 4 or event.delta > 0 else 3
+        self._scroll_sales("scroll", step, "units")
+        return "break"  # the Treeview only holds the window, don't let it scroll natively
+
+    # ----------------------------- Analytics ----------------------------- #
+    def _analytics_window(self, rollup, now):
+        """(rollup of the chosen window, its length in minutes)."""
+        _, seconds = ANALYTICS_WINDOWS[self.var_window.get()]
+        if seconds is None:
+            day = rollup.bucket_of("day", now)
+            window = rollup.range("day", day, day)
+            return window, max(1.0, (now - window.start) / 60)
+        return rollup.window(seconds, now), seconds / 60
+
+    def _render_analytics(self):
+        if not self._secondary_built:
+            return
+        now = time.time()
+        rollup = self.machine.sales_rollup()                        # Catches up with the sales since the last tick
+        window, minutes = self._analytics_window(rollup, now)
+        hours = rollup.buckets("hour", 24, now)
+        today = rollup.bucket_of("day", now)
+        peak = max((h for h in hours if rollup.bucket_of("day", h.start) == today and h.count),
+                   key=lambda h: h.count, default=None)
+        top = max(window.by_drink.items(), key=lambda item: item[1].count, default=None)
+        shown = (self.var_window.get(), window.count, window.revenue_cents, peak and (peak.start, peak.count),
+                 round(window.count / minutes, 1))
+        if shown == self._analytics_shown:                          # Nothing changed since the last tick
+            return
+        self._analytics_shown = shown
+        self.lbl_window_sales.config(text=f"{window.count} orders")
+        self.lbl_window_revenue.config(text=f"${format_cents(window.revenue_cents)}")
+        self.lbl_window_pace.config(text=f"{window.count / minutes:.1f} / min")
+        self.lbl_peak_hour.config(text=f"Peak: {time.strftime('%H:00', time.localtime(peak.start))} ({peak.count})"
+                                  if peak else "Peak: -")
+        self.lbl_window_top.config(text=f"Top: {top[0][1].title()} {top[0][0].title()} ({top[1].count})"
+                                   if top else "Top: -")
+        usage = window.usage
+        self.lbl_window_usage.config(text="Used: " + ", ".join(
+            f"{REFILL_LABELS[key][0].lower()} {format_amount(key, usage[key])}" for key in ("water", "milk", "coffee_beans"))
+            if window.count else "Used: -")
+
+    def _refresh_analytics(self):
+        self._render_analytics()
+        self.after(ANALYTICS_REFRESH_MS, self._refresh_analytics)
+
+    # ----------------------------- Rendering helpers ----------------------------- #
+    def _render_stock(self, keys=REFILL_LABELS):
+        # Labels and progress bars; the time until empty is on its own timer (_refresh_forecast)
+        stock = self.machine.stock.stock
+        for key in keys:
+            if key not in REFILL_LABELS:
+                continue
+            value = stock.get(key, 0)
+            getattr(self, f"lbl_{key}").config(text=format_amount(key, value))
+            getattr(self, f"bar_{key}")["value"] = min(value, self.machine.capacity[key])
+
+    def _refresh_forecast(self):
+        forecast = self.machine.forecast(keys=REFILL_LABELS)
+        for key, entry in forecast.items():
+            self._render_forecast(key, entry)
+        self.after(FORECAST_REFRESH_MS, self._refresh_forecast)
+
+    def _render_forecast(self, key, forecast):
+        """Time until empty next to the bar; warn once per tank when it empties before a refill could arrive."""
+        eta = format_time_left(forecast.seconds_left)
+        if self._eta_shown.get(key) != (eta, forecast.alert):   # the text changes every few minutes, not per tick
+            self._eta_shown[key] = (eta, forecast.alert)
+            getattr(self, f"eta_{key}").config(text=eta, foreground=PALETTE["warn"] if forecast.alert else "")
+        if forecast.alert and key not in self._alerted and forecast.level > 0:
+            self._alerted.add(key)
+            self._log(f"⏳ {REFILL_LABELS[key][0]} is running low at the current pace (empty in {eta}). Refill soon.",
+                      tag="warn")
+        elif not forecast.alert:
+            self._alerted.discard(key)
+
+    def _render_money(self):
+        if not self._secondary_built:
+            return
+        self.lbl_money.config(text=f"${self.machine.money:.2f}")
+
+    def _render_all(self):
+        with self.machine.metrics.span("render_seconds"):
+            self._render_stock()
+            self._render_money()
+            self._render_sales()
+            self._update_status()
+
+    def _mark_dirty(self, *parts, stock=()):
+        """Record what changed; bursts of actions share a single redraw when the loop goes idle."""
+        self._dirty.update(parts)
+        self._dirty_stock.update(stock)
+        if not self._render_scheduled:
+            self._render_scheduled = True
+            self.after_idle(self._render_dirty)
+
+    def _render_dirty(self):
+        with self.machine.metrics.span("render_seconds"):
+            self._render_scheduled = False
+            dirty, self._dirty = self._dirty, set()
+            stock, self._dirty_stock = self._dirty_stock, set()
+            if stock:
+                self._render_stock(stock)
+            if "money" in dirty:
+                self._render_money()
+            if "sales" in dirty:
+                self._render_sales()
+            if "status" in dirty:
+                self._update_status()
+
+    def _update_status(self):
+        self.status.config(
+            text=f"Selection: {self.var_size.get().title()} {self.var_type.get().title()}   |   "
+                 f"Balance: ${self.machine.money:.2f}   |   Cups: {self.machine.stock.stock.get('cups', 0)}"
+        )
+
+    def _watch_stock(self):
+        """Other processes change a shared stock: redraw it on a timer."""
+        self._mark_dirty("status", stock=tuple(REFILL_LABELS))
+        self.after(SHARED_STOCK_POLL_MS, self._watch_stock)
+
+    # ----------------------------- Performance ----------------------------- #
+    def _export_metrics(self):
+        self.machine.metrics.write(self._metrics_path)
+        self.after(METRICS_EXPORT_MS, self._export_metrics)
+
+    def _show_performance(self):
+        """Performance panel: latency per stage and counters, refreshed while it is open."""
+        if self._perf_window is not None and self._perf_window.winfo_exists():
+            self._perf_window.lift()
+            return
+        win = tk.Toplevel(self, bg=PALETTE["bg"])
+        win.title("Performance")
+        win.geometry("620x420")
+        if not self.machine.metrics.enabled:
+            ttk.Label(win, text="Metrics are disabled. Start with --metrics to collect them.",
+                      style="Status.TLabel").pack(padx=18, pady=18)
+            self._perf_window = win
+            return
+        win.rowconfigure(0, weight=1)
+        win.rowconfigure(1, weight=1)
+        win.columnconfigure(0, weight=1)
+
+        stages = ttk.Treeview(win, columns=("count", "mean", "p50", "p99"), show="tree headings", height=8)
+        stages.heading("#0", text="Stage")
+        for col, title in (("count", "Count"), ("mean", "Mean (ms)"), ("p50", "p50 ≤ (ms)"), ("p99", "p99 ≤ (ms)")):
+            stages.heading(col, text=title)
+            stages.column(col, width=90, anchor="e")
+        stages.grid(row=0, column=0, sticky="nsew", padx=12, pady=(12, 6))
+
+        counters = ttk.Treeview(win, columns=("value",), show="tree headings", height=6)
+        counters.heading("#0", text="Counter")
+        counters.heading("value", text="Value")
+        counters.column("value", width=90, anchor="e")
+        counters.grid(row=1, column=0, sticky="nsew", padx=12, pady=(6, 12))
+
+        self._perf_window = win
+        self._refresh_performance(stages, counters)
+
+    def _refresh_performance(self, stages, counters):
+        if self._perf_window is None or not self._perf_window.winfo_exists():
+            return
+        latencies, counts = self.machine.metrics.summary()
+        stages.delete(*stages.get_children())
+        for name, count, mean, p50, p99 in latencies:
+            stages.insert("", "end", text=name, values=(count, f"{mean:.3f}", f"{p50:.3f}", f"{p99:.3f}"))
+        counters.delete(*counters.get_children())
+        for name, value in counts:
+            counters.insert("", "end", text=name, values=(value,))
+        self.after(PERF_REFRESH_MS, self._refresh_performance, stages, counters)
+
+    # ----------------------------- Logging ----------------------------- #
+    def _log(self, text, tag=None):
+        line = text.strip()
+        self._log_pending.append((line + "\n", tag or ()))
+        if self._log_file is not None:
+            self._log_file.info(line)
+        if not self._log_flush_scheduled:
+            self._log_flush_scheduled = True
+            self.after(LOG_FLUSH_MS, self._flush_log)
+
+    def _flush_log(self):
+        """Write every pending message with one insert, then trim the pane to LOG_CAPACITY lines."""
+        self._log_flush_scheduled = False
+        if not self._log_pending or not self._secondary_built:
+            return                          # _build_secondary flushes once the pane exists
+        chunks = []
+        for text, tag in self._log_pending:
+            chunks += (text, tag)
+            self._log_lines += text.count("\n")
+        self._log_pending.clear()
+        with self.machine.metrics.span("log_flush_seconds"):
+            self.txt_log.insert("end", *chunks)
+
+            overflow = self._log_lines - LOG_CAPACITY
+            if overflow > 0:
+                self.txt_log.delete("1.0", f"{overflow + 1}.0")
+                self._log_lines = LOG_CAPACITY
+            self.txt_log.see("end")
+
+    def _open_log_file(self, path):
+        """Full message history on disk, rotated so it never grows without bound. Closed by destroy()."""
+        import logging
+        import logging.handlers
+        # Not through getLogger(): a registered per-window logger would stay in loggerDict after the window
+        # is gone. This one has no parent, so nothing reaches the root handlers either.
+        logger = logging.Logger("coffee_machine.messages", logging.INFO)
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        logger.addHandler(handler)
+        return logger
+
+    def _close_log_file(self):
+        if self._log_file is None:
+            return
+        for handler in list(self._log_file.handlers):
+            self._log_file.removeHandler(handler)
+            handler.close()
+        self._log_file = None
@@ -0,0 +1,354 @@
+# ============================================================
+#  Project: Coffee Machine Simulation
+#  File: gui_load.py
+#
+#  Author(s): Sofia Vanessa and Ximena Isaac
+#
+#  Credits:
+#    - Functional design and logic implemented by both authors.
+#
+#  Notes:
+#    This project was created for learning purposes.
+#    GUI load test: drives a real CoffeeMachineApp with scripted bursts of
+#    brew, refill, withdraw and donate actions queued through the Tk event
+#    loop, and reports
+#      - latency per action, from being queued until the screen is idle again
+#      - event-loop stalls (how late a 5 ms heartbeat timer fires)
+#      - growth of the Treeview items, Text lines and process memory
+#    Dialogs are answered by a script (a real modal dialog would wait for a
+#    person), so withdraw/donate exercise the whole flow without blocking.
+#
+#      python gui_load.py --actions 10000               (starts Xvfb if there is no display)
+#      python gui_load.py --report ui.json --compare ui_previous.json
+#      python gui_load.py --stub                        (no Tk: stub widgets from bench.py)
+# ============================================================
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import time
+
+from engine import CoffeeMachine
+
+HEARTBEAT_MS = 5                # event-loop probe period
+STALL_MS = 50                   # a heartbeat this late counts as a visible stall
+SAMPLE_EVERY = 500              # actions between memory samples
+BURST_GAP_MS = 20               # idle time between bursts
+REPORT_PATH = "gui_load_report.json"
+
+# action -> weight in the generated script
+ACTION_WEIGHTS = {"brew": 62, "refill": 24, "fill_all": 4, "withdraw": 5, "donate": 5}
+REFILLS = ("_refill_water", "_refill_milk", "_refill_beans", "_refill_cups")
+
+
+# ----------------------------- Script ----------------------------- #
+def make_script(actions, burst=20, seed=1):
+    """Bursts (lists of action names) adding up to `actions`; burst sizes vary from 1 to `burst`."""
+    rng = random.Random(seed)
+    names, weights = zip(*ACTION_WEIGHTS.items())
+    script = []
+    left = actions
+    while left > 0:
+        size = min(left, rng.randint(1, burst))
+        script.append(rng.choices(names, weights, k=size))
+        left -= size
+    return script
+
+
+#This class answers the app's dialogs instead of a person
+class _ScriptedDialogs:
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.shown = 0
+
+    def askstring(self, title, prompt):
+        self.shown += 1
+        return f"{self.rng.randint(1, 400) / 100:.2f}"
+
+    def _show(self, title, message):
+        self.shown += 1
+        return "ok"
+
+    showinfo = showwarning = showerror = _show
+
+
+@contextlib.contextmanager
+def scripted_dialogs(seed):
+    import gui
+    dialogs = _ScriptedDialogs(seed)
+    saved = gui._messagebox, gui._simpledialog
+    gui._messagebox = gui._simpledialog = lambda: dialogs
+    try:
+        yield dialogs
+    finally:
+        gui._messagebox, gui._simpledialog = saved
+
+
+def _perform(app, name, rng):
+    if name == "brew":
+        app.var_type.set(rng.choice(("espresso", "latte", "capuccino")))
+        app.var_size.set(rng.choice(("small", "medium", "large")))
+        app._brew()
+    elif name == "refill":
+        getattr(app, rng.choice(REFILLS))()
+    elif name == "fill_all":
+        app._fill_all()
+    elif name == "withdraw":
+        app._withdraw_money()
+    elif name == "donate":
+        app._donate_money()
+
+
+# ----------------------------- Measurements ----------------------------- #
+def _rss_kb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        import resource                                             # Peak, not current, outside Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _widget_counts(app):
+    """(Treeview items, lines in the Messages Text)."""
+    items = len(app.tree.get_children())
+    if hasattr(app.txt_log, "lines"):                               # bench.py stub widget
+        return items, len(app.txt_log.lines)
+    return items, int(app.txt_log.index("end-1c").split(".")[0])
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+#This class collects latencies, heartbeat delays and memory samples during a run
+class _Recorder:
+    def __init__(self, app):
+        self.app = app
+        self.latency = {}                                           # action -> [ms]
+        self.lateness = []                                          # heartbeat ms late
+        self.samples = []
+        self.done = 0
+        self.sample()
+
+    def action_done(self, name, ms):
+        self.latency.setdefault(name, []).append(ms)
+        self.done += 1
+        if self.done % SAMPLE_EVERY == 0:
+            self.sample()
+
+    def sample(self):
+        items, lines = _widget_counts(self.app)
+        self.samples.append({"actions": self.done, "tree_items": items, "text_lines": lines, "rss_kb": _rss_kb()})
+
+    def report(self, elapsed, dialogs):
+        actions = {}
+        every = []
+        for name, values in sorted(self.latency.items()):
+            values.sort()
+            every += values
+            actions[name] = _summary(values)
+        every.sort()
+        late = sorted(self.lateness)
+        first, last = self.samples[0], self.samples[-1]
+        return {
+            "actions": self.done,
+            "seconds": round(elapsed, 3),
+            "actions_per_sec": round(self.done / elapsed, 1) if elapsed else 0.0,
+            "dialogs": dialogs,
+            "latency_ms": {"all": _summary(every), **actions},
+            "stalls": {"heartbeat_ms": HEARTBEAT_MS, "p99_late_ms": round(_percentile(late, 0.99), 3),
+                       "max_late_ms": round(late[-1], 3) if late else 0.0,
+                       f"over_{STALL_MS}ms": sum(1 for v in late if v > STALL_MS)},
+            "growth": {key: last[key] - first[key] for key in ("tree_items", "text_lines", "rss_kb")},
+            "samples": self.samples,
+        }
+
+
+def _summary(values):
+    return {"count": len(values), "p50": round(_percentile(values, 0.50), 3),
+            "p95": round(_percentile(values, 0.95), 3), "p99": round(_percentile(values, 0.99), 3),
+            "max": round(values[-1], 3) if values else 0.0}
+
+
+# ----------------------------- Drivers ----------------------------- #
+'''
+Every action of a burst is queued with after(0), like clicks arriving
+together, and timed from that moment. It counts as finished once nothing is
+left for the screen to do: no redraw scheduled, no log lines waiting for
+the Messages pane, and update_idletasks() has painted the widgets.
+'''
+def run_tk(app, script, seed):
+    from gui import LOG_FLUSH_MS
+
+    app.wait_visibility()                                           # First frame (its Expose builds the rest)
+    app.update()                                                    # ...and the deferred panels
+    rec = _Recorder(app)
+    rng = random.Random(seed)
+    bursts = iter(script)
+    pending = [0]
+    beat = [time.perf_counter() + HEARTBEAT_MS / 1000]
+
+    def heartbeat():
+        now = time.perf_counter()
+        rec.lateness.append(max(0.0, (now - beat[0]) * 1000))
+        beat[0] = now + HEARTBEAT_MS / 1000
+        app.after(HEARTBEAT_MS, heartbeat)
+
+    def act(name, queued):
+        _perform(app, name, rng)
+        app.after_idle(settle, name, queued)
+
+    def settle(name, queued):
+        if app._render_scheduled or app._log_pending:
+            app.after(LOG_FLUSH_MS, settle, name, queued)
+            return
+        app.update_idletasks()
+        rec.action_done(name, (time.perf_counter() - queued) * 1000)
+        pending[0] -= 1
+        if not pending[0]:
+            app.after(BURST_GAP_MS, next_burst)
+
+    def next_burst():
+        burst = next(bursts, None)
+        if burst is None:
+            app.quit()
+            return
+        pending[0] = len(burst)
+        queued = time.perf_counter()
+        for name in burst:
+            app.after(0, act, name, queued)
+
+    app.after(HEARTBEAT_MS, heartbeat)
+    app.after(BURST_GAP_MS, next_burst)
+    t0 = time.perf_counter()
+    app.mainloop()
+    elapsed = time.perf_counter() - t0
+    rec.sample()
+    return rec, elapsed
+
+
+def run_stub(app, script, seed):
+    """Same script on bench.py's stub widgets: the Python side of each action, no Tk."""
+    rec = _Recorder(app)
+    rng = random.Random(seed)
+    t0 = time.perf_counter()
+    for burst in script:
+        queued = time.perf_counter()
+        for name in burst:
+            _perform(app, name, rng)
+        app.run_idle()
+        for name in burst:
+            rec.action_done(name, (time.perf_counter() - queued) * 1000)
+    elapsed = time.perf_counter() - t0
+    rec.sample()
+    return rec, elapsed
+
+
+@contextlib.contextmanager
+def virtual_display():
+    """Use $DISPLAY if there is one, otherwise run an Xvfb server for the duration."""
+    if os.environ.get("DISPLAY"):
+        yield os.environ["DISPLAY"]
+        return
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        raise RuntimeError("no display and no Xvfb: install xvfb, or use --stub")
+    number = next(n for n in range(99, 200) if not os.path.exists(f"/tmp/.X{n}-lock"))
+    server = subprocess.Popen([xvfb, f":{number}", "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 10
+        while not os.path.exists(f"/tmp/.X11-unix/X{number}"):
+            if server.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError(f"Xvfb did not start on :{number}")
+            time.sleep(0.05)
+        os.environ["DISPLAY"] = f":{number}"
+        yield os.environ["DISPLAY"]
+    finally:
+        os.environ.pop("DISPLAY", None)
+        server.terminate()
+        server.wait()
+
+
+# ----------------------------- Report ----------------------------- #
+def print_report(report, previous=None):
+    print(f"{report['actions']} actions in {report['seconds']:.2f} s ({report['actions_per_sec']:,.0f}/s), "
+          f"{report['dialogs']} dialogs answered")
+    print(f"{'latency (ms)':<14}{'count':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for name, s in report["latency_ms"].items():
+        line = f"{name:<14}{s['count']:>8}{s['p50']:>9.2f}{s['p95']:>9.2f}{s['p99']:>9.2f}{s['max']:>9.2f}"
+        old = previous and previous["latency_ms"].get(name)
+        if old and old["p95"]:
+            line += f"   p95 {s['p95'] / old['p95'] - 1:+.0%}"
+        print(line)
+    stalls = report["stalls"]
+    print(f"stalls: p99 {stalls['p99_late_ms']:.2f} ms late, max {stalls['max_late_ms']:.2f} ms, "
+          f"{stalls[f'over_{STALL_MS}ms']} over {STALL_MS} ms")
+    growth = report["growth"]
+    print(f"growth: Treeview {growth['tree_items']:+d} items, Messages {growth['text_lines']:+d} lines, "
+          f"RSS {growth['rss_kb']:+,d} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Tk front end with scripted action bursts")
+    parser.add_argument("--actions", type=int, default=10000)
+    parser.add_argument("--burst", type=int, default=20, help="largest burst of actions queued at once")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--history", type=int, default=0, help="sales already in the ledger at start")
+    parser.add_argument("--report", default=REPORT_PATH, help="JSON report to write")
+    parser.add_argument("--compare", default=None, help="earlier report to compare latencies with")
+    parser.add_argument("--stub", action="store_true", help="stub widgets instead of Tk (no display needed)")
+    args = parser.parse_args()
+
+    if args.history:
+        from bench import _unlimited_machine
+        machine = _unlimited_machine(args.history)
+    else:
+        machine = CoffeeMachine()
+        machine.fill_all()
+    script = make_script(args.actions, args.burst, args.seed)
+
+    with scripted_dialogs(args.seed) as dialogs:
+        if args.stub:
+            from bench import _stub_app
+            rec, elapsed = run_stub(_stub_app(machine), script, args.seed)
+            backend = "stub"
+        else:
+            with virtual_display():
+                from gui import CoffeeMachineApp
+                import tkinter
+                app = CoffeeMachineApp(machine)
+                try:
+                    rec, elapsed = run_tk(app, script, args.seed)
+                finally:
+                    app.destroy()
+                backend = f"tk {tkinter.TkVersion}"
+
+    report = rec.report(elapsed, dialogs.shown)
+    report["run"] = {"backend": backend, "python": platform.python_version(), "platform": platform.platform(),
+                     "seed": args.seed, "burst": args.burst, "history": args.history,
+                     "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    print_report(report, previous)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except RuntimeError as e:
+        sys.exit(str(e))
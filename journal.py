@@ -0,0 +1,499 @@
+# ============================================================
+#  Project: Coffee Machine Simulation
+#  File: journal.py
+#
+#  Author(s): Sofia Vanessa and Ximena Isaac
+#
+#  Credits:
+#    - Functional design and logic implemented by both authors.
+#
+#  Notes:
+#    This project was created for learning purposes.
+#    Append-only write-ahead log for orders, refills, withdrawals and
+#    donations, plus periodic snapshots so a restart only replays a
+#    bounded tail:
+#
+#      journal.log   16-byte header (magic, generation) + fixed 20-byte records
+#      snapshot.bin  full machine state at the start of a log generation,
+#                    sales rollup included (version 2 files had none)
+#
+#    Every amount is an integer: money in cents, stock in base units. A
+#    machine serving from a stock it does not own (shared memory, see
+#    open_machine) journals only its sales and money.
+#
+#    A snapshot bumps the generation and starts a new log; the old one is
+#    kept as journal.<generation>.log until the snapshot is on disk. On
+#    recovery the snapshot is followed by any kept logs of its generation
+#    onward and then journal.log, so a crash at any step loses nothing. A
+#    log older than the snapshot is already included in it and is ignored.
+# ============================================================
+
+import functools
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+
+from coffeeprep import COFFEE_TYPES, SIZES, RECIPES, optional_numpy
+from engine import CoffeeMachine
+from sales import SalesLedger
+
+
+INGREDIENTS = ("water", "milk", "coffee_beans", "cups")          # Position = ingredient code in records
+
+# Record kinds
+ORDER, REFILL, WITHDRAW, DONATE = 1, 2, 3, 4
+
+LOG_MAGIC = b"CMWAL\x00\x02\x00"
+SNAPSHOT_MAGIC = b"CMSNP\x00\x03\x00"
+SNAPSHOT_MAGIC_V2 = b"CMSNP\x00\x02\x00"                            # Same layout, no rollup at the end
+LOG_HEADER = struct.Struct("<8sQ")                                  # magic, generation
+RECORD = struct.Struct("<BBBxqd")                                   # kind, a, b, value, timestamp
+SNAPSHOT_HEADER = struct.Struct("<8sQQqqq4q")                       # magic, generation, sales, money,
+                                                                    # total count, total revenue, stock
+DRINK_TOTALS = struct.Struct("<qq")                                 # per (type, size): count, revenue
+ROLLUP_ROWS = struct.Struct("<q")                                   # sales the stored rollup covers
+MENU = [(t, s) for t in COFFEE_TYPES for s in SIZES]
+
+DEFAULT_SYNC_RECORDS = 256      # fsync after this many buffered records...
+DEFAULT_SYNC_INTERVAL = 0.05    # ...or this many seconds, whichever comes first
+DEFAULT_SNAPSHOT_EVERY = 100000 # records replayed at most on restart
+SNAPSHOT_CHUNK_ROWS = 1 << 16   # ledger rows copied per write while saving a snapshot
+
+
+#This class appends records to the log with group-commit fsync batching
+class Journal:
+    def __init__(self, directory, sync_records=DEFAULT_SYNC_RECORDS,
+                 sync_interval=DEFAULT_SYNC_INTERVAL, snapshot_every=DEFAULT_SNAPSHOT_EVERY, journal_stock=True):
+        self.directory = directory
+        self.log_path = os.path.join(directory, "journal.log")
+        self.snapshot_path = os.path.join(directory, "snapshot.bin")
+        self.sync_records = sync_records
+        self.sync_interval = sync_interval
+        self.snapshot_every = snapshot_every
+        self.journal_stock = journal_stock                          # False: levels live elsewhere, not restored
+        self.machine = None                                         # Set by open_machine()
+        self.generation = 0
+        self._file = None
+        self._buffer = bytearray()
+        self._buffered = 0
+        self._since_snapshot = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()                     # One snapshot write at a time
+        self._closed = threading.Event()
+        self._snapshot_due = threading.Event()                      # Set by maybe_snapshot, cleared by the flusher
+        self._flusher = None
+
+    # ----------------------------- Writing ----------------------------- #
+    def order(self, coffee_type, size, price, timestamp):
+        self._append(ORDER, COFFEE_TYPES.index(coffee_type), SIZES.index(size), price, timestamp)
+
+    def orders(self, codes, price_cents_by_code, timestamp):
+        """One ORDER record per menu code (code = drink * len(SIZES) + size), written as one block."""
+        np = optional_numpy()
+        if np is not None:
+            c = np.frombuffer(codes, dtype=np.uint8)
+            records = np.zeros(len(c), dtype=_record_dtype())
+            records["kind"] = ORDER
+            records["a"] = c // len(SIZES)
+            records["b"] = c % len(SIZES)
+            records["value"] = np.asarray(price_cents_by_code, dtype=np.int64)[c]
+            records["timestamp"] = timestamp
+            data = records.tobytes()
+        else:
+            packed = [RECORD.pack(ORDER, code // len(SIZES), code % len(SIZES), price_cents_by_code[code], timestamp)
+                      for code in range(len(price_cents_by_code))]
+            data = b"".join([packed[code] for code in codes])
+        self._append_block(data, len(codes))
+
+    def refill(self, ingredient, amount):
+        if not self.journal_stock:
+            return
+        self._append(REFILL, INGREDIENTS.index(ingredient), 0, amount, time.time())
+
+    def withdraw(self, amount):
+        self._append(WITHDRAW, 0, 0, amount, time.time())
+
+    def donate(self, amount):
+        self._append(DONATE, 0, 0, amount, time.time())
+
+    def _append(self, kind, a, b, value, timestamp):
+        self._append_block(RECORD.pack(kind, a, b, value, timestamp), 1)
+
+    def _append_block(self, data, records):
+        with self._lock:
+            self._buffer += data
+            self._buffered += records
+            self._since_snapshot += records
+            if (self._buffered >= self.sync_records
+                    or time.monotonic() - self._last_sync >= self.sync_interval):
+                self._sync_locked()
+
+    def flush(self):
+        with self._lock:
+            self._sync_locked()
+
+    def _sync_locked(self):
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._file.flush()
+            os.fsync(self._file.fileno())                           # One fsync for the whole group
+            self._buffer.clear()
+            self._buffered = 0
+        self._last_sync = time.monotonic()
+
+    def _flush_idle(self):
+        """
+        Background thread: sync records that would otherwise wait for the
+        next append, and write the snapshots maybe_snapshot asked for.
+        """
+        while True:
+            self._snapshot_due.wait(self.sync_interval)
+            if self._closed.is_set():
+                return
+            with self._lock:
+                if self._buffer and time.monotonic() - self._last_sync >= self.sync_interval:
+                    self._sync_locked()
+            if self._snapshot_due.is_set():
+                self._snapshot_due.clear()
+                self.snapshot(wait=False)
+
+    def close(self):
+        """Stop the flusher (letting a snapshot it is writing finish), then sync and close the log."""
+        self._closed.set()
+        self._snapshot_due.set()                                    # Wake it now rather than after sync_interval
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join()
+        with self._lock:
+            if self._file is not None:
+                self._sync_locked()
+                self._file.close()
+                self._file = None
+
+    # ----------------------------- Snapshots ----------------------------- #
+    '''
+    The engine appends records while holding its own lock, so the lock order
+    is always machine -> stock -> journal. A snapshot holds all three only to
+    copy the small state (stock, money, totals, ledger length) and rotate the
+    log. The ledger only ever grows, so its first rows are written after the
+    locks are released and orders keep flowing during the write. Callers on
+    the order path (the engine, and through it the server's event loop)
+    only flag that one is due; the flusher thread writes it.
+    '''
+    def maybe_snapshot(self):
+        if self._since_snapshot >= self.snapshot_every:
+            self._snapshot_due.set()
+
+    def snapshot(self, wait=True):
+        if not self._snapshot_lock.acquire(blocking=wait):
+            return                                                  # Another thread is writing one
+        try:
+            machine = self.machine
+            machine.sync_analytics()                                # Outside the locks: leaves a short rollup tail
+            with machine._lock, machine.stock._lock, self._lock:
+                if not wait and self._since_snapshot < self.snapshot_every:
+                    return                                          # Taken just before this thread got here
+                self._sync_locked()
+                state = _capture(machine)
+                self._file.close()
+                os.replace(self.log_path, _kept_log_path(self.directory, self.generation))
+                self.generation += 1
+                self._file = _new_log(self.log_path, self.generation)
+                self._since_snapshot = 0
+                generation = self.generation
+            tmp_path = self.snapshot_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                _write_snapshot(f, state, machine.ledger, generation)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)                # Atomic swap of the snapshot
+            for path in _kept_logs(self.directory, below=generation):
+                os.remove(path)                                     # Their records are in the snapshot now
+        finally:
+            self._snapshot_lock.release()
+
+    # ----------------------------- Recovery ----------------------------- #
+    def recover(self, machine):
+        """Load the snapshot and replay the log tail into machine, then open the log for appending."""
+        os.makedirs(self.directory, exist_ok=True)
+        rolled_up = 0
+        if os.path.exists(self.snapshot_path):
+            self.generation, rolled_up = _load_snapshot(self.snapshot_path, machine, self.journal_stock)
+
+        replayed, valid_size, log_generation, self.generation = _replay_logs(self.directory, machine, self.generation,
+                                                                              self.journal_stock)
+        if rolled_up is None:                                       # Older snapshot: build it once from the ledger
+            machine.rollup.rebuild(machine.ledger)
+            rolled_up = len(machine.ledger)
+        machine._analytics_restored(rolled_up)                      # The replayed tail is added when first read
+        if log_generation == self.generation:
+            with open(self.log_path, "r+b") as f:
+                f.truncate(valid_size)                              # Drop a torn record from a crash
+            self._file = open(self.log_path, "ab")
+        else:
+            self._file = _new_log(self.log_path, self.generation)
+        self._since_snapshot = replayed
+        self.machine = machine
+        self._flusher = threading.Thread(target=self._flush_idle, name="journal-flush", daemon=True)
+        self._flusher.start()
+        return replayed
+
+
+def _new_log(path, generation):
+    f = open(path, "wb")
+    f.write(LOG_HEADER.pack(LOG_MAGIC, generation))
+    f.flush()
+    os.fsync(f.fileno())
+    return f
+
+
+@functools.lru_cache(maxsize=None)
+def _record_dtype():
+    np = optional_numpy()                                           # Same 20-byte layout as RECORD
+    return np.dtype([("kind", "u1"), ("a", "u1"), ("b", "u1"), ("pad", "u1"),
+                     ("value", "<i8"), ("timestamp", "<f8")])
+
+
+def _kept_log_path(directory, generation):
+    return os.path.join(directory, f"journal.{generation}.log")
+
+
+def _kept_logs(directory, below):
+    """Logs kept by earlier snapshots, with generations below `below`."""
+    paths = []
+    for name in os.listdir(directory):
+        parts = name.split(".")
+        if len(parts) == 3 and parts[0] == "journal" and parts[2] == "log" and parts[1].isdigit():
+            if int(parts[1]) < below:
+                paths.append(os.path.join(directory, name))
+    return paths
+
+
+def _capture(machine):
+    """The snapshot state that can change (call with the machine, stock and journal locks held)."""
+    stock = machine.stock.stock
+    totals = machine.totals
+    return {
+        "sales": len(machine.ledger),
+        "money": machine.money_cents,
+        "count": totals.count,
+        "revenue": totals.revenue_cents,
+        "stock": [stock.get(key, 0) for key in INGREDIENTS],
+        "drinks": [tuple(totals.by_drink.get(key, (0, 0))) for key in MENU],
+        "rollup": machine._rollup_state(),                          # ~1 MB copy, keeps restarts from rebuilding it
+    }
+
+
+def _write_snapshot(f, state, ledger, generation):
+    f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, generation, state["sales"], state["money"],
+                                 state["count"], state["revenue"], *state["stock"]))
+    f.write(b"".join(DRINK_TOTALS.pack(count, revenue) for count, revenue in state["drinks"]))
+    sales = state["sales"]
+    for column in (ledger.drink, ledger.size, ledger.price_cents, ledger.timestamp):
+        for first in range(0, sales, SNAPSHOT_CHUNK_ROWS):          # Slices of rows that no longer change
+            f.write(column[first:min(first + SNAPSHOT_CHUNK_ROWS, sales)].tobytes())
+    rolled_up, rollup = state["rollup"]
+    f.write(ROLLUP_ROWS.pack(rolled_up))
+    f.write(rollup)
+
+
+def _load_snapshot(path, machine, with_stock=True):
+    """
+    Returns (generation, sales the restored rollup covers, or None if it was
+    not restored). with_stock=False keeps the stock levels.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        (magic, generation, sales, money, count, revenue, *levels) = SNAPSHOT_HEADER.unpack_from(mm, 0)
+        if magic not in (SNAPSHOT_MAGIC, SNAPSHOT_MAGIC_V2):
+            raise ValueError(f"{path} is not a coffee machine snapshot of this version")
+        machine.money_cents = money
+        if with_stock:
+            for key, level in zip(INGREDIENTS, levels):
+                machine.stock.stock[key] = level
+        machine.totals.count = count
+        machine.totals.revenue_cents = revenue
+        offset = SNAPSHOT_HEADER.size
+        for key in MENU:
+            drink_count, drink_revenue = DRINK_TOTALS.unpack_from(mm, offset)
+            offset += DRINK_TOTALS.size
+            if drink_count:
+                machine.totals.by_drink[key] = [drink_count, drink_revenue]
+        for name in ("drink", "size", "price_cents", "timestamp"):   # Bulk copy straight from the map
+            column = array(getattr(machine.ledger, name).typecode)
+            end = offset + sales * column.itemsize
+            column.frombytes(mm[offset:end])
+            setattr(machine.ledger, name, column)
+            offset = end
+        rolled_up = None
+        if magic == SNAPSHOT_MAGIC:
+            (rows,) = ROLLUP_ROWS.unpack_from(mm, offset)
+            if machine.rollup.load_bytes(mm[offset + ROLLUP_ROWS.size:]):
+                rolled_up = rows
+    return generation, rolled_up
+
+
+def _replay_log(path, machine, generation, with_stock=True):
+    """Apply every whole record of a current-generation log. Returns (records, valid size, log generation)."""
+    size = os.path.getsize(path)
+    if size < LOG_HEADER.size:
+        return 0, 0, -1
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        log_generation = _log_generation(mm, path)
+        if log_generation != generation:
+            return 0, 0, log_generation
+        whole = (size - LOG_HEADER.size) // RECORD.size * RECORD.size
+        body = mm[LOG_HEADER.size:LOG_HEADER.size + whole]
+
+    stock = machine.stock.stock if with_stock else dict.fromkeys(INGREDIENTS, 0)  # Else a scratch copy
+    ledger = machine.ledger
+    totals = machine.totals
+    count = 0
+    for kind, a, b, value, timestamp in RECORD.iter_unpack(body):
+        if kind == ORDER:
+            coffee_type, size_name = COFFEE_TYPES[a], SIZES[b]
+            for ingredient, amount in RECIPES[(coffee_type, size_name)][0].items():
+                if ingredient in stock:
+                    stock[ingredient] -= amount
+            stock["cups"] -= 1
+            ledger.append(coffee_type, size_name, value, timestamp)
+            totals.add(coffee_type, size_name, value)
+            machine.money_cents += value
+        elif kind == REFILL:
+            key = INGREDIENTS[a]
+            stock[key] = stock.get(key, 0) + value
+        elif kind in (WITHDRAW, DONATE):
+            machine.money_cents -= value
+        count += 1
+    return count, LOG_HEADER.size + whole, log_generation
+
+
+def _log_generation(mm, path):
+    """Generation in a mapped log's header, or -1 if it is not a log."""
+    magic, log_generation = LOG_HEADER.unpack_from(mm, 0)
+    if magic[:5] == LOG_MAGIC[:5] and magic != LOG_MAGIC:
+        raise ValueError(f"{path} was written by another version of the journal format")
+    return log_generation if magic == LOG_MAGIC else -1
+
+
+def _replay_logs(directory, machine, generation, with_stock=True):
+    """
+    Replay the logs kept by unfinished snapshots (generation, generation + 1, ...)
+    and then journal.log. Returns (records, valid size of journal.log, its
+    generation, generation reached).
+    """
+    replayed = 0
+    while True:
+        path = _kept_log_path(directory, generation)
+        if not os.path.exists(path):
+            break
+        count, _, kept_generation = _replay_log(path, machine, generation, with_stock)
+        if kept_generation != generation:
+            break
+        replayed += count
+        generation += 1
+    log_path = os.path.join(directory, "journal.log")
+    if not os.path.exists(log_path):
+        return replayed, 0, -1, generation
+    count, valid_size, log_generation = _replay_log(log_path, machine, generation, with_stock)
+    return replayed + count, valid_size, log_generation, generation
+
+
+def open_machine(directory, capacity=None, stock=None, **options):
+    """
+    Build a CoffeeMachine from the journal in directory and keep journaling
+    into it. With `stock` (e.g. a SharedStockIngredients) the machine serves
+    from that instead; other processes change its levels, so they are
+    neither journaled nor restored here.
+    """
+    journal = Journal(directory, journal_stock=stock is None, **options)
+    machine = CoffeeMachine(stock=stock, capacity=capacity)
+    journal.recover(machine)
+    machine.journal = journal
+    return machine
+
+
+def load_machine(directory, capacity=None):
+    """Read-only copy of the journaled state (no log opened for writing), e.g. for exports."""
+    machine = CoffeeMachine(capacity=capacity)
+    snapshot_path = os.path.join(directory, "snapshot.bin")
+    generation, rolled_up = _load_snapshot(snapshot_path, machine) if os.path.exists(snapshot_path) else (0, 0)
+    _replay_logs(directory, machine, generation)
+    if rolled_up is None:
+        machine.rollup.rebuild(machine.ledger)
+        rolled_up = len(machine.ledger)
+    machine._analytics_restored(rolled_up)
+    return machine
+
+
+def iter_sales(directory, chunk_rows=SNAPSHOT_CHUNK_ROWS):
+    """
+    Yield the journaled sales as SalesLedger chunks of at most chunk_rows,
+    read straight from the snapshot map and then the log tail, so memory
+    stays constant however long the history is (see export.py).
+    """
+    generation = 0
+    snapshot_path = os.path.join(directory, "snapshot.bin")
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, generation, sales = SNAPSHOT_HEADER.unpack_from(mm, 0)[:3]
+            if magic not in (SNAPSHOT_MAGIC, SNAPSHOT_MAGIC_V2):
+                raise ValueError(f"{snapshot_path} is not a coffee machine snapshot of this version")
+            offsets = {}
+            offset = SNAPSHOT_HEADER.size + len(MENU) * DRINK_TOTALS.size
+            for name, column in _ledger_columns(SalesLedger()):
+                offsets[name] = offset
+                offset += sales * column.itemsize
+            for first in range(0, sales, chunk_rows):
+                rows = min(chunk_rows, sales - first)
+                chunk = SalesLedger()
+                for name, column in _ledger_columns(chunk):
+                    start = offsets[name] + first * column.itemsize
+                    column.frombytes(mm[start:start + rows * column.itemsize])
+                yield chunk
+
+    log_path = os.path.join(directory, "journal.log")
+    while True:                                                     # Kept logs of unfinished snapshots, then journal.log
+        path = _kept_log_path(directory, generation)
+        if not os.path.exists(path):
+            path = log_path
+        if not os.path.exists(path) or os.path.getsize(path) < LOG_HEADER.size:
+            return
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if _log_generation(mm, path) != generation:
+                return
+            end = LOG_HEADER.size + (len(mm) - LOG_HEADER.size) // RECORD.size * RECORD.size
+            step = chunk_rows * RECORD.size
+            for first in range(LOG_HEADER.size, end, step):
+                chunk = _order_chunk(mm[first:min(first + step, end)])
+                if len(chunk):
+                    yield chunk
+        if path == log_path:
+            return
+        generation += 1
+
+
+def _ledger_columns(ledger):
+    """(name, column) pairs in the order snapshots store them."""
+    return [(name, getattr(ledger, name)) for name in ("drink", "size", "price_cents", "timestamp")]
+
+
+def _order_chunk(body):
+    """SalesLedger of the ORDER records among the whole records in body."""
+    chunk = SalesLedger()
+    np = optional_numpy()
+    if np is not None:
+        records = np.frombuffer(body, dtype=_record_dtype())
+        orders = records[records["kind"] == ORDER]
+        for (name, column), field in zip(_ledger_columns(chunk), ("a", "b", "value", "timestamp")):
+            column.frombytes(orders[field].tobytes())
+        return chunk
+    for kind, a, b, value, timestamp in RECORD.iter_unpack(body):
+        if kind == ORDER:
+            chunk.drink.append(a)
+            chunk.size.append(b)
+            chunk.price_cents.append(value)
+            chunk.timestamp.append(timestamp)
+    return chunk
@@ -0,0 +1,115 @@
+# ============================================================
+#  Project: Coffee Machine Simulation
+#  File: loadgen.py
+#
+#  Author(s): Sofia Vanessa and Ximena Isaac
+#
+#  Credits:
+#    - Functional design and logic implemented by both authors.
+#
+#  Notes:
+#    This project was created for learning purposes.
+#    Load generator for server.py. Reports p50/p99 latency and throughput.
+#      python loadgen.py --clients 2000 --orders 20           (in-process server)
+#      python loadgen.py --port 8765 --clients 2000           (running server)
+# ============================================================
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+
+from coffeeprep import COFFEE_TYPES, SIZES
+from engine import CoffeeMachine
+from server import OrderServer
+
+
+def _raise_fd_limit():
+    """Thousands of sockets need more than the usual 1024 file descriptors."""
+    try:
+        import resource
+    except ImportError:                                             # Windows
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard if hard != resource.RLIM_INFINITY else 65536, hard))
+
+
+async def _client(host, port, orders, latencies, outcomes, start_gate):
+    reader, writer = await asyncio.open_connection(host, port, limit=2**16)
+    await start_gate.wait()
+    rng = random.Random()
+    try:
+        for i in range(orders):
+            request = {"id": i, "type": rng.choice(COFFEE_TYPES), "size": rng.choice(SIZES)}
+            t0 = time.perf_counter()
+            writer.write(json.dumps(request).encode() + b"\n")
+            reply = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - t0)
+            outcomes["ok" if reply["ok"] else reply["error"]] += 1
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_load(host="127.0.0.1", port=None, clients=1000, orders=20, **server_options):
+    """Run `clients` concurrent clients, each sending `orders` orders one after another."""
+    server = None
+    if port is None:
+        machine = CoffeeMachine()
+        machine.stock.stock = {key: 10**12 for key in machine.stock.stock}  # Measure serving, not stockouts
+        server = OrderServer(machine, **server_options)
+        await server.start(host, 0)
+        port = server.port
+
+    latencies, outcomes = [], Counter()
+    start_gate = asyncio.Event()
+    tasks = [asyncio.create_task(_client(host, port, orders, latencies, outcomes, start_gate))
+             for _ in range(clients)]
+    await asyncio.sleep(0.1)                                        # Let the connections open
+    t0 = time.perf_counter()
+    start_gate.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - t0
+    if server is not None:
+        await server.close()
+
+    latencies.sort()
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "outcomes": dict(outcomes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the coffee order server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="server port (default: start one in-process)")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--orders", type=int, default=20, help="orders per client")
+    parser.add_argument("--queue", type=int, default=1024, help="queue size of the in-process server")
+    args = parser.parse_args()
+
+    _raise_fd_limit()
+    report = asyncio.run(run_load(args.host, args.port, args.clients, args.orders, queue_size=args.queue))
+    print(f"clients={report['clients']} requests={report['requests']} in {report['seconds']:.2f}s")
+    print(f"throughput {report['throughput']:,.0f} req/s   p50 {report['p50_ms']:.2f} ms   "
+          f"p99 {report['p99_ms']:.2f} ms")
+    print("outcomes", report["outcomes"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# ============================================================
+#  Project: Coffee Machine Simulation
+#  File: metrics.py
+#
+#  Author(s): Sofia Vanessa and Ximena Isaac
+#
+#  Credits:
+#    - Functional design and logic implemented by both authors.
+#
+#  Notes:
+#    This project was created for learning purposes.
+#    Optional timing spans, counters and latency histograms, exported
+#    in the Prometheus text format (file snapshot or local endpoint).
+#    NULL_METRICS is the default everywhere: its methods do nothing,
+#    so instrumentation costs almost nothing when disabled.
+# ============================================================
+
+import bisect
+import os
+import threading
+import time
+
+PREFIX = "coffee_"
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (1e-6, 2.5e-6, 5e-6, 10e-6, 25e-6, 50e-6, 100e-6, 250e-6, 500e-6,
+           1e-3, 2.5e-3, 5e-3, 10e-3, 25e-3, 50e-3, 100e-3, 250e-3, 1.0)
+
+
+#This class counts how many observations fall in each latency bucket
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)                     # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation (an estimate, like Prometheus)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class _Span:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()                            # Monotonic, high resolution
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+#This class collects the counters and histograms of one process
+class Metrics:
+    enabled = True
+
+    def __init__(self):
+        self.counters = {}                                          # (name, labels) -> value
+        self.histograms = {}                                        # name -> Histogram
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def span(self, name):
+        """with metrics.span("order_seconds"): ... records the block's duration."""
+        return _Span(self, name)
+
+    # ----------------------------- Export ----------------------------- #
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            typed = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {PREFIX}{name} counter")
+                    typed.add(name)
+                lines.append(f"{PREFIX}{name}{_labels(labels)} {value}")
+            for name, histogram in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {PREFIX}{name} histogram")
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{PREFIX}{name}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f"{PREFIX}{name}_sum {histogram.sum}")
+                lines.append(f"{PREFIX}{name}_count {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write a snapshot file atomically (safe for a node_exporter textfile collector)."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def summary(self):
+        """Rows for the performance panel: (name, count, mean ms, p50 ms, p99 ms) and counters."""
+        with self._lock:
+            latencies = [(name, h.count, h.sum / h.count * 1e3 if h.count else 0.0,
+                          h.quantile(0.5) * 1e3, h.quantile(0.99) * 1e3)
+                         for name, h in sorted(self.histograms.items())]
+            counters = [(name + _labels(labels), value) for (name, labels), value in sorted(self.counters.items())]
+        return latencies, counters
+
+
+#This class has the same methods as Metrics but records nothing
+class NullMetrics:
+    enabled = False
+
+    def inc(self, name, value=1, **labels):
+        pass
+
+    def observe(self, name, seconds):
+        pass
+
+    def span(self, name):
+        return _NULL_SPAN
+
+    def summary(self):
+        return [], []
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+NULL_METRICS = NullMetrics()
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+def serve_metrics(metrics, port, host="127.0.0.1"):
+    """Serve GET /metrics on a background thread. Returns the HTTP server (call shutdown() to stop)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # ~30 ms, only when serving
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") not in ("", "/metrics"):
+                self.send_error(404)
+                return
+            body = metrics.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):                      # Keep the terminal quiet
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
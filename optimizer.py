@@ -0,0 +1,215 @@
+# ============================================================
+#  Project: Coffee Machine Simulation
+#  File: optimizer.py
+#
+#  Author(s): Sofia Vanessa and Ximena Isaac
+#
+#  Credits:
+#    - Functional design and logic implemented by both authors.
+#
+#  Notes:
+#    This project was created for learning purposes.
+#    Menu optimizer: which mix of drinks and sizes earns the most from the
+#    stock that is left, and which drinks are not worth the stock. Exact
+#    branch and bound over the integer problem
+#
+#      maximize  sum(price[d] * n[d])
+#      subject   sum(recipe[d][k] * n[d]) <= stock[k]   for water, milk, beans, cups
+#                n[d] >= 0 integer
+#
+#    bounded with the LP relaxation of the drinks still to decide.
+#      python optimizer.py                       (full machine)
+#      python optimizer.py --water 600 --milk 300 --beans 80 --cups 12
+# ============================================================
+
+import argparse
+import itertools
+import time
+from collections import namedtuple
+
+from coffeeprep import COFFEE_TYPES, RECIPES, SIZES, format_cents, to_base
+
+KEYS = ("water", "milk", "coffee_beans", "cups")
+NODE_LIMIT = 200000             # past this many search nodes the best plan so far is returned (exact=False)
+EPS = 1e-9
+
+# counts: {(type, size): cups}; disable: drinks not worth making from this stock; exact: proven optimal
+MenuPlan = namedtuple("MenuPlan", ["counts", "revenue_cents", "leftover", "disable", "exact"])
+
+
+def menu_table():
+    """
+    (drink, demand per KEYS, price_cents) for every menu entry, read from
+    RECIPES on every call (not from the interned Coffee objects, which keep
+    the prices they were built with), so a replaced recipe shows up here.
+    """
+    table = []
+    for coffee_type in COFFEE_TYPES:
+        for size in SIZES:
+            ingredients, _, price_cents = RECIPES[(coffee_type, size)]
+            demand = tuple(1 if key == "cups" else ingredients.get(key, 0) for key in KEYS)
+            table.append(((coffee_type, size), demand, price_cents))
+    return tuple(table)
+
+
+# ----------------------------- LP bound ----------------------------- #
+'''
+LP duality: for the drinks still to decide, the best fractional revenue
+from stock R is min(y . R) over the y >= 0 with y . demand[d] >= price[d].
+That minimum sits on a vertex of the y polytope, and the vertices depend
+only on the recipes, not on the stock. So they are enumerated once per menu
+and every bound afterwards is a handful of dot products.
+'''
+def _solve(rows, rhs):
+    """Gaussian elimination for a small square system. None if singular."""
+    n = len(rows)
+    m = [list(map(float, row)) + [float(b)] for row, b in zip(rows, rhs)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(m[r][col]))
+        if abs(m[pivot][col]) < EPS:
+            return None
+        m[col], m[pivot] = m[pivot], m[col]
+        for r in range(n):
+            if r != col and m[r][col]:
+                f = m[r][col] / m[col][col]
+                m[r] = [a - f * b for a, b in zip(m[r], m[col])]
+    return [m[i][n] / m[i][i] for i in range(n)]
+
+
+def dual_vertices(items):
+    """Vertices of {y >= 0 : y . demand >= price for every item}."""
+    k = len(KEYS)
+    constraints = [(demand, price) for _, demand, price in items]
+    constraints += [(tuple(1 if j == i else 0 for j in range(k)), 0) for i in range(k)]
+    vertices = set()
+    for chosen in itertools.combinations(constraints, k):
+        y = _solve([c[0] for c in chosen], [c[1] for c in chosen])
+        if y is None or min(y) < -EPS:
+            continue
+        if all(sum(a * b for a, b in zip(y, demand)) >= price - 1e-6 for demand, price in constraints):
+            vertices.add(tuple(round(v, 9) for v in y))
+    return list(vertices)
+
+
+#This class finds the best drink mix for a stock and caches it until stock or menu change
+class MenuOptimizer:
+    def __init__(self, node_limit=NODE_LIMIT):
+        self.node_limit = node_limit
+        self._menu = None                                           # Menu the tables below were built for
+        self._items = ()
+        self._suffix_vertices = []                                  # [i] -> dual vertices for items[i:]
+        self._cache = {}                                            # stock levels -> MenuPlan
+        self.hits = 0
+
+    def invalidate(self):
+        """Drop the tables and cached plans (optimize also notices a changed menu_table by itself)."""
+        self._menu = None
+        self._cache.clear()
+
+    def _prepare(self, menu):
+        # Most valuable per cup first: good plans early make the bound prune sooner
+        self._items = sorted(menu, key=lambda item: -item[2])
+        self._suffix_vertices = [dual_vertices(self._items[i:]) for i in range(len(self._items))]
+        self._suffix_vertices.append([(0.0,) * len(KEYS)])
+        self._menu = menu
+        self._cache.clear()
+
+    def optimize(self, stock):
+        """Best MenuPlan for a stock dict in base units. Cached until the stock or any recipe/price changes."""
+        menu = menu_table()
+        if menu != self._menu:                                      # Recipe or price change
+            self._prepare(menu)
+        levels = tuple(max(0, int(stock.get(key, 0))) for key in KEYS)
+        plan = self._cache.get(levels)
+        if plan is not None:
+            self.hits += 1
+            return plan
+        plan = self._search(levels)
+        if len(self._cache) > 4096:
+            self._cache.clear()
+        self._cache[levels] = plan
+        return plan
+
+    def _search(self, levels):
+        items = self._items
+        vertices = self._suffix_vertices
+        n = len(items)
+        best = [-1, None]                                           # revenue, counts
+        counts = [0] * n
+        nodes = [0]
+
+        def bound(i, left):
+            return min(sum(y * r for y, r in zip(v, left)) for v in vertices[i])
+
+        def child(i, left, value, x):
+            """(bound, rest) for taking x of items[i]: the bound is concave in x."""
+            demand = items[i][1]
+            rest = tuple(r - x * d for r, d in zip(left, demand))
+            return value + x * items[i][2] + bound(i + 1, rest), rest
+
+        def dfs(i, left, value):
+            nodes[0] += 1
+            if value > best[0]:
+                best[0], best[1] = value, counts[:]
+            if i == n or nodes[0] > self.node_limit:
+                return
+            demand, price = items[i][1], items[i][2]
+            most = min(r // d for r, d in zip(left, demand) if d)
+            # The children worth visiting form one interval of x around the peak of the
+            # concave bound: find the peak by bisection, then walk out from it both ways
+            low, high = 0, most
+            while low < high:
+                mid = (low + high) // 2
+                if child(i, left, value, mid + 1)[0] >= child(i, left, value, mid)[0]:
+                    low = mid + 1
+                else:
+                    high = mid
+            for xs in (range(low, -1, -1), range(low + 1, most + 1)):
+                for x in xs:
+                    ub, rest = child(i, left, value, x)
+                    if ub < best[0] + 1 - EPS or nodes[0] > self.node_limit:   # Prices are whole cents
+                        break
+                    counts[i] = x
+                    dfs(i + 1, rest, value + x * price)
+            counts[i] = 0
+
+        dfs(0, levels, 0)
+        revenue, chosen = best
+        used = [0] * len(KEYS)
+        plan = {}
+        for (drink, demand, _), x in zip(items, chosen):
+            if x:
+                plan[drink] = x
+                used = [u + x * d for u, d in zip(used, demand)]
+        leftover = {key: level - u for key, level, u in zip(KEYS, levels, used)}
+        disable = [drink for drink, _, _ in self._menu if drink not in plan]
+        return MenuPlan(plan, revenue, leftover, disable, nodes[0] <= self.node_limit)
+
+
+def main():
+    from engine import MAX_BEANS, MAX_CUPS, MAX_MILK, MAX_WATER
+
+    parser = argparse.ArgumentParser(description="Best drink mix for the remaining stock")
+    parser.add_argument("--water", type=float, default=MAX_WATER, help="ml left")
+    parser.add_argument("--milk", type=float, default=MAX_MILK, help="ml left")
+    parser.add_argument("--beans", dest="coffee_beans", type=float, default=MAX_BEANS, help="g left")
+    parser.add_argument("--cups", type=float, default=MAX_CUPS, help="cups left")
+    args = parser.parse_args()
+
+    stock = {key: to_base(key, getattr(args, key)) for key in KEYS}
+    optimizer = MenuOptimizer()
+    t0 = time.perf_counter()
+    optimizer.optimize({})                                          # Builds the LP tables for this menu
+    t1 = time.perf_counter()
+    plan = optimizer.optimize(stock)
+    t2 = time.perf_counter()
+    for (coffee_type, size), count in sorted(plan.counts.items()):
+        print(f"  {count:>4} x {size} {coffee_type}")
+    print(f"Revenue ${format_cents(plan.revenue_cents)} ({'optimal' if plan.exact else 'best found'})")
+    if plan.disable:
+        print("Not worth the stock: " + ", ".join(f"{size} {kind}" for kind, size in plan.disable))
+    print(f"Menu tables {(t1 - t0) * 1e3:.1f} ms, search {(t2 - t1) * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# ============================================================
+#  Project: Coffee Machine Simulation
+#  File: planner.py
+#
+#  Author(s): Sofia Vanessa and Ximena Isaac
+#
+#  Credits:
+#    - Functional design and logic implemented by both authors.
+#
+#  Notes:
+#    This project was created for learning purposes.
+#    Monte Carlo capacity planner: runs thousands of random demand days
+#    (drink/size mix, demand level, rush-hour bursts) through simulate.py
+#    for every candidate tank size and refill interval, on all cores.
+#      python planner.py --scenarios 2000 --milk 1000,2000 --refill-every 120,240
+#      python planner.py --scenarios 500 --workers 1          (single core, for comparison)
+# ============================================================
+
+import argparse
+import itertools
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from coffeeprep import COFFEE_TYPES, SIZES, UNITS, to_base
+from simulate import DEFAULT_PROFILE, HOUR, TANK_FLAGS, Simulation, poisson_arrivals
+
+Z_95 = 1.96
+DRINKS = [(t, s) for t in COFFEE_TYPES for s in SIZES]
+
+
+# ----------------------------- Scenarios ----------------------------- #
+def random_scenario(seed, days=1, base_profile=DEFAULT_PROFILE):
+    """One random demand: (profile, mix). The same seed always gives the same scenario."""
+    rng = random.Random(seed)
+    level = rng.lognormvariate(0, 0.35)                             # Busy or quiet day
+    profile = [rate * level for rate in base_profile]
+    for _ in range(rng.randint(0, 3)):                              # Rush-hour bursts
+        hour = rng.choice([h for h, rate in enumerate(base_profile) if rate > 0])
+        profile[hour] *= rng.uniform(1.5, 3.0)
+    mix = {drink: rng.gammavariate(1.0, 1.0) for drink in DRINKS}   # Dirichlet(1, ..., 1) weights
+    return profile, mix
+
+
+def _run_chunk(capacity, refill_every, days, seeds):
+    """Worker: simulate one candidate over a chunk of scenario seeds. Returns picklable tallies."""
+    simulation = Simulation(capacity, refill_every=refill_every, sample_every=days * 24 * HOUR)
+    runs = []
+    for seed in seeds:
+        profile, mix = random_scenario(seed, days)
+        report = simulation.run(poisson_arrivals(profile, days, mix, seed), until=days * 24 * HOUR)
+        runs.append((report["orders"], report["lost_revenue"], tuple(report["stockouts"])))
+    return runs
+
+
+# ----------------------------- Statistics ----------------------------- #
+def wilson_interval(hits, n, z=Z_95):
+    """Confidence interval for a probability (stays inside [0, 1] even at 0 or n hits)."""
+    if n == 0:
+        return 0.0, 1.0
+    p = hits / n
+    centre = (p + z * z / (2 * n)) / (1 + z * z / n)
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def mean_interval(values, z=Z_95):
+    """Mean and its normal-approximation confidence interval."""
+    n = len(values)
+    if n == 0:
+        return 0.0, 0.0, 0.0
+    mean = sum(values) / n
+    if n == 1:
+        return mean, mean, mean
+    var = sum((v - mean) ** 2 for v in values) / (n - 1)
+    half = z * math.sqrt(var / n)
+    return mean, mean - half, mean + half
+
+
+def summarize(runs):
+    n = len(runs)
+    any_out = sum(1 for _, _, out in runs if out)
+    by_ingredient = {}
+    for _, _, out in runs:
+        for ingredient in out:
+            by_ingredient[ingredient] = by_ingredient.get(ingredient, 0) + 1
+    return {
+        "scenarios": n,
+        "orders": sum(orders for orders, _, _ in runs),
+        "stockout_probability": any_out / n if n else 0.0,
+        "stockout_ci": wilson_interval(any_out, n),
+        "stockout_by_ingredient": {key: count / n for key, count in sorted(by_ingredient.items())},
+        "lost_revenue": mean_interval([lost for _, lost, _ in runs]),
+    }
+
+
+#This class spreads the scenarios of every candidate over a process pool
+class CapacityPlanner:
+    def __init__(self, scenarios=1000, days=1, seed=1, workers=None, chunk_size=None):
+        self.scenarios = scenarios
+        self.days = days
+        self.seed = seed
+        self.workers = workers or os.cpu_count() or 1
+        # A few chunks per worker keeps every core busy without paying IPC per scenario
+        self.chunk_size = chunk_size or max(1, math.ceil(scenarios / (self.workers * 4)))
+
+    def run(self, candidates):
+        """candidates: list of (capacity dict, refill_every seconds or None). Returns one summary each."""
+        seeds = [self.seed * 1_000_003 + i for i in range(self.scenarios)]   # Same scenarios for every candidate
+        chunks = [seeds[i:i + self.chunk_size] for i in range(0, len(seeds), self.chunk_size)]
+        results = []
+        if self.workers == 1:
+            for capacity, refill_every in candidates:
+                runs = [run for chunk in chunks for run in _run_chunk(capacity, refill_every, self.days, chunk)]
+                results.append(summarize(runs))
+            return results
+        with ProcessPoolExecutor(self.workers) as pool:
+            futures = [[pool.submit(_run_chunk, capacity, refill_every, self.days, chunk) for chunk in chunks]
+                       for capacity, refill_every in candidates]
+            for futures_of_candidate in futures:
+                runs = [run for future in futures_of_candidate for run in future.result()]
+                results.append(summarize(runs))
+        return results
+
+
+def _floats(text):
+    return [float(part) for part in text.split(",")]
+
+
+def print_plan(candidates, results, elapsed):
+    print(f"{'water':>7}{'milk':>7}{'beans':>7}{'cups':>6}{'refill':>8}"
+          f"{'P(stockout)':>13}  {'95% CI':<17}{'lost revenue':>13}  95% CI")
+    for (capacity, refill_every), summary in zip(candidates, results):
+        low, high = summary["stockout_ci"]
+        mean, mean_low, mean_high = summary["lost_revenue"]
+        refill = f"{refill_every / 60:.0f}m" if refill_every else "off"
+        interval = f"[{low:.1%}, {high:.1%}]"
+        water, milk, beans, cups = (capacity[key] / UNITS[key][1] for key in ("water", "milk", "coffee_beans", "cups"))
+        print(f"{water:>7g}{milk:>7g}{beans:>7g}{cups:>6g}"
+              f"{refill:>8}{summary['stockout_probability']:>13.1%}  {interval:<17}"
+              f"{mean:>13.2f}  [{mean_low:.2f}, {mean_high:.2f}]")
+    scenarios = sum(summary["scenarios"] for summary in results)
+    print(f"{scenarios} scenarios in {elapsed:.1f} s ({scenarios / elapsed:.0f} scenarios/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo capacity planner for the coffee machine")
+    parser.add_argument("--scenarios", type=int, default=1000, help="random demand days per candidate")
+    parser.add_argument("--days", type=int, default=1, help="length of each scenario in days")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=1)
+    for key, flag, default, unit in TANK_FLAGS:
+        parser.add_argument(flag, dest=key, type=_floats, default=[default],
+                            help=f"comma-separated {key} tank sizes to compare ({unit})")
+    parser.add_argument("--refill-every", type=_floats, default=[240],
+                        help="comma-separated minutes between refills to compare (0 = off)")
+    args = parser.parse_args()
+
+    candidates = [({"water": to_base("water", water), "milk": to_base("milk", milk),
+                    "coffee_beans": to_base("coffee_beans", beans), "cups": to_base("cups", cups)}, minutes * 60 or None)
+                  for water, milk, beans, cups, minutes
+                  in itertools.product(args.water, args.milk, args.coffee_beans, args.cups, args.refill_every)]
+    planner = CapacityPlanner(args.scenarios, args.days, args.seed, args.workers)
+    t0 = time.perf_counter()
+    results = planner.run(candidates)
+    print_plan(candidates, results, time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+# ============================================================
+#  Project: Coffee Machine Simulation
+#  File: sales.py
+#
+#  Author(s): Sofia Vanessa and Ximena Isaac
+#
+#  Credits:
+#    - Functional design and logic implemented by both authors.
+#
+#  Notes:
+#    This project was created for learning purposes.
+# ============================================================
+
+import bisect
+import struct
+import time
+from array import array
+from collections import namedtuple
+
+from coffeeprep import COFFEE_TYPES, RECIPES, SIZES, optional_numpy
+
+
+Sale = namedtuple("Sale", ["coffee_type", "size", "price_cents", "timestamp"])
+# Totals of a time range; by_drink is {(coffee_type, size): DrinkStats}, usage is in base units
+Rollup = namedtuple("Rollup", ["start", "end", "count", "revenue_cents", "usage", "by_drink"])
+DrinkStats = namedtuple("DrinkStats", ["count", "revenue_cents", "usage"])
+
+USAGE_KEYS = ("water", "milk", "coffee_beans", "cups")
+ROLLUP_FIELDS = 2 + len(USAGE_KEYS)                                 # count, revenue_cents, usage...
+DRINKS = [(t, s) for t in COFFEE_TYPES for s in SIZES]              # Position = drink slot in a rollup
+DRINK_SLOT = {drink: i for i, drink in enumerate(DRINKS)}
+# Per drink slot: base units of each USAGE_KEYS entry one cup takes
+SLOT_USAGE = [tuple(RECIPES[drink][0].get(key, 0) if key != "cups" else 1 for key in USAGE_KEYS) for drink in DRINKS]
+# name -> (bucket seconds, buckets kept)
+RESOLUTIONS = {"minute": (60, 1440), "hour": (3600, 24 * 8), "day": (86400, 400)}
+ROLLUP_HEADER = struct.Struct("<qI")                                # utc offset, rings
+RING_HEADER = struct.Struct("<qqq")                                 # bucket seconds, slots, current bucket (-1: none)
+
+#This class keeps running sales totals so nobody has to rescan the history
+class SalesTotals:
+    def __init__(self):
+        self.count = 0                                              # Total cups sold
+        self.revenue_cents = 0                                      # Total money from sales, exact
+        self.by_drink = {}                                          # (coffee_type, size) -> [count, revenue_cents]
+
+    def add(self, coffee_type, size, price_cents):
+        self.count += 1                                             # O(1) per order
+        self.revenue_cents += price_cents
+        entry = self.by_drink.get((coffee_type, size))
+        if entry is None:
+            self.by_drink[(coffee_type, size)] = [1, price_cents]
+        else:
+            entry[0] += 1
+            entry[1] += price_cents
+
+    def add_counts(self, drink_counts):
+        """Bulk add: drink_counts is {(coffee_type, size): (count, revenue_cents)}."""
+        for key, (count, cents) in drink_counts.items():
+            if not count:
+                continue
+            self.count += count
+            self.revenue_cents += cents
+            entry = self.by_drink.get(key)
+            if entry is None:
+                self.by_drink[key] = [count, cents]
+            else:
+                entry[0] += count
+                entry[1] += cents
+
+    @property
+    def revenue(self):
+        """Total revenue in dollars, for display."""
+        return self.revenue_cents / 100
+
+    '''
+    Queries by drink. If size is None the result covers every size of
+    that coffee type (only a handful of keys, so it is still constant time).
+    '''
+    def count_of(self, coffee_type, size=None):
+        return sum(entry[0] for entry in self._entries(coffee_type, size))
+
+    def revenue_cents_of(self, coffee_type, size=None):
+        return sum(entry[1] for entry in self._entries(coffee_type, size))
+
+    def revenue_of(self, coffee_type, size=None):
+        return self.revenue_cents_of(coffee_type, size) / 100
+
+    def _entries(self, coffee_type, size):
+        if size is not None:
+            entry = self.by_drink.get((coffee_type, size))
+            return [entry] if entry else []
+        return [entry for (kind, _), entry in self.by_drink.items() if kind == coffee_type]
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "revenue_cents": self.revenue_cents,
+            "by_drink": {key: tuple(entry) for key, entry in self.by_drink.items()},
+        }
+
+
+#This class stores the sales history as compact array-backed columns
+class SalesLedger:
+    def __init__(self):
+        self.drink = array("B")                                     # Drink code, index into COFFEE_TYPES
+        self.size = array("B")                                      # Size code, index into SIZES
+        self.price_cents = array("q")                               # Unit price in integer cents
+        self.timestamp = array("d")                                 # Epoch seconds of the sale
+
+    def append(self, coffee_type, size, price_cents, timestamp=None):
+        self.drink.append(COFFEE_TYPES.index(coffee_type))
+        self.size.append(SIZES.index(size))
+        self.price_cents.append(price_cents)
+        self.timestamp.append(time.time() if timestamp is None else timestamp)
+
+    def extend_menu_codes(self, codes, price_cents_by_code, timestamp=None):
+        """Bulk append sales given as menu codes (code = drink * len(SIZES) + size), all at one timestamp."""
+        if timestamp is None:
+            timestamp = time.time()
+        n = len(codes)
+        np = optional_numpy()
+        if np is not None:
+            c = np.frombuffer(codes, dtype=np.uint8)
+            self.drink.frombytes((c // len(SIZES)).astype(np.uint8).tobytes())
+            self.size.frombytes((c % len(SIZES)).astype(np.uint8).tobytes())
+            self.price_cents.frombytes(np.asarray(price_cents_by_code, dtype=np.int64)[c].tobytes())
+        else:
+            nsizes = len(SIZES)
+            self.drink.extend(code // nsizes for code in codes)
+            self.size.extend(code % nsizes for code in codes)
+            self.price_cents.extend(price_cents_by_code[code] for code in codes)
+        self.timestamp.extend(array("d", [timestamp]) * n)
+
+    def __len__(self):
+        return len(self.price_cents)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):                                # Slicing returns a smaller ledger
+            ledger = SalesLedger()
+            ledger.drink = self.drink[index]
+            ledger.size = self.size[index]
+            ledger.price_cents = self.price_cents[index]
+            ledger.timestamp = self.timestamp[index]
+            return ledger
+        return Sale(COFFEE_TYPES[self.drink[index]], SIZES[self.size[index]],
+                    self.price_cents[index], self.timestamp[index])
+
+    def __iter__(self):
+        for drink, size, cents, ts in zip(self.drink, self.size, self.price_cents, self.timestamp):
+            yield Sale(COFFEE_TYPES[drink], SIZES[size], cents, ts)
+
+    def total_cents(self):
+        return sum(self.price_cents)
+
+    '''
+    Bulk columns for vectorized analytics. With NumPy installed these are
+    read-only ndarrays; otherwise plain array copies. They are copies (one
+    memcpy per column) because a live buffer view would stop the ledger from
+    growing while the view is alive.
+    '''
+    def columns(self):
+        cols = {"drink": self.drink, "size": self.size,
+                "price_cents": self.price_cents, "timestamp": self.timestamp}
+        np = optional_numpy()
+        if np is None:
+            return {name: array(col.typecode, col) for name, col in cols.items()}
+        dtypes = {"B": np.uint8, "q": np.int64, "d": np.float64}
+        return {name: np.frombuffer(col.tobytes(), dtype=dtypes[col.typecode]) for name, col in cols.items()}
+
+
+#This class keeps per-minute, per-hour and per-day sales buckets up to date as orders come in
+class SalesRollup:
+    '''
+    Instead of a total per bucket, each resolution keeps a ring of snapshots
+    of the running totals taken when a bucket opens. Sales only bump the
+    running totals, and any range of whole buckets is the difference of two
+    snapshots, so "last 5 minutes" or "last hour" costs the same and never
+    touches the history. Buckets follow local time (the UTC offset at
+    start-up). A sale older than the newest bucket counts in the newest one.
+
+    Sales come in as ledger rows (add_rows), so the engine can append an
+    order to the ledger only and let the rollup catch up when it is read.
+    '''
+    def __init__(self, utc_offset=None):
+        self.utc_offset = time.localtime().tm_gmtoff if utc_offset is None else utc_offset
+        self._width = len(DRINKS) * ROLLUP_FIELDS
+        self._running = array("q", bytes(8 * self._width))         # Totals since start, per drink slot
+        self._rings = {}
+        for name, (seconds, slots) in RESOLUTIONS.items():
+            # [bucket seconds, slots, current bucket, bucket of each slot, snapshot of each slot]
+            self._rings[name] = [seconds, slots, None, array("q", [-1]) * slots,
+                                 array("q", bytes(8 * self._width * slots))]
+        self._next_bucket = float("-inf")                           # Time the next bucket opens
+
+    # ----------------------------- Writing ----------------------------- #
+    def add_rows(self, ledger, start=0, stop=None):
+        """
+        Add the sales in ledger rows start..stop (in time order). Rows are
+        summed per drink until the next bucket opens, so each costs a couple
+        of list updates and the running totals change once per bucket.
+        """
+        stop = len(ledger) if stop is None else stop
+        nsizes = len(SIZES)
+        counts = [0] * len(DRINKS)
+        cents = [0] * len(DRINKS)
+        next_bucket = self._next_bucket
+        rows = zip(ledger.timestamp[start:stop], ledger.drink[start:stop], ledger.size[start:stop],
+                   ledger.price_cents[start:stop])
+        for timestamp, drink, size, price_cents in rows:
+            if timestamp >= next_bucket:
+                self._add_slots(counts, cents)                      # Earlier rows belong to the closing bucket
+                self._open(timestamp)
+                next_bucket = self._next_bucket
+            slot = drink * nsizes + size
+            counts[slot] += 1
+            cents[slot] += price_cents
+        self._add_slots(counts, cents)
+
+    def _add_slots(self, counts, cents):
+        running = self._running
+        for slot, count in enumerate(counts):
+            if not count:
+                continue
+            base = slot * ROLLUP_FIELDS
+            running[base] += count
+            running[base + 1] += cents[slot]
+            for i, amount in enumerate(SLOT_USAGE[slot]):
+                running[base + 2 + i] += amount * count
+            counts[slot] = cents[slot] = 0
+
+    def _open(self, timestamp):
+        t = timestamp + self.utc_offset
+        for ring in self._rings.values():
+            bucket = int(t // ring[0])
+            current = ring[2]
+            if current is None or bucket > current:
+                # Snapshot the totals into this bucket and any quiet ones skipped since the last order
+                slots, buckets, snapshots = ring[1], ring[3], ring[4]
+                first = bucket if current is None else max(current + 1, bucket - slots + 1)
+                for b in range(first, bucket + 1):
+                    slot = b % slots
+                    buckets[slot] = b
+                    snapshots[slot * self._width:(slot + 1) * self._width] = self._running
+                ring[2] = bucket
+        # Orders before the next minute starts skip this method entirely
+        self._next_bucket = min((ring[2] + 1) * ring[0] for ring in self._rings.values()) - self.utc_offset
+
+    def rebuild(self, ledger):
+        """Refill the buckets from a sales ledger (after journal recovery), oldest kept day onward."""
+        self.__init__(self.utc_offset)
+        seconds, slots = RESOLUTIONS["day"]
+        if not len(ledger):
+            return
+        newest = max(ledger.timestamp[-1], time.time())
+        first = bisect.bisect_left(ledger.timestamp, newest - seconds * slots)  # Ledger is in time order
+        self.add_rows(ledger, first)
+
+    # ----------------------------- Persistence ----------------------------- #
+    '''
+    The journal stores the rings in its snapshot so a restart only replays
+    the log tail instead of rebuilding from the whole ledger.
+    '''
+    def to_bytes(self):
+        parts = [ROLLUP_HEADER.pack(self.utc_offset, len(self._rings))]
+        for seconds, slots, current, _, _ in self._rings.values():
+            parts.append(RING_HEADER.pack(seconds, slots, -1 if current is None else current))
+        parts.append(self._running.tobytes())
+        for _, _, _, buckets, snapshots in self._rings.values():
+            parts += [buckets.tobytes(), snapshots.tobytes()]
+        return b"".join(parts)
+
+    def load_bytes(self, data):
+        """Restore from to_bytes(). False (and nothing changed) if the rings were sized differently."""
+        utc_offset, count = ROLLUP_HEADER.unpack_from(data, 0)
+        offset = ROLLUP_HEADER.size
+        headers = [RING_HEADER.unpack_from(data, offset + i * RING_HEADER.size) for i in range(count)]
+        if [(seconds, slots) for seconds, slots, _ in headers] != list(RESOLUTIONS.values()):
+            return False
+        offset += count * RING_HEADER.size
+        self.__init__(utc_offset)
+        self._running = array("q", data[offset:offset + 8 * self._width])
+        offset += 8 * self._width
+        for ring, (_, slots, current) in zip(self._rings.values(), headers):
+            ring[2] = None if current < 0 else current
+            ring[3] = array("q", data[offset:offset + 8 * slots])
+            offset += 8 * slots
+            ring[4] = array("q", data[offset:offset + 8 * slots * self._width])
+            offset += 8 * slots * self._width
+        if any(ring[2] is not None for ring in self._rings.values()):
+            self._next_bucket = min((ring[2] + 1) * ring[0] for ring in self._rings.values()) - self.utc_offset
+        return True
+
+    # ----------------------------- Queries ----------------------------- #
+    def _snapshot(self, ring, bucket):
+        """Running totals at the start of `bucket`, clamped to the oldest bucket still kept."""
+        seconds, slots, current, buckets, snapshots = ring
+        if current is None or bucket > current:
+            return self._running
+        bucket = max(bucket, current - slots + 1)
+        slot = bucket % slots
+        if buckets[slot] != bucket:                                 # Before the first sale
+            return array("q", bytes(8 * self._width))
+        return snapshots[slot * self._width:(slot + 1) * self._width]
+
+    def range(self, resolution, first, last):
+        """Totals of buckets first..last (bucket numbers) of one resolution."""
+        ring = self._rings[resolution]
+        start, end = self._snapshot(ring, first), self._snapshot(ring, last + 1)
+        seconds = ring[0]
+        return _rollup(first * seconds - self.utc_offset, (last + 1) * seconds - self.utc_offset,
+                       [b - a for a, b in zip(start, end)])
+
+    def bucket_of(self, resolution, timestamp):
+        return int((timestamp + self.utc_offset) // self._rings[resolution][0])
+
+    def window(self, seconds, now=None, resolution=None):
+        """
+        Totals of the last `seconds`, in whole buckets of the finest resolution
+        that still covers them (the current bucket counts in full).
+        """
+        now = time.time() if now is None else now
+        if resolution is None:
+            resolution = next((name for name, (width, slots) in RESOLUTIONS.items()
+                               if seconds <= width * (slots - 1)), "day")
+        width = self._rings[resolution][0]
+        last = self.bucket_of(resolution, now)
+        return self.range(resolution, last - max(1, -(-int(seconds) // width)) + 1, last)
+
+    def buckets(self, resolution, count, now=None):
+        """The last `count` buckets of a resolution, oldest first, one Rollup each."""
+        now = time.time() if now is None else now
+        last = self.bucket_of(resolution, now)
+        return [self.range(resolution, b, b) for b in range(last - count + 1, last + 1)]
+
+
+def _rollup(start, end, values):
+    by_drink = {}
+    total = [0] * ROLLUP_FIELDS
+    for i, drink in enumerate(DRINKS):
+        fields = values[i * ROLLUP_FIELDS:(i + 1) * ROLLUP_FIELDS]
+        if fields[0]:
+            by_drink[drink] = DrinkStats(fields[0], fields[1], dict(zip(USAGE_KEYS, fields[2:])))
+            total = [a + b for a, b in zip(total, fields)]
+    return Rollup(start, end, total[0], total[1], dict(zip(USAGE_KEYS, total[2:])), by_drink)
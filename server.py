@@ -0,0 +1,231 @@
+# ============================================================
+#  Project: Coffee Machine Simulation
+#  File: server.py
+#
+#  Author(s): Sofia Vanessa and Ximena Isaac
+#
+#  Credits:
+#    - Functional design and logic implemented by both authors.
+#
+#  Notes:
+#    This project was created for learning purposes.
+#    asyncio order server so kiosks and the mobile app can share one
+#    machine. Run with:  python server.py --port 8765
+#
+#    Protocol: one JSON object per line over TCP.
+#      -> {"id": 1, "type": "latte", "size": "large"}
+#      <- {"id": 1, "ok": true, "price": 10.5, "message": "..."}
+#      <- {"id": 1, "ok": false, "error": "busy" | "timeout" | "bad_request" | <ingredient>}
+#    A line over LINE_LIMIT bytes gets {"id": null, "ok": false, "error": "line too long"}
+#    and the connection is closed.
+#    {"op": "stats"} returns the sales totals and queue depth.
+# ============================================================
+
+import argparse
+import asyncio
+import json
+
+from coffeeprep import COFFEE_TYPES, SIZES
+from engine import CoffeeMachine
+
+DEFAULT_QUEUE_SIZE = 1024    # Orders waiting for the machine before new ones get "busy"
+DEFAULT_TIMEOUT = 2.0        # Seconds an order may wait in the queue
+DEFAULT_BATCH_SIZE = 64      # Orders served per worker pass
+LINE_LIMIT = 2**16           # Longest request line in bytes
+
+
+class _Connection:
+    """One client socket. Acknowledgements are buffered and written once per loop pass."""
+    def __init__(self, writer, loop):
+        self.writer = writer
+        self.loop = loop
+        self.pending = []
+        self.scheduled = False
+
+    def ack(self, message):
+        self.pending.append(json.dumps(message).encode() + b"\n")
+        if not self.scheduled:
+            self.scheduled = True
+            self.loop.call_soon(self.flush)
+
+    def flush(self):
+        self.scheduled = False
+        if not self.writer.is_closing():
+            self.writer.write(b"".join(self.pending))
+        self.pending.clear()
+
+
+class _Pending:
+    """An order sitting in the queue, with the timer that expires it."""
+    __slots__ = ("conn", "request_id", "coffee_type", "size", "done", "timer")
+
+    def __init__(self, conn, request_id, coffee_type, size):
+        self.conn = conn
+        self.request_id = request_id
+        self.coffee_type = coffee_type
+        self.size = size
+        self.done = False
+        self.timer = None
+
+
+#This class serves orders from many clients against one CoffeeMachine
+class OrderServer:
+    def __init__(self, machine=None, queue_size=DEFAULT_QUEUE_SIZE,
+                 timeout=DEFAULT_TIMEOUT, batch_size=DEFAULT_BATCH_SIZE):
+        self.machine = machine if machine is not None else CoffeeMachine()
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.rejected = 0                                           # Orders turned away with "busy"
+        self.expired = 0                                            # Orders that hit their timeout
+        self._queue = None
+        self._server = None
+        self._worker = None
+
+    async def start(self, host="127.0.0.1", port=8765):
+        self._queue = asyncio.Queue(self.queue_size)
+        self._worker = asyncio.create_task(self._serve_orders())
+        self._server = await asyncio.start_server(self._handle_client, host, port, limit=LINE_LIMIT)
+        return self._server
+
+    @property
+    def port(self):
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+        self._worker.cancel()
+
+    # ----------------------------- Clients ----------------------------- #
+    async def _handle_client(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        conn = _Connection(writer, loop)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:                                  # Over the stream limit: no way to resync
+                    conn.ack({"id": None, "ok": False, "error": "line too long"})
+                    conn.flush()
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                self._accept(conn, line, loop)
+                await writer.drain()                                # Stop reading if the client stops reading
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _accept(self, conn, line, loop):
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+        except (ValueError, AttributeError):
+            conn.ack({"id": None, "ok": False, "error": "bad_request"})
+            return
+
+        if request.get("op") == "stats":
+            conn.ack({"id": request_id, "ok": True, "stats": self.stats()})
+            return
+
+        coffee_type, size = request.get("type"), request.get("size", "small")
+        if not (isinstance(coffee_type, str) and coffee_type in COFFEE_TYPES
+                and isinstance(size, str) and size in SIZES):       # Unknown drinks never reach the worker
+            conn.ack({"id": request_id, "ok": False, "error": "bad_request"})
+            return
+
+        entry = _Pending(conn, request_id, coffee_type, size)
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:                                   # Backpressure: tell the client right away
+            self.rejected += 1
+            conn.ack({"id": request_id, "ok": False, "error": "busy"})
+            return
+        entry.timer = loop.call_later(self.timeout, self._expire, entry)
+
+    def _expire(self, entry):
+        if not entry.done:
+            entry.done = True
+            self.expired += 1
+            entry.conn.ack({"id": entry.request_id, "ok": False, "error": "timeout"})
+
+    # ----------------------------- Worker ----------------------------- #
+    async def _serve_orders(self):
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            for entry in batch:
+                if entry.done:                                      # Timed out while queued
+                    continue
+                entry.done = True
+                entry.timer.cancel()
+                try:
+                    result = self.machine.order(entry.coffee_type, entry.size)
+                except Exception as e:                              # One bad order must not stop the worker
+                    entry.conn.ack({"id": entry.request_id, "ok": False, "error": "bad_request", "message": str(e)})
+                    continue
+                if result.ok:
+                    entry.conn.ack({"id": entry.request_id, "ok": True,
+                                    "price": result.coffee.price, "message": result.message})
+                else:
+                    entry.conn.ack({"id": entry.request_id, "ok": False,
+                                    "error": result.reason, "message": result.message})
+            await asyncio.sleep(0)                                  # Let readers and flushes run between batches
+
+    def stats(self):
+        return {
+            "sales": self.machine.totals.count,
+            "revenue": self.machine.totals.revenue_cents / 100,
+            "queued": self._queue.qsize(),
+            "rejected": self.rejected,
+            "expired": self.expired,
+        }
+
+
+async def serve(host, port, machine=None, **options):
+    server = OrderServer(machine, **options)
+    await server.start(host, port)
+    print(f"Coffee machine serving on {host}:{server.port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve coffee orders over TCP (JSON lines)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--queue", type=int, default=DEFAULT_QUEUE_SIZE, help="bounded order queue size")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="per-order timeout (s)")
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH_SIZE, help="orders served per batch")
+    parser.add_argument("--data", default=None, help="journal directory (default: in memory only)")
+    parser.add_argument("--metrics-port", type=int, default=None, help="serve Prometheus text on this local port")
+    args = parser.parse_args()
+
+    machine = None
+    if args.data:
+        from journal import open_machine
+        machine = open_machine(args.data)
+    if args.metrics_port:
+        from metrics import Metrics, serve_metrics
+        machine = machine or CoffeeMachine()
+        machine.metrics = Metrics()
+        serve_metrics(machine.metrics, args.metrics_port)
+    try:
+        asyncio.run(serve(args.host, args.port, machine, queue_size=args.queue,
+                          timeout=args.timeout, batch_size=args.batch))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if machine is not None:
+            machine.close()
+
+
+if __name__ == "__main__":
+    main()
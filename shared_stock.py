@@ -0,0 +1,285 @@
+# ============================================================
+#  Project: Coffee Machine Simulation
+#  File: shared_stock.py
+#
+#  Author(s): Sofia Vanessa and Ximena Isaac
+#
+#  Credits:
+#    - Functional design and logic implemented by both authors.
+#
+#  Notes:
+#    This project was created for learning purposes.
+#    Stock kept in shared memory so several processes (kiosks, workers)
+#    serve orders against the same tanks. Layout of the block:
+#
+#      8-byte magic | int64 water | int64 milk | int64 coffee_beans | int64 cups
+#
+#    Check-and-deduct and refills are atomic across processes: they run
+#    under a lock file next to the block (flock/msvcrt), plus a thread lock
+#    for the threads of one process. Any process can attach by name.
+#      python shared_stock.py --workers 4 --orders 50000       (parallel demo)
+# ============================================================
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from collections.abc import MutableMapping
+from multiprocessing import shared_memory
+
+from coffeeprep import RESERVED, ReserveResult, StockIngredients
+
+try:
+    import fcntl
+except ImportError:                                                 # Windows
+    fcntl = None
+    import msvcrt
+
+KEYS = ("water", "milk", "coffee_beans", "cups")                    # Position = counter slot
+MAGIC = b"CMSTK\x00\x01\x00"
+SIZE = len(MAGIC) + 8 * len(KEYS)
+SLOT = {key: i for i, key in enumerate(KEYS)}
+
+
+#This class is a lock shared by every process that opens the same lock file
+class _ProcessLock:
+    def __init__(self, path):
+        self._thread_lock = threading.Lock()                        # flock does not exclude threads of one process
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        self._thread_lock.release()
+
+    def close(self):
+        os.close(self._fd)
+
+
+#This class is a dict-like view of the shared counters
+class _Counters(MutableMapping):
+    __slots__ = ("_values",)
+
+    def __init__(self, values):
+        self._values = values
+
+    def __getitem__(self, key):
+        return self._values[SLOT[key]]
+
+    def __setitem__(self, key, value):
+        if key not in SLOT:
+            raise KeyError(f"{key!r} has no slot in shared stock")
+        self._values[SLOT[key]] = value
+
+    def __delitem__(self, key):
+        raise TypeError("shared stock slots cannot be removed")
+
+    def __iter__(self):
+        return iter(KEYS)
+
+    def __len__(self):
+        return len(KEYS)
+
+    def get(self, key, default=None):                               # Hot path: skip the ABC's try/except
+        slot = SLOT.get(key)
+        return default if slot is None else self._values[slot]
+
+
+#This class is StockIngredients backed by a named shared-memory block
+class SharedStockIngredients(StockIngredients):
+    '''
+    Use create() in one process and attach(name) in the others. Every
+    method of StockIngredients works unchanged: `stock` is a dict-like view
+    of the counters and `_lock` is the cross-process lock. Direct writes to
+    `stock` are only safe while holding `_lock`.
+    '''
+    def __init__(self, shm, owner):
+        if bytes(shm.buf[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"shared memory {shm.name!r} is not a coffee machine stock")
+        self._shm = shm
+        self._owner = owner
+        self._values = shm.buf[len(MAGIC):SIZE].cast("q")
+        self._lock = _ProcessLock(_lock_path(shm.name))
+        self.stock = _Counters(self._values)
+
+    @classmethod
+    def create(cls, name=None, levels=None):
+        """New shared stock (filled like StockIngredients unless levels are given)."""
+        shm = _untracked(name, create=True)
+        _initialize(shm, levels)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """Open the shared stock another process created."""
+        return cls(_untracked(name), owner=False)
+
+    @classmethod
+    def open(cls, name, levels=None):
+        """
+        Attach to `name`, creating it first if no process has. Nobody owns a
+        block opened this way: it outlives every kiosk until unlink(name).
+        """
+        lock = _ProcessLock(_lock_path(name))
+        try:
+            with lock:                                              # Two kiosks starting at once create it once
+                try:
+                    shm = _untracked(name)
+                except FileNotFoundError:
+                    shm = _untracked(name, create=True)
+                    _initialize(shm, levels)
+        finally:
+            lock.close()
+        return cls(shm, owner=False)
+
+    @staticmethod
+    def unlink(name):
+        """Remove a block made by open() once no kiosk needs it."""
+        shm = _untracked(name)
+        shm.close()
+        _unlink(shm)
+        try:
+            os.remove(_lock_path(name))
+        except FileNotFoundError:
+            pass
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def reserve(self, ingredients_needed, cups=1):
+        values = self._values                                       # Same checks as the base class, on the slots
+        with self._lock:
+            if values[SLOT["cups"]] < cups:
+                return ReserveResult(False, "cups", "No cups available. Please refill the machine.")
+            for ingredient, amount in ingredients_needed.items():
+                slot = SLOT.get(ingredient)
+                if (values[slot] if slot is not None else 0) < amount:
+                    return ReserveResult(False, ingredient,
+                                         f"There's not enough {ingredient} in the machine, try another coffee")
+            for ingredient, amount in ingredients_needed.items():
+                slot = SLOT.get(ingredient)
+                if slot is not None:
+                    values[slot] -= amount
+            values[SLOT["cups"]] -= cups
+        return RESERVED
+
+    def close(self):
+        """Detach this process. The creator also removes the block and its lock file."""
+        self._values.release()
+        self._lock.close()
+        self._shm.close()
+        if self._owner:
+            _unlink(self._shm)
+            try:
+                os.remove(_lock_path(self._shm.name))
+            except FileNotFoundError:
+                pass
+
+
+def _lock_path(name):
+    return os.path.join(tempfile.gettempdir(), f"coffee-{name.lstrip('/')}.lock")
+
+
+def _initialize(shm, levels):
+    shm.buf[:len(MAGIC)] = MAGIC
+    values = shm.buf[len(MAGIC):SIZE].cast("q")
+    start = levels if levels is not None else StockIngredients().stock
+    for key in KEYS:
+        values[SLOT[key]] = int(start.get(key, 0))
+    values.release()
+
+
+def _untracked(name, create=False):
+    """
+    Open a block the resource tracker will not unlink: before 3.13 it unlinks
+    every block a process opened when that process exits, so the first kiosk
+    to close would take the stock away from the others. Older versions
+    register in the constructor, so the entry is dropped right after. Every
+    block is opened this way, the creator's too: pool workers share their
+    parent's tracker, and one entry per name is all it keeps.
+    """
+    size = SIZE if create else 0
+    try:
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)   # Python 3.13+
+    except TypeError:
+        pass
+    from multiprocessing import resource_tracker
+    shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+    resource_tracker.unregister(shm._name, "shared_memory")         # The name the constructor registered
+    return shm
+
+
+def _unlink(shm):
+    """Remove a block opened by _untracked (before 3.13 unlink() unregisters it, so register it back first)."""
+    if getattr(shm, "_track", True):
+        from multiprocessing import resource_tracker
+        resource_tracker.register(shm._name, "shared_memory")
+    shm.unlink()
+
+
+# ----------------------------- Demo ----------------------------- #
+def _worker(name, orders, seed):
+    import random
+
+    from coffeeprep import COFFEE_TYPES, SIZES
+    from engine import CoffeeMachine
+
+    stock = SharedStockIngredients.attach(name)
+    machine = CoffeeMachine(stock=stock)
+    rng = random.Random(seed)
+    menu = [(t, s) for t in COFFEE_TYPES for s in SIZES]
+    served = 0
+    try:
+        for _ in range(orders):
+            served += machine.order(*rng.choice(menu)).ok
+    finally:
+        stock.close()
+    return served
+
+
+def main():
+    from concurrent.futures import ProcessPoolExecutor
+
+    from coffeeprep import RECIPES
+
+    parser = argparse.ArgumentParser(description="Several processes serving from one shared stock")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--orders", type=int, default=50000, help="orders per worker")
+    parser.add_argument("--cups", type=int, default=None, help="cups in the machine (default: enough for half)")
+    args = parser.parse_args()
+
+    total = args.workers * args.orders
+    cups = args.cups if args.cups is not None else total // 2
+    big = max(max(recipe[0].values()) for recipe in RECIPES.values()) * total
+    stock = SharedStockIngredients.create(levels={"water": big, "milk": big, "coffee_beans": big, "cups": cups})
+    try:
+        t0 = time.perf_counter()
+        with ProcessPoolExecutor(args.workers) as pool:
+            served = sum(pool.map(_worker, [stock.name] * args.workers, [args.orders] * args.workers,
+                                  range(args.workers)))
+        elapsed = time.perf_counter() - t0
+        left = stock.stock["cups"]
+        print(f"{args.workers} workers: {served} of {total} orders served in {elapsed:.2f} s "
+              f"({total / elapsed:,.0f} orders/s)")
+        print(f"cups: {cups} at start, {left} left, {cups - left} used -> "
+              f"{'OK' if cups - left == served and left >= 0 else 'MISMATCH'}")
+    finally:
+        stock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+# ============================================================
+#  Project: Coffee Machine Simulation
+#  File: simulate.py
+#
+#  Author(s): Sofia Vanessa and Ximena Isaac
+#
+#  Credits:
+#    - Functional design and logic implemented by both authors.
+#
+#  Notes:
+#    This project was created for learning purposes.
+#    Discrete-event simulation of the machine over days or weeks, to try
+#    refill policies and tank sizes before changing real machines.
+#      python simulate.py --days 7 --refill-every 240
+#      python simulate.py --days 7 --water 4000 --refill-below 0.2
+#      python simulate.py --trace orders.csv           (columns: time,type,size)
+# ============================================================
+
+import argparse
+import csv
+import heapq
+import itertools
+import json
+import random
+
+from coffeeprep import COFFEE_TYPES, SIZES, to_base
+from engine import CoffeeMachine, CAPACITY, MAX_BEANS, MAX_CUPS, MAX_MILK, MAX_WATER
+
+DAY = 24 * 3600
+HOUR = 3600
+
+# Orders per hour for each hour of the day (a café that opens at 6 and closes at 21)
+DEFAULT_PROFILE = [0, 0, 0, 0, 0, 0, 12, 45, 60, 40, 28, 24, 36, 30, 20, 18, 20, 14, 8, 4, 2, 0, 0, 0]
+DEFAULT_MIX = {(t, s): 1.0 for t in COFFEE_TYPES for s in SIZES}
+
+# Tank size flags, in the units people use (converted to base units for the engine)
+TANK_FLAGS = (("water", "--water", MAX_WATER, "ml"), ("milk", "--milk", MAX_MILK, "ml"),
+              ("coffee_beans", "--beans", MAX_BEANS, "g"), ("cups", "--cups", MAX_CUPS, "units"))
+
+# Event kinds, in the order they are handled when they share a timestamp
+REFILL, ARRIVAL, SAMPLE = 0, 1, 2
+
+
+# ----------------------------- Order sources ----------------------------- #
+def poisson_arrivals(profile=DEFAULT_PROFILE, days=1, mix=DEFAULT_MIX, seed=None):
+    """Orders from a non-homogeneous Poisson process with a per-hour rate. Yields (t, type, size)."""
+    rng = random.Random(seed)
+    drinks = list(mix)
+    cum_weights = list(itertools.accumulate(mix.values()))         # Accumulated once, not per order
+    end = days * DAY
+    t = 0.0
+    while t < end:
+        hour_end = (int(t // HOUR) + 1) * HOUR
+        rate = profile[int(t // HOUR) % len(profile)] / HOUR        # Orders per second this hour
+        if rate <= 0:
+            t = hour_end
+            continue
+        t += rng.expovariate(rate)
+        if t >= hour_end:                                           # Memoryless: restart at the new rate
+            t = hour_end
+            continue
+        if t < end:
+            coffee_type, size = rng.choices(drinks, cum_weights=cum_weights)[0]
+            yield t, coffee_type, size
+
+
+def trace_arrivals(path):
+    """Orders from a trace file: CSV with time,type,size columns or JSON lines with the same keys."""
+    with open(path, newline="") as f:
+        if path.endswith((".jsonl", ".json")):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        for row in rows:
+            yield float(row["time"]), row["type"], row.get("size") or "small"
+
+
+def parse_mix(text):
+    """"latte/large=2,espresso/small=1" -> {("latte", "large"): 2.0, ("espresso", "small"): 1.0}"""
+    mix = {}
+    for part in text.split(","):
+        drink, _, weight = part.partition("=")
+        coffee_type, _, size = drink.strip().partition("/")
+        mix[(coffee_type, size or "small")] = float(weight or 1)
+    return mix
+
+
+#This class replays a stream of orders against one machine with a refill policy
+class Simulation:
+    def __init__(self, capacity=None, refill_every=4 * HOUR, refill_below=None,
+                 refill_delay=15 * 60, sample_every=HOUR):
+        self.capacity = dict(capacity or CAPACITY)
+        self.refill_every = refill_every                            # Scheduled full refill (None = off)
+        self.refill_below = refill_below                            # Call the operator below this fill level
+        self.refill_delay = refill_delay                            # Operator travel time
+        self.sample_every = sample_every
+
+    def run(self, arrivals, until=None):
+        """Run to the end of the arrivals (or `until` seconds). Returns a report dict."""
+        machine = CoffeeMachine(capacity=self.capacity)
+        machine.fill_all()
+        stock = machine.stock.stock
+        capacity = self.capacity
+        arrivals = iter(arrivals)
+
+        events = []                                                 # (time, kind, seq, payload)
+        seq = 0
+        first = next(arrivals, None)
+        if first is not None:
+            heapq.heappush(events, (first[0], ARRIVAL, seq, first))
+        if self.refill_every:
+            heapq.heappush(events, (self.refill_every, REFILL, -1, "scheduled"))
+        heapq.heappush(events, (0.0, SAMPLE, -2, None))
+
+        orders = served = lost = refills = 0
+        lost_cents = 0
+        lost_by_reason = {}
+        stockouts = {}                                              # ingredient -> times it ran out
+        out_since = {}                                              # ingredient -> when it ran out
+        downtime = {}                                               # ingredient -> seconds empty
+        samples = []                                                # (t, {tank: fill fraction})
+        refill_pending = False
+        more_orders = first is not None                             # Orders still to come
+        now = 0.0
+
+        while events:
+            now, kind, _, payload = heapq.heappop(events)
+            if until is not None and now > until:
+                now = until
+                break
+
+            if kind == ARRIVAL:
+                _, coffee_type, size = payload
+                orders += 1
+                result = machine.order(coffee_type, size, timestamp=now)
+                if result.ok:
+                    served += 1
+                else:
+                    lost += 1
+                    reason = result.reason
+                    lost_by_reason[reason] = lost_by_reason.get(reason, 0) + 1
+                    if result.coffee is not None:
+                        lost_cents += result.coffee.price_cents
+                    if reason != "invalid" and reason not in out_since:
+                        out_since[reason] = now
+                        stockouts[reason] = stockouts.get(reason, 0) + 1
+                if (self.refill_below is not None and not refill_pending
+                        and any(stock[key] < self.refill_below * cap for key, cap in capacity.items())):
+                    refill_pending = True
+                    heapq.heappush(events, (now + self.refill_delay, REFILL, -1, "on_demand"))
+                following = next(arrivals, None)
+                if following is not None:
+                    seq += 1
+                    heapq.heappush(events, (following[0], ARRIVAL, seq, following))
+                else:
+                    more_orders = False
+
+            elif kind == REFILL:
+                machine.fill_all()
+                refills += 1
+                for reason, since in out_since.items():
+                    downtime[reason] = downtime.get(reason, 0.0) + now - since
+                out_since.clear()
+                if payload == "on_demand":
+                    refill_pending = False
+                elif self.refill_every and more_orders:             # Keep the schedule while orders remain
+                    heapq.heappush(events, (now + self.refill_every, REFILL, -1, "scheduled"))
+
+            elif kind == SAMPLE:
+                samples.append((now, {key: stock[key] / cap for key, cap in capacity.items()}))
+                if more_orders:
+                    heapq.heappush(events, (now + self.sample_every, SAMPLE, -2, None))
+
+        for reason, since in out_since.items():
+            downtime[reason] = downtime.get(reason, 0.0) + now - since
+
+        return {
+            "simulated_hours": now / HOUR,
+            "orders": orders,
+            "served": served,
+            "lost_sales": lost,
+            "lost_by_reason": lost_by_reason,
+            "revenue": machine.totals.revenue_cents / 100,
+            "lost_revenue": lost_cents / 100,
+            "refills": refills,
+            "stockouts": stockouts,
+            "stockout_hours": {key: seconds / HOUR for key, seconds in downtime.items()},
+            "utilisation": _utilisation(samples, capacity),
+            "samples": samples,
+        }
+
+
+def _utilisation(samples, capacity):
+    """Average and lowest fill level per tank over the sampled timeline."""
+    if not samples:
+        return {}
+    return {key: {"mean_fill": sum(s[1][key] for s in samples) / len(samples),
+                  "min_fill": min(s[1][key] for s in samples)}
+            for key in capacity}
+
+
+def print_report(report):
+    print(f"Simulated {report['simulated_hours']:.1f} h: {report['orders']} orders, "
+          f"{report['served']} served, {report['lost_sales']} lost")
+    print(f"Revenue ${report['revenue']:.2f}   lost revenue ${report['lost_revenue']:.2f}   "
+          f"refills {report['refills']}")
+    for key, count in sorted(report["stockouts"].items()):
+        print(f"  stockouts {key:<13}{count:>5}   empty for {report['stockout_hours'].get(key, 0):.1f} h")
+    print("Tank utilisation (fill level):")
+    for key, usage in report["utilisation"].items():
+        print(f"  {key:<13} mean {usage['mean_fill']:>6.1%}   lowest {usage['min_fill']:>6.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Discrete-event simulation of the coffee machine")
+    parser.add_argument("--days", type=float, default=7, help="days to simulate with the arrival profile")
+    parser.add_argument("--trace", default=None, help="replay an order trace (CSV or JSONL) instead")
+    parser.add_argument("--profile", default=None, help="JSON file with 24 hourly order rates")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply the arrival rates")
+    parser.add_argument("--mix", default=None, help='drink weights, e.g. "latte/large=2,espresso/small=1"')
+    parser.add_argument("--seed", type=int, default=1)
+    for key, flag, default, unit in TANK_FLAGS:
+        parser.add_argument(flag, dest=key, type=float, default=default, help=f"{key} tank size ({unit})")
+    parser.add_argument("--refill-every", type=float, default=240, help="minutes between refills (0 = off)")
+    parser.add_argument("--refill-below", type=float, default=None, help="call a refill below this fill level")
+    parser.add_argument("--refill-delay", type=float, default=15, help="minutes until a called refill happens")
+    parser.add_argument("--json", default=None, help="also write the full report (with samples) here")
+    args = parser.parse_args()
+
+    if args.trace:
+        arrivals = trace_arrivals(args.trace)
+    else:
+        profile = DEFAULT_PROFILE
+        if args.profile:
+            with open(args.profile) as f:
+                profile = json.load(f)
+        profile = [rate * args.scale for rate in profile]
+        mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+        arrivals = poisson_arrivals(profile, args.days, mix, args.seed)
+
+    capacity = {key: to_base(key, getattr(args, key)) for key in CAPACITY}
+    simulation = Simulation(capacity, refill_every=args.refill_every * 60 or None,
+                            refill_below=args.refill_below, refill_delay=args.refill_delay * 60)
+    report = simulation.run(arrivals)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
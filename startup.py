@@ -0,0 +1,92 @@
+# ============================================================
+#  Project: Coffee Machine Simulation
+#  File: startup.py
+#
+#  Author(s): Sofia Vanessa and Ximena Isaac
+#
+#  Credits:
+#    - Functional design and logic implemented by both authors.
+#
+#  Notes:
+#    This project was created for learning purposes.
+#    Startup budget check. Import times come from `python -X importtime`
+#    in fresh interpreters; the first-frame time from
+#    `main.py --startup-report` (skipped when there is no display).
+#      python startup.py            report, exit 1 if over budget
+#      python startup.py --top 15   also list the slowest imports
+# ============================================================
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Cumulative import time budgets (ms) for the modules people import on their own
+IMPORT_BUDGETS_MS = {
+    "coffeeprep": 15,
+    "engine": 40,
+    "main": 15,                 # the window (gui) is imported by main() only
+    "gui": 120,
+}
+
+
+def import_profile(module):
+    """Run `import module` under -X importtime. Returns (total ms, [(cumulative ms, name), ...])."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=HERE, capture_output=True, text=True, check=True)
+    rows = []
+    total = 0.0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        ms = int(cumulative) / 1000
+        rows.append((ms, name.rstrip()))
+        if name.rstrip() == " " + module:                        # Top level: a single leading space
+            total = ms
+    return total, sorted(rows, reverse=True)
+
+
+def first_frame_report():
+    """Time to first frame from the GUI itself, or None without a display."""
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        return None
+    proc = subprocess.run([sys.executable, "main.py", "--no-journal", "--startup-report"],
+                          cwd=HERE, capture_output=True, text=True, timeout=60)
+    lines = [line for line in proc.stdout.splitlines() if line.startswith("startup:")]
+    return lines[-1] if lines else proc.stderr.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check import time and time-to-first-frame budgets")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per module (median)")
+    parser.add_argument("--top", type=int, default=0, help="also list the N slowest imports of gui")
+    args = parser.parse_args()
+
+    over = []
+    for module, budget in IMPORT_BUDGETS_MS.items():
+        import_profile(module)                                      # Warm-up: compile .pyc files
+        runs = [import_profile(module) for _ in range(args.runs)]
+        total = statistics.median(run[0] for run in runs)
+        verdict = "OK" if total <= budget else "OVER BUDGET"
+        if total > budget:
+            over.append(module)
+        print(f"import {module:<12}{total:>8.1f} ms   budget {budget:>4} ms   {verdict}")
+        if module == "gui" and args.top:
+            for ms, name in runs[-1][1][:args.top]:
+                print(f"    {ms:>8.1f} ms  {name}")
+
+    report = first_frame_report()
+    print(report if report else "first frame: skipped (no display; try xvfb-run python startup.py)")
+    if report and "OVER BUDGET" in report:
+        over.append("first frame")
+    if over:
+        print(f"Over budget: {', '.join(over)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import json
+
+from bulk import ingest
+from engine import CoffeeMachine
+
+
+def _jsonl(tmp_path, lines):
+    path = tmp_path / "orders.jsonl"
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def test_ingest_counts_malformed_rows_and_keeps_going(tmp_path):
+    path = _jsonl(tmp_path, [
+        json.dumps({"type": "espresso", "size": "small"}),
+        json.dumps({"type": "latte", "size": "small", "quantity": "two"}),
+        json.dumps({"size": "small"}),
+        json.dumps(["espresso", "small"]),
+        "{not json",
+        json.dumps({"type": "latte", "size": ["small"]}),
+        json.dumps({"type": "latte", "quantity": 0}),
+        json.dumps({"type": "latte", "quantity": 1.5}),
+        json.dumps({"type": "mocha"}),
+        json.dumps({"type": "latte", "size": "large", "quantity": 2}),
+    ])
+    machine = CoffeeMachine()
+    summary = ingest(machine, path)
+    assert summary["invalid"] == 8
+    assert summary["fulfilled"] == 3
+    assert summary["rejected"] == 0
+    assert len(machine.ledger) == 3
+
+
+def test_ingest_csv_quantity(tmp_path):
+    path = tmp_path / "orders.csv"
+    path.write_text("type,size,quantity\nespresso,small,2\nlatte,,\nlatte,small,-1\ncapuccino\n")
+    machine = CoffeeMachine()
+    summary = ingest(machine, str(path))
+    assert summary["fulfilled"] == 4                                # 2 espresso, 1 latte, 1 capuccino
+    assert summary["invalid"] == 1
@@ -0,0 +1,85 @@
+import pytest
+
+from coffeeprep import RECIPES
+from engine import CoffeeMachine
+
+
+def test_order_records_the_sale_and_takes_the_stock():
+    machine = CoffeeMachine()
+    before = dict(machine.stock.stock)
+    result = machine.order("latte", "large")
+    assert result.ok
+    ingredients, _, price_cents = RECIPES[("latte", "large")]
+    assert machine.money_cents == price_cents
+    assert machine.totals.count == 1
+    assert len(machine.ledger) == 1
+    for key, amount in ingredients.items():
+        assert machine.stock.stock[key] == before[key] - amount
+    assert machine.stock.stock["cups"] == before["cups"] - 1
+
+
+@pytest.mark.parametrize("coffee_type, size", [("mocha", "small"), ("latte", "venti"), (["latte"], "small"),
+                                               ("latte", None)])
+def test_off_menu_order_is_invalid_and_changes_nothing(coffee_type, size):
+    machine = CoffeeMachine()
+    before = dict(machine.stock.stock)
+    result = machine.order(coffee_type, size)
+    assert not result.ok
+    assert result.reason == "invalid"
+    assert dict(machine.stock.stock) == before
+    assert machine.money_cents == 0 and len(machine.ledger) == 0
+
+
+@pytest.mark.parametrize("short", ["water", "milk", "coffee_beans", "cups"])
+def test_short_ingredient_rejects_the_whole_order(short):
+    machine = CoffeeMachine()
+    machine.stock.stock[short] = 0
+    before = dict(machine.stock.stock)
+    result = machine.order("latte", "small")
+    assert not result.ok
+    assert result.reason == short
+    assert dict(machine.stock.stock) == before                      # Nothing taken before the short one
+    assert machine.money_cents == 0 and machine.totals.count == 0
+
+
+def test_last_cup_and_exact_stock_are_enough():
+    machine = CoffeeMachine()
+    ingredients = RECIPES[("espresso", "small")][0]
+    for key in machine.stock.stock:
+        machine.stock.stock[key] = 1 if key == "cups" else ingredients.get(key, 0)
+    assert machine.order("espresso", "small").ok
+    assert all(level == 0 for level in machine.stock.stock.values())
+    assert machine.order("espresso", "small").reason == "cups"
+
+
+def test_withdraw_rounds_half_up_to_the_cent():
+    machine = CoffeeMachine()
+    machine.money_cents = 1000
+    assert machine.withdraw("0.005") == 9.99
+    assert machine.withdraw(2.675) == 7.31                          # Not 2.67: the decimal text is used
+    assert machine.money_cents == 731
+
+
+def test_withdraw_everything_then_nothing_more():
+    machine = CoffeeMachine()
+    machine.money_cents = 450
+    assert machine.withdraw(4.5) == 0
+    assert machine.withdraw(0) == 0
+    with pytest.raises(ValueError, match="Insufficient funds"):
+        machine.withdraw(0.01)
+
+
+@pytest.mark.parametrize("amount, message", [(-1, "positive"), ("abc", "number"), ("nan", "number"),
+                                             (float("inf"), "number"), (10.01, "Insufficient")])
+def test_withdraw_rejects_bad_amounts_and_keeps_the_balance(amount, message):
+    machine = CoffeeMachine()
+    machine.money_cents = 1000
+    with pytest.raises(ValueError, match=message):
+        machine.withdraw(amount)
+    assert machine.money_cents == 1000
+
+
+def test_donate_uses_its_own_message():
+    machine = CoffeeMachine()
+    with pytest.raises(ValueError, match="donation"):
+        machine.donate(1)
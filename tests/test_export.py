@@ -0,0 +1,23 @@
+from journal import iter_sales, load_machine, open_machine
+
+
+def _orders(machine, n):
+    for i in range(n):
+        machine.refill("cups")
+        machine.refill("water")
+        machine.refill("milk")
+        machine.refill("coffee_beans")
+        assert machine.order("latte" if i % 2 else "espresso", "small").ok
+        if i % 50 == 49:
+            machine.journal.snapshot()
+    machine.journal.flush()
+
+
+def test_iter_sales_reads_snapshot_then_log_tail(tmp_path):
+    machine = open_machine(str(tmp_path))
+    _orders(machine, 130)
+    expected = load_machine(str(tmp_path)).ledger
+    chunks = list(iter_sales(str(tmp_path), chunk_rows=16))
+    assert max(len(chunk) for chunk in chunks) <= 16
+    assert [sale for chunk in chunks for sale in chunk] == list(expected)
+    machine.journal.close()
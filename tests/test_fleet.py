@@ -0,0 +1,9 @@
+from fleet import Fleet
+
+
+def test_serve_counts_unknown_drinks():
+    with Fleet(machines=2, workers=1) as fleet:
+        summary = fleet.serve([("latte", "small"), ("mocha", "small"), ("latte", "venti"), ("espresso", "large")])
+    assert summary["served"] == 2
+    assert summary["invalid"] == 2
+    assert summary["rejected"] == 0
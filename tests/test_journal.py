@@ -0,0 +1,86 @@
+import os
+import threading
+
+import pytest
+
+import journal
+from journal import load_machine, open_machine
+
+
+def _state(machine):
+    ledger = machine.ledger
+    return (machine.money_cents, dict(machine.stock.stock), machine.totals.count, machine.totals.revenue_cents,
+            {key: list(value) for key, value in machine.totals.by_drink.items()},
+            [list(column) for column in (ledger.drink, ledger.size, ledger.price_cents, ledger.timestamp)])
+
+
+def _busy_day(machine, orders):
+    for i in range(orders):
+        if not machine.order(("espresso", "latte", "capuccino")[i % 3], ("small", "medium", "large")[i % 2]).ok:
+            machine.fill_all()
+    machine.withdraw(1.25)
+
+
+def test_replay_after_several_snapshots(tmp_path):
+    machine = open_machine(str(tmp_path))
+    for _ in range(3):
+        _busy_day(machine, 40)
+        machine.journal.snapshot()
+    _busy_day(machine, 25)                                          # Tail after the last snapshot
+    machine.journal.flush()
+    expected = _state(machine)
+    assert _state(load_machine(str(tmp_path))) == expected
+    machine.close()
+    restored = open_machine(str(tmp_path))
+    assert _state(restored) == expected
+    assert restored.journal.generation == 3
+    restored.close()
+
+
+def test_replay_after_a_snapshot_that_never_reached_disk(tmp_path, monkeypatch):
+    machine = open_machine(str(tmp_path))
+    _busy_day(machine, 30)
+    machine.journal.snapshot()
+    _busy_day(machine, 30)
+
+    def crash(*args):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(journal, "_write_snapshot", crash)
+        with pytest.raises(OSError):
+            machine.journal.snapshot()                              # Log rotated, snapshot not written
+    assert os.path.exists(tmp_path / "journal.1.log")
+    _busy_day(machine, 30)
+    machine.journal.flush()
+    expected = _state(machine)
+
+    restored = open_machine(str(tmp_path))                          # As after a crash: no close()
+    assert _state(restored) == expected
+    restored.journal.snapshot()
+    assert not os.path.exists(tmp_path / "journal.1.log")
+    restored.close()
+    machine.journal.close()
+
+
+def test_order_path_leaves_the_snapshot_to_the_flusher(tmp_path):
+    machine = open_machine(str(tmp_path), snapshot_every=3, sync_interval=0.01)
+    journal = machine.journal
+    written = threading.Event()
+    threads = []
+
+    def snapshot(wait=True):
+        threads.append(threading.current_thread().name)
+        type(journal).snapshot(journal, wait)
+        written.set()
+
+    journal.snapshot = snapshot
+    for _ in range(3):
+        assert machine.order("espresso", "small").ok
+    assert written.wait(5)
+    machine.close()
+    assert threads == ["journal-flush"]
+    assert journal.generation == 1
+    restored = open_machine(str(tmp_path))
+    assert len(restored.ledger) == 3
+    restored.close()
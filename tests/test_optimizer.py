@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from coffeeprep import BASE_RECIPES, RECIPES, SIZES, build_recipe
+from optimizer import KEYS, MenuOptimizer, menu_table
+
+STOCK = {"water": 6000, "milk": 1000, "coffee_beans": 3000, "cups": 20}
+
+
+def _lattes(plan):
+    return sum(count for (kind, _), count in plan.counts.items() if kind == "latte")
+
+
+def test_replaced_recipe_changes_the_plan(monkeypatch):
+    optimizer = MenuOptimizer()
+    before = optimizer.optimize(STOCK)
+    assert _lattes(before) == 0
+
+    monkeypatch.setitem(BASE_RECIPES, "latte", dict(BASE_RECIPES["latte"], price=40))
+    for size in SIZES:
+        monkeypatch.setitem(RECIPES, ("latte", size), build_recipe("latte", size))
+    after = optimizer.optimize(STOCK)
+    assert _lattes(after) > 0
+    assert after.revenue_cents > before.revenue_cents
+
+
+def _brute_force(table, levels, i=0):
+    """Best revenue from table[i:] within levels, trying every count."""
+    if i == len(table):
+        return 0
+    _, demand, price = table[i]
+    best = 0
+    x = 0
+    while all(x * d <= level for d, level in zip(demand, levels)):
+        rest = [level - x * d for d, level in zip(demand, levels)]
+        best = max(best, x * price + _brute_force(table, rest, i + 1))
+        x += 1
+    return best
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_plan_matches_brute_force(seed):
+    rng = random.Random(seed)
+    stock = {"water": rng.randrange(0, 2500), "milk": rng.randrange(0, 600),
+             "coffee_beans": rng.randrange(0, 1200), "cups": rng.randrange(1, 8)}
+    table = menu_table()
+    plan = MenuOptimizer().optimize(stock)
+    assert plan.exact
+    assert plan.revenue_cents == _brute_force(table, [stock[key] for key in KEYS])
+    demand = {drink: d for drink, d, _ in table}
+    for i, key in enumerate(KEYS):
+        used = sum(count * demand[drink][i] for drink, count in plan.counts.items())
+        assert used + plan.leftover[key] == stock[key]
+        assert plan.leftover[key] >= 0
@@ -0,0 +1,64 @@
+import random
+
+from sales import RING_HEADER, ROLLUP_HEADER, SalesLedger, SalesRollup
+
+NOW = 1_760_000_000.0
+
+
+def _ledger(rows, seed=7, start=NOW - 3 * 86400):
+    rng = random.Random(seed)
+    ledger = SalesLedger()
+    timestamp = start
+    for _ in range(rows):
+        timestamp += rng.expovariate(rows / (NOW - start))
+        ledger.append(rng.choice(("espresso", "latte", "capuccino")), rng.choice(("small", "medium", "large")),
+                      rng.choice((400, 700, 1050)), timestamp)
+    return ledger
+
+
+def _views(rollup, now):
+    return ([rollup.window(seconds, now) for seconds in (300, 3600, 86400, 7 * 86400)]
+            + rollup.buckets("minute", 30, now) + rollup.buckets("hour", 48, now) + rollup.buckets("day", 5, now))
+
+
+def test_rollup_round_trips_through_bytes():
+    ledger = _ledger(5000)
+    rollup = SalesRollup(utc_offset=3600)
+    rollup.add_rows(ledger)
+    assert rollup.window(86400, NOW).count > 1000
+    restored = SalesRollup(utc_offset=0)
+    assert restored.load_bytes(rollup.to_bytes())
+    assert restored.utc_offset == 3600
+    assert _views(restored, NOW) == _views(rollup, NOW)
+    assert restored.to_bytes() == rollup.to_bytes()
+
+
+def test_restored_rollup_keeps_adding_like_the_original():
+    ledger = _ledger(4000)
+    later = _ledger(1000, seed=8, start=ledger.timestamp[-1])
+    rollup = SalesRollup(utc_offset=0)
+    rollup.add_rows(ledger)
+    restored = SalesRollup(utc_offset=0)
+    restored.load_bytes(rollup.to_bytes())
+    rollup.add_rows(later)
+    restored.add_rows(later)
+    assert _views(restored, later.timestamp[-1]) == _views(rollup, later.timestamp[-1])
+
+
+def test_empty_rollup_round_trips():
+    restored = SalesRollup(utc_offset=0)
+    assert restored.load_bytes(SalesRollup(utc_offset=0).to_bytes())
+    assert restored.window(3600, NOW).count == 0
+
+
+def test_rollup_with_other_ring_sizes_is_refused():
+    rollup = SalesRollup(utc_offset=0)
+    rollup.add_rows(_ledger(500))
+    data = bytearray(rollup.to_bytes())
+    seconds, slots, current = RING_HEADER.unpack_from(data, ROLLUP_HEADER.size)
+    RING_HEADER.pack_into(data, ROLLUP_HEADER.size, seconds, slots + 1, current)
+    other = SalesRollup(utc_offset=0)
+    other.add_rows(_ledger(50, seed=9))
+    before = other.to_bytes()
+    assert not other.load_bytes(bytes(data))
+    assert other.to_bytes() == before
@@ -0,0 +1,21 @@
+import asyncio
+import json
+
+from server import LINE_LIMIT, OrderServer
+
+
+def test_over_long_line_gets_an_error_and_the_connection_closes():
+    async def scenario():
+        server = OrderServer()
+        await server.start(port=0)
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(b"x" * (LINE_LIMIT + 10) + b"\n")
+            await writer.drain()
+            lines = [json.loads(line) for line in (await asyncio.wait_for(reader.read(), 5)).splitlines()]
+            writer.close()
+            return lines
+        finally:
+            await server.close()
+
+    assert asyncio.run(scenario()) == [{"id": None, "ok": False, "error": "line too long"}]
@@ -0,0 +1,14 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_pool_workers_leave_the_block_to_its_creator():
+    proc = subprocess.run([sys.executable, "shared_stock.py", "--workers", "2", "--orders", "500"],
+                          cwd=ROOT, capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 0, proc.stderr
+    assert "-> OK" in proc.stdout
+    assert "Traceback" not in proc.stderr                           # From the resource tracker on unlink
+    assert "leaked shared_memory" not in proc.stderr
@@ -0,0 +1,81 @@
+from coffeeprep import StockIngredients
+
+
+def test_branch_keeps_fork_time_levels():
+    stock = StockIngredients()
+    branch = stock.fork()
+    assert stock.reserve({"milk": 900}).ok
+    stock.refill_to("water", 5000)
+    assert branch.stock["milk"] == 1000
+    assert branch.stock["water"] == 2000
+    assert branch.stock["cups"] == 100
+
+
+def test_nested_branch_keeps_fork_time_levels():
+    stock = StockIngredients()
+    branch = stock.fork()
+    child = branch.fork()
+    assert branch.reserve({"milk": 400}).ok
+    assert child.stock["milk"] == 1000
+    assert branch.stock["milk"] == 600
+    assert stock.stock["milk"] == 1000
+
+
+def test_commit_applies_net_changes():
+    stock = StockIngredients()
+    branch = stock.fork()
+    assert branch.reserve({"milk": 300, "water": 200}).ok
+    branch.refill_to("coffee_beans", 6000)
+    assert branch.changes() == {"milk": -300, "water": -200, "coffee_beans": 1000, "cups": -1}
+    assert branch.commit().ok
+    assert stock.stock == {"water": 1800, "milk": 700, "coffee_beans": 6000, "cups": 99}
+    assert branch.changes() == {}
+
+
+def test_commit_conflict_leaves_parent_and_branch_as_they_were():
+    stock = StockIngredients()
+    branch = stock.fork()
+    assert branch.reserve({"milk": 900, "water": 100}).ok
+    assert stock.reserve({"milk": 500}).ok                          # Someone else got there first
+    parent_before = dict(stock.stock)
+    result = branch.commit()
+    assert not result.ok
+    assert result.missing == "milk"
+    assert stock.stock == parent_before                             # All or nothing: water untouched too
+    assert branch.changes() == {"milk": -900, "water": -100, "cups": -1}
+
+
+def test_commit_after_parent_changes_elsewhere_adds_on_top():
+    stock = StockIngredients()
+    branch = stock.fork()
+    assert branch.reserve({"milk": 100}).ok
+    assert stock.reserve({"water": 500}).ok
+    assert branch.commit().ok
+    assert stock.stock["milk"] == 900
+    assert stock.stock["water"] == 1500                             # The parent's own change is kept
+    assert stock.stock["cups"] == 98
+
+
+def test_discard_after_conflict_starts_from_the_parent():
+    stock = StockIngredients()
+    branch = stock.fork()
+    assert branch.reserve({"milk": 1000}).ok
+    assert stock.reserve({"milk": 1}).ok
+    assert not branch.commit().ok
+    branch.discard()
+    assert branch.changes() == {}
+    assert dict(branch.stock) == stock.stock
+
+
+def test_nested_commits_reach_the_root_in_order():
+    stock = StockIngredients()
+    branch = stock.fork()
+    child = branch.fork()
+    assert child.reserve({"milk": 600}).ok
+    assert branch.reserve({"milk": 300}).ok
+    assert child.commit().ok                                        # 1000 - 300 - 600 still fits in the branch
+    assert branch.stock["milk"] == 100
+    assert stock.stock["milk"] == 1000
+    assert stock.reserve({"milk": 950}).ok
+    assert not branch.commit().ok                                   # The root has only 50 left
+    assert stock.stock["milk"] == 50